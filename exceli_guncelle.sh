@@ -21,6 +21,8 @@ if [ "$1" == "--help" ] || [ "$1" == "-h" ]; then
     echo "Kullanım:"
     echo "  ./exceli_guncelle.sh              # API veri çekme dahil"
     echo "  ./exceli_guncelle.sh --skip-api   # API veri çekmeyi atla"
+    echo "  ./exceli_guncelle.sh --force      # Değişmeyen veritabanlarını da yeniden üret"
+    echo "  ./exceli_guncelle.sh --monthly    # Firma + ay başına ayrı Excel'ler de üret"
     echo ""
     exit 0
 fi
@@ -1,25 +1,242 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-API Excel dosyasından verileri birleşik veritabanına import eder
+API faturalarını birleşik veritabanına aktarır
+
+Varsayılan yol: api.db → birlesik.db doğrudan senkronizasyon (Excel yok).
+birlesik.db bağlantısına api.db ATTACH edilir ve api_id (= invoice_id)
+üzerinden tek transaction'da upsert yapılır: değişen faturalar
+UPDATE ... FROM ile güncellenir, yeni faturalar INSERT ... SELECT ile
+eklenir, değişmeyenlere dokunulmaz. (ON CONFLICT DO UPDATE kullanılmaz:
+DO UPDATE, irs_match_changes trigger'larındaki INSERT OR IGNORE'u ABORT'a
+çevirir.) API satırları silinip yeniden yazılmadığı için fatura id'leri
+(ödeme/irsaliye eşleştirmelerinin referansları) korunur.
+
+Eski yol (--excel): API_Giden_Faturalar dosyasından import (Excel'in yanında
+güncel bir .jsonl/.parquet/.csv varsa o okunur).
+
+Kullanım:
+    python3 import_api_excel.py            # api.db → birlesik.db senkronizasyonu
+    python3 import_api_excel.py --prune    # api.db'de olmayan API faturalarını da sil
+    python3 import_api_excel.py --excel    # Excel/JSONL dosyasından import
 """
 
 import pandas as pd
 import sqlite3
 import os
+import sys
 from pathlib import Path
 
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.database.connection import get_connection
+from src.exporters.table_writer import find_table, read_table
+
+
+# api.db faturaları birlesik.db invoices sütunlarına eşlenmiş hali (api_id = invoice_id)
+API_SOURCE_SQL = """
+    SELECT
+        a.api_id AS invoice_id,
+        a.invoice_number,
+        a.issue_date,
+        COALESCE(a.total_amount, 0) AS total_amount,
+        COALESCE(a.taxable_amount, 0) AS taxable_amount,
+        CASE WHEN a.invoice_type = 'PURCHASE_INVOICE' THEN a.firm_name END AS supplier_name,
+        CASE WHEN a.invoice_type = 'PURCHASE_INVOICE' THEN a.firm_vkn END AS supplier_vkn,
+        CASE WHEN COALESCE(a.invoice_type, '') != 'PURCHASE_INVOICE' THEN a.firm_name END AS customer_name,
+        CASE WHEN COALESCE(a.invoice_type, '') != 'PURCHASE_INVOICE' THEN a.firm_vkn END AS customer_vkn,
+        NULLIF(a.description, '') AS description,
+        a.id AS api_row
+    FROM api.invoices a
+    WHERE a.api_id IS NOT NULL
+"""
+
+# Upsert 1/2: mevcut API faturalarından sadece değişenleri güncelle
+# (UPDATE OR IGNORE: yeni numara başka bir faturayla çakışırsa satır atlanır)
+API_UPDATE_SQL = f"""
+    UPDATE OR IGNORE main.invoices SET
+        parse_date = src.issue_date,
+        invoice_number = src.invoice_number,
+        issue_date = src.issue_date,
+        total_amount = src.total_amount,
+        taxable_amount = src.taxable_amount,
+        supplier_name = src.supplier_name,
+        supplier_vkn = src.supplier_vkn,
+        customer_name = src.customer_name,
+        customer_vkn = src.customer_vkn,
+        description = src.description
+    FROM ({API_SOURCE_SQL}) AS src
+    WHERE invoices.firma_kodu = 'API'
+      AND invoices.invoice_id = src.invoice_id
+      AND (invoices.invoice_number IS NOT src.invoice_number
+           OR invoices.issue_date IS NOT src.issue_date
+           OR invoices.total_amount IS NOT src.total_amount
+           OR invoices.taxable_amount IS NOT src.taxable_amount
+           OR invoices.supplier_name IS NOT src.supplier_name
+           OR invoices.supplier_vkn IS NOT src.supplier_vkn
+           OR invoices.customer_name IS NOT src.customer_name
+           OR invoices.customer_vkn IS NOT src.customer_vkn
+           OR invoices.description IS NOT src.description)
+"""
+
+# Upsert 2/2: birlesik.db'de olmayan api_id'leri ekle
+# (INSERT OR IGNORE: aynı fatura numarası başka bir api_id ile varsa atlanır, eski import'taki gibi)
+API_INSERT_SQL = f"""
+    INSERT OR IGNORE INTO main.invoices (
+        firma_kodu, source_file, parse_date, invoice_id, uuid, invoice_number,
+        issue_date, total_amount, currency, taxable_amount, tax_amount,
+        supplier_name, supplier_vkn, customer_name, customer_vkn, description
+    )
+    SELECT
+        'API', 'API', src.issue_date, src.invoice_id, NULL, src.invoice_number,
+        src.issue_date, src.total_amount, 'TRY', src.taxable_amount, NULL,
+        src.supplier_name, src.supplier_vkn, src.customer_name, src.customer_vkn, src.description
+    FROM ({API_SOURCE_SQL}) AS src
+    WHERE NOT EXISTS (
+        SELECT 1 FROM main.invoices i
+        WHERE i.firma_kodu = 'API' AND i.invoice_id = src.invoice_id
+    )
+    ORDER BY src.api_row
+"""
+
+# api.db'de artık olmayan API faturaları (--prune adayları)
+STALE_API_INVOICES = """
+    firma_kodu = 'API'
+    AND invoice_id NOT IN (SELECT api_id FROM api.invoices WHERE api_id IS NOT NULL)
+"""
+
+
+def invoice_references(cursor) -> list:
+    """invoices(id)'ye foreign key ile bağlı (tablo, sütun) çiftleri"""
+    cursor.execute("""
+        SELECT m.name, fk."from"
+        FROM main.sqlite_master m
+        JOIN pragma_foreign_key_list(m.name, 'main') fk
+        WHERE m.type = 'table' AND fk."table" = 'invoices'
+        ORDER BY m.name, fk."from"
+    """)
+    return cursor.fetchall()
+
+
+def sync_api_db_to_birlesik(api_db_path=None, db_path=None, prune: bool = False) -> dict:
+    """
+    api.db faturalarını birlesik.db'ye api_id üzerinden upsert eder
+    
+    Args:
+        api_db_path: API veritabanı (varsayılan: data/db/api.db)
+        db_path: Birleşik veritabanı (varsayılan: data/db/birlesik.db)
+        prune: api.db'de artık olmayan API faturalarını sil. Ödeme, irsaliye,
+               eşleştirme gibi kayıtların bağlı olduğu faturalar silinmez
+               (foreign_keys=ON silmeyi reddeder), 'kept' olarak sayılır.
+    
+    Returns:
+        dict: source (api.db fatura sayısı), inserted, updated, unchanged, deleted, kept, total
+    
+    Raises:
+        FileNotFoundError: Veritabanlarından biri yoksa
+    """
+    project_root = Path(__file__).resolve().parent
+    api_db_path = Path(api_db_path) if api_db_path else project_root / "data" / "db" / "api.db"
+    db_path = Path(db_path) if db_path else project_root / "data" / "db" / "birlesik.db"
+    
+    for path in (api_db_path, db_path):
+        if not path.exists():
+            raise FileNotFoundError(f"Veritabanı bulunamadı: {path}")
+    
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS api", (str(api_db_path),))
+    try:
+        # Upsert anahtarı: API satırlarında invoice_id (= api_id) tekil ve indeksli
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_api_invoice_id
+            ON invoices(invoice_id) WHERE firma_kodu = 'API'
+        """)
+        
+        source = cursor.execute("SELECT COUNT(*) FROM api.invoices WHERE api_id IS NOT NULL").fetchone()[0]
+        
+        deleted = 0
+        kept = 0
+        if prune:
+            stale = cursor.execute(f"SELECT COUNT(*) FROM main.invoices WHERE {STALE_API_INVOICES}").fetchone()[0]
+            referenced = ''.join(
+                f"\n  AND NOT EXISTS (SELECT 1 FROM main.{table} r WHERE r.{column} = invoices.id)"
+                for table, column in invoice_references(cursor)
+            )
+            cursor.execute(f"DELETE FROM main.invoices WHERE {STALE_API_INVOICES}{referenced}")
+            deleted = cursor.rowcount
+            kept = stale - deleted
+        
+        cursor.execute(API_UPDATE_SQL)
+        updated = cursor.rowcount
+        cursor.execute(API_INSERT_SQL)
+        inserted = cursor.rowcount
+        
+        total = cursor.execute("SELECT COUNT(*) FROM main.invoices WHERE firma_kodu = 'API'").fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DETACH DATABASE api")
+        conn.close()
+    
+    return {
+        'source': source,
+        'inserted': inserted,
+        'updated': updated,
+        'unchanged': source - inserted - updated,
+        'deleted': deleted,
+        'kept': kept,
+        'total': total,
+    }
+
+
+def sync_api_to_db(prune: bool = False) -> bool:
+    """api.db → birlesik.db senkronizasyonu (konsol çıktılı)"""
+    print("=" * 80)
+    print("API VERİTABANINDAN BİRLEŞİK VERİTABANINA SENKRONİZASYON")
+    print("=" * 80)
+    print()
+    
+    try:
+        stats = sync_api_db_to_birlesik(prune=prune)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return False
+    except sqlite3.IntegrityError as e:
+        print(f"❌ Senkronizasyon geri alındı: {e}")
+        return False
+    
+    print(f"📖 api.db: {stats['source']} fatura")
+    print(f"✓ {stats['inserted']} yeni API faturası eklendi")
+    print(f"✓ {stats['updated']} API faturası güncellendi")
+    print(f"⏭️  {stats['unchanged']} API faturası değişmedi")
+    if prune:
+        print(f"🗑️  {stats['deleted']} API faturası silindi (api.db'de yok)")
+        if stats['kept']:
+            print(f"📌 {stats['kept']} API faturası korundu (api.db'de yok, bağlı ödeme/eşleştirme kaydı var)")
+    print()
+    print("=" * 80)
+    print("✅ SENKRONİZASYON TAMAMLANDI")
+    print("=" * 80)
+    print(f"📊 Birleşik DB'deki API Fatura Sayısı: {stats['total']}")
+    print()
+    return True
+
 def import_api_excel_to_db():
     """API Excel dosyasından verileri birleşik DB'ye import eder"""
     
     # Proje kök dizini
     project_root = Path(__file__).resolve().parent
     
-    # Excel dosyası yolu
-    excel_path = project_root / "data" / "excel" / "api" / "API_Giden_Faturalar.xlsx"
+    # Kaynak dosya (JSONL/Parquet/CSV, yoksa Excel)
+    table_stem = project_root / "data" / "excel" / "api" / "API_Giden_Faturalar"
+    excel_path = find_table(table_stem)
     
-    if not excel_path.exists():
-        print(f"❌ Excel dosyası bulunamadı: {excel_path}")
+    if excel_path is None:
+        print(f"❌ Excel dosyası bulunamadı: {table_stem.with_suffix('.xlsx')}")
         return False
     
     # Birleşik veritabanı yolu
@@ -34,18 +251,26 @@ def import_api_excel_to_db():
     print("=" * 80)
     print()
     
-    # Excel'i oku
-    print(f"📖 Excel dosyası okunuyor: {excel_path.name}")
-    df = pd.read_excel(excel_path, sheet_name='Tum_Faturalar')
+    # Dosyayı oku
+    print(f"📖 Dosya okunuyor: {excel_path.name}")
+    df = read_table(excel_path, sheet_name='Tum_Faturalar')
     print(f"✓ {len(df)} kayıt okundu")
     print()
     
     # Veritabanına bağlan
-    conn = sqlite3.connect(str(db_path))
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     # Mevcut API kayıtlarını sil (yeniden import için)
-    cursor.execute("DELETE FROM invoices WHERE firma_kodu = 'API'")
+    # foreign_keys=ON: ödeme/eşleştirme kaydı bağlı API faturası varsa silme reddedilir
+    try:
+        cursor.execute("DELETE FROM invoices WHERE firma_kodu = 'API'")
+    except sqlite3.IntegrityError as e:
+        conn.rollback()
+        conn.close()
+        print(f"❌ Eski API kayıtları silinemedi ({e}): bağlı ödeme/eşleştirme kayıtları var")
+        print("   Fatura id'lerini koruyan senkronizasyonu kullanın: python3 import_api_excel.py")
+        return False
     deleted_count = cursor.rowcount
     print(f"🗑️  Eski {deleted_count} API kaydı silindi")
     print()
@@ -72,13 +297,14 @@ def import_api_excel_to_db():
             giden_count += 1
         
         # Description'ı al (banka bilgileri zaten temizlenmiş)
+        # (Excel boş hücreyi NaN okur, JSONL '' olarak korur; ikisi de NULL)
         description = row.get('description', '')
-        if pd.isna(description):
+        if pd.isna(description) or description == '':
             description = None
         
         # Date formatını kontrol et
         date_val = row.get('date', '')
-        if pd.isna(date_val):
+        if pd.isna(date_val) or date_val == '':
             date_val = None
         else:
             date_val = str(date_val)
@@ -123,7 +349,7 @@ def import_api_excel_to_db():
     print()
     
     # Kontrol
-    conn = sqlite3.connect(str(db_path))
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("SELECT COUNT(*) FROM invoices WHERE firma_kodu = 'API'")
@@ -144,5 +370,8 @@ def import_api_excel_to_db():
     return True
 
 if __name__ == '__main__':
-    import_api_excel_to_db()
+    if '--excel' in sys.argv:
+        import_api_excel_to_db()
+    else:
+        sync_api_to_db(prune='--prune' in sys.argv)
 
@@ -5,7 +5,8 @@ API Fatura Çekme Modülü
 =======================
 
 İşbaşı API'sinden sadece fatura verilerini (giden ve gelen) çeker
-ve Excel dosyalarına kaydeder.
+ve Excel dosyalarına kaydeder. Aynı veriler programların okuması için
+yanına JSON Lines olarak da yazılır (API_Giden_Faturalar.jsonl).
 
 Özellikler:
 - Güvenli şifre girişi
@@ -20,7 +21,6 @@ import os
 import sys
 import time
 import sqlite3
-import re
 from datetime import datetime
 from pathlib import Path
 import getpass
@@ -35,6 +35,8 @@ sys.path.insert(0, str(project_root))
 
 # API Database modülünü import et
 from src.api.api_database import APIDatabase
+from src.parsers.description_parser import clean_bank_info, clean_bank_info_series
+from src.exporters.table_writer import write_table
 
 # Logging konfigürasyonu
 # Log dosyasını proje kök dizinine yerleştir
@@ -106,6 +108,11 @@ class IsbasiAPIDataExtractor:
             'incoming_invoices': self.output_dir / "API_Gelen_Faturalar.xlsx"
         }
         
+        # Makine okunur kopya (import_api_excel.py ve invoice_matcher bunu okur)
+        self.table_files = {
+            'invoices': self.excel_files['invoices'].with_suffix('.jsonl')
+        }
+        
         # API veritabanı (kendi ayrı DB'si)
         self.api_db = APIDatabase()
         self.db_path = self.api_db.db_path
@@ -136,39 +143,7 @@ class IsbasiAPIDataExtractor:
         Returns:
             Temizlenmiş açıklama metni (irsaliye bilgileri korunur)
         """
-        if not description or pd.isna(description):
-            return ""
-        
-        # String'e çevir
-        desc = str(description)
-        
-        # SADECE banka bilgisi içeren spesifik pattern'leri temizle
-        # ÇOK SPESİFİK - sadece kesin banka bilgilerini temizler
-        patterns_to_remove = [
-            # Spesifik GARANTİBANK IBAN'ı (Excel format)
-            r'Banka\s+Bilgileri\s*[:\s]*_x000D_\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*_x000D_',
-            # Spesifik GARANTİBANK IBAN'ı (normal format)
-            r'Banka\s+Bilgileri\s*[:\s]*[\r\n]+\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*[\r\n]+',
-            # Spesifik GARANTİBANK IBAN'ı (HTML format)
-            r'Banka\s+Bilgileri\s*[:\s]*<br\s*/?>\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*<br\s*/?>',
-            # Spesifik GARANTİBANK IBAN'ı (tek satır)
-            r'Banka\s+Bilgileri\s*[:\s]*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21',
-            # Herhangi bir IBAN (TR ile başlayan 26 haneli)
-            r'TR\s*\d{2}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{2}',
-        ]
-        
-        for pattern in patterns_to_remove:
-            desc = re.sub(pattern, '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # "Banka Bilgileri:" başlığını da temizle (yalnız kaldıysa)
-        desc = re.sub(r'Banka\s+Bilgileri\s*[:\s]*$', '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        desc = re.sub(r'^Banka\s+Bilgileri\s*[:\s]*', '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # Sadece fazla boşlukları temizle - satır sonlarını KORUR
-        desc = re.sub(r' +', ' ', desc)  # Sadece boşlukları tek boşluğa indir
-        desc = desc.strip()  # Başındaki ve sonundaki boşlukları temizle
-        
-        return desc
+        return clean_bank_info(description)
     
     def secure_login(self) -> bool:
         """
@@ -392,9 +367,7 @@ class IsbasiAPIDataExtractor:
             # Description alanından banka bilgilerini temizle
             if 'description' in df_filtered.columns:
                 logger.info("🧹 Description alanındaki banka bilgileri temizleniyor...")
-                df_filtered['description'] = df_filtered['description'].apply(
-                    self.clean_bank_info_from_description
-                )
+                df_filtered['description'] = clean_bank_info_series(df_filtered['description'])
                 logger.info("✅ Banka bilgileri temizlendi")
             
             # Excel'e kaydet
@@ -453,6 +426,10 @@ class IsbasiAPIDataExtractor:
                     total_amount = df_filtered['totalTL'].sum()
                     worksheet.write(last_row + 5, 0, f'Toplam Tutar: {total_amount:,.2f} ₺', header_format)
             
+            # Excel'den sonra yazılır: okuyucular daha yeni olan JSONL'i tercih eder
+            write_table(self.table_files['invoices'], df_filtered.columns,
+                        df_filtered.itertuples(index=False, name=None))
+            
             logger.info(f"✅ Tüm fatura verileri kaydedildi: {self.excel_files['invoices']}")
             print(f"📊 {len(df_filtered)} fatura kaydı işlendi")
             return True
@@ -10,11 +10,18 @@ AK GİPS ve FULLBOARD yapılarıyla tutarlılık için ayrı bir API DB oluştur
 
 import sqlite3
 import os
-import re
+import sys
 from pathlib import Path
 from typing import Dict, List
 import logging
 
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.connection import get_connection
+from src.parsers.description_parser import clean_bank_info, extract_irsaliye_numbers
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,7 +51,7 @@ class APIDatabase:
         Returns:
             sqlite3.Connection: Veritabanı bağlantısı
         """
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_connection(str(self.db_path))
         cursor = conn.cursor()
         
         # Ana fatura tablosu (API verilerine özel)
@@ -106,24 +113,7 @@ class APIDatabase:
         Returns:
             List[str]: Bulunan irsaliye numaraları listesi
         """
-        if not description:
-            return []
-        
-        irsaliye_numbers = []
-        
-        # Pattern 1: IRS veya İRS ile başlayanlar
-        pattern1 = r'[İI]RS[-\s]?(\d{5,})'
-        matches1 = re.findall(pattern1, description, re.IGNORECASE)
-        for match in matches1:
-            irsaliye_numbers.append(f"IRS{match}")
-        
-        # Pattern 2: A- veya F- prefix'li numaralar
-        pattern2 = r'([AF])-(\d{5,})'
-        matches2 = re.findall(pattern2, description, re.IGNORECASE)
-        for match in matches2:
-            irsaliye_numbers.append(f"{match[0]}-{match[1]}")
-        
-        return list(set(irsaliye_numbers))  # Duplicate'leri temizle
+        return extract_irsaliye_numbers(description)
     
     @staticmethod
     def clean_bank_info_from_description(description: str) -> str:
@@ -137,38 +127,7 @@ class APIDatabase:
         Returns:
             Temizlenmiş açıklama metni (irsaliye bilgileri korunur)
         """
-        if not description:
-            return ""
-        
-        desc = str(description)
-        
-        # SADECE banka bilgisi içeren spesifik pattern'leri temizle
-        # ÇOK SPESİFİK - sadece kesin banka bilgilerini temizler
-        patterns_to_remove = [
-            # Spesifik GARANTİBANK IBAN'ı (Excel format)
-            r'Banka\s+Bilgileri\s*[:\s]*_x000D_\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*_x000D_',
-            # Spesifik GARANTİBANK IBAN'ı (normal format)
-            r'Banka\s+Bilgileri\s*[:\s]*[\r\n]+\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*[\r\n]+',
-            # Spesifik GARANTİBANK IBAN'ı (HTML format)
-            r'Banka\s+Bilgileri\s*[:\s]*<br\s*/?>\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*<br\s*/?>',
-            # Spesifik GARANTİBANK IBAN'ı (tek satır)
-            r'Banka\s+Bilgileri\s*[:\s]*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21',
-            # Herhangi bir IBAN (TR ile başlayan 26 haneli)
-            r'TR\s*\d{2}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{2}',
-        ]
-        
-        for pattern in patterns_to_remove:
-            desc = re.sub(pattern, '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # "Banka Bilgileri:" başlığını da temizle (yalnız kaldıysa)
-        desc = re.sub(r'Banka\s+Bilgileri\s*[:\s]*$', '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        desc = re.sub(r'^Banka\s+Bilgileri\s*[:\s]*', '', desc, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # Sadece fazla boşlukları temizle - satır sonlarını KORUR
-        desc = re.sub(r' +', ' ', desc)  # Sadece boşlukları tek boşluğa indir
-        desc = desc.strip()  # Başındaki ve sonundaki boşlukları temizle
-        
-        return desc
+        return clean_bank_info(description)
     
     def insert_invoice(self, conn: sqlite3.Connection, invoice_data: Dict) -> int:
         """
@@ -294,7 +253,7 @@ class APIDatabase:
         Returns:
             Dict: İstatistik bilgileri
         """
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_connection(str(self.db_path))
         cursor = conn.cursor()
         
         stats = {}
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ortak SQLite Bağlantı Yönetimi
+==============================
+
+Tüm modüller veritabanına get_connection() ile bağlanır:
+- Her bağlantıda ayarlı PRAGMA'lar (WAL, synchronous=NORMAL, mmap, cache,
+  temp_store=MEMORY, busy_timeout, foreign_keys)
+- Thread başına bağlantı havuzu: close() bağlantıyı kapatmaz, havuza iade
+  eder; aynı thread'deki sonraki çağrı bağlantıyı ve şema önbelleğini
+  yeniden kullanır
+- WAL modunda okuyucular yazanı, yazan okuyucuları beklemez
+
+Mevcut "conn = sqlite3.connect(...) ... conn.close()" kalıbı aynen çalışır;
+iade sırasında açık transaction geri alınır (commit edilmeyen değişiklik
+kapatmadaki gibi kaybolur) ve row_factory / isolation_level sıfırlanır.
+
+Kullanım:
+    from src.database.connection import get_connection
+    
+    conn = get_connection(db_path)
+    conn.row_factory = sqlite3.Row
+    ...
+    conn.close()   # havuza iade
+    
+    backup_database(db_path, backup_path)   # WAL içeriği dahil yedek
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+
+# Bağlantı açılırken uygulanan PRAGMA'lar (sıra önemli: journal_mode önce)
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,    # 256 MB
+    'cache_size': -32 * 1024,          # 32 MB (negatif = KB)
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,              # ms
+    'foreign_keys': 'ON',
+}
+
+# Thread ve veritabanı başına havuzda bekletilen en fazla boş bağlantı
+MAX_IDLE_PER_THREAD = 4
+
+_local = threading.local()
+
+
+class PooledConnection(sqlite3.Connection):
+    """close() çağrısında havuza dönen sqlite3 bağlantısı"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool_key = None
+        self._idle = False
+    
+    def close(self):
+        """Bağlantıyı havuza iade et (havuz doluysa gerçekten kapat)"""
+        if self._idle:
+            return
+        if self._pool_key is None:
+            super().close()
+            return
+        
+        try:
+            if self.in_transaction:
+                self.rollback()
+            self.row_factory = None
+            self.text_factory = str
+            self.isolation_level = ''
+        except sqlite3.Error:
+            super().close()
+            return
+        
+        idle = _thread_pool().setdefault(self._pool_key, [])
+        if len(idle) < MAX_IDLE_PER_THREAD:
+            self._idle = True
+            idle.append(self)
+        else:
+            super().close()
+    
+    def close_permanently(self):
+        """Havuza iade etmeden kapat"""
+        self._idle = False
+        super().close()
+
+
+def _thread_pool() -> Dict[str, List[PooledConnection]]:
+    """Bu thread'in boş bağlantı havuzu"""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+    return pool
+
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def get_connection(db_path, isolation_level: str = '', timeout: float = 5.0) -> sqlite3.Connection:
+    """
+    Havuzdan (yoksa yeni) ayarlı bağlantı al
+    
+    Args:
+        db_path: Veritabanı dosya yolu (':memory:' havuzlanmaz)
+        isolation_level: sqlite3 isolation_level ('' varsayılan, None = autocommit)
+        timeout: Kilit bekleme süresi (sn)
+    
+    Returns:
+        sqlite3.Connection (PooledConnection)
+    """
+    db_path = str(db_path)
+    if db_path == ':memory:' or db_path.startswith('file:'):
+        conn = sqlite3.connect(db_path, timeout=timeout, uri=db_path.startswith('file:'))
+        conn.isolation_level = isolation_level
+        return conn
+    
+    key = os.path.abspath(db_path)
+    idle = _thread_pool().get(key)
+    
+    if idle:
+        conn = idle.pop()
+        conn._idle = False
+    else:
+        conn = sqlite3.connect(key, timeout=timeout, factory=PooledConnection)
+        _apply_pragmas(conn)
+        conn._pool_key = key
+    
+    conn.isolation_level = isolation_level
+    return conn
+
+
+def close_all(db_path=None) -> int:
+    """
+    Bu thread'deki boş bağlantıları kapat
+    
+    Veritabanı dosyası silinip yeniden oluşturulmadan önce çağrılmalı.
+    
+    Args:
+        db_path: Sadece bu veritabanı (None ise tümü)
+    
+    Returns:
+        Kapatılan bağlantı sayısı
+    """
+    pool = _thread_pool()
+    keys = [os.path.abspath(str(db_path))] if db_path else list(pool)
+    
+    closed = 0
+    for key in keys:
+        for conn in pool.pop(key, []):
+            conn.close_permanently()
+            closed += 1
+    return closed
+
+
+def backup_database(db_path, backup_path) -> Path:
+    """
+    Çevrimiçi yedek al (sqlite3 backup API)
+    
+    WAL modunda son değişiklikler -wal dosyasında olabilir; dosya kopyalamak
+    yerine bu fonksiyon kullanılmalı.
+    """
+    backup_path = Path(backup_path)
+    source = get_connection(db_path)
+    target = sqlite3.connect(str(backup_path))
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return backup_path
+
+
+@atexit.register
+def _close_main_thread_pool():
+    """Çıkışta havuzdaki bağlantıları kapat (WAL checkpoint + -wal temizliği)"""
+    close_all()
@@ -7,8 +7,14 @@
 - API verileri: API prefix (İşbaşı API)
 """
 
-import sqlite3
 import os
+import sys
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.database.connection import get_connection
+from src.parsers.description_parser import normalize_irs_number
 
 def create_merged_database():
     """Birleşik veritabanı şemasını oluşturur"""
@@ -16,7 +22,7 @@ def create_merged_database():
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     os.chdir(project_root)
     
-    conn = sqlite3.connect('data/db/birlesik.db')
+    conn = get_connection('data/db/birlesik.db')
     cursor = conn.cursor()
     
     # Ana fatura tablosu (firma_kodu eklendi)
@@ -73,10 +79,16 @@ def create_merged_database():
             unit_price REAL,
             line_total REAL,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            despatch_id_full TEXT,
             FOREIGN KEY (invoice_id) REFERENCES invoices (id)
         )
     ''')
     
+    # Eski birleşik DB'lerde satır -> irsaliye sütunu yoksa ekle
+    cursor.execute("PRAGMA table_info(invoice_lines)")
+    if 'despatch_id_full' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE invoice_lines ADD COLUMN despatch_id_full TEXT")
+    
     # UNIQUE INDEX ekle - aynı faturanın aynı satırı tekrar edilemez
     cursor.execute('''
         CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_invoice_line 
@@ -92,11 +104,17 @@ def create_merged_database():
             despatch_id_short TEXT NOT NULL,
             issue_date TEXT,
             description TEXT,
+            irs_normalized TEXT,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (invoice_id) REFERENCES invoices (id)
         )
     ''')
     
+    # Eski birleşik DB'lerde irs_normalized sütunu yoksa ekle
+    cursor.execute("PRAGMA table_info(despatch_documents)")
+    if 'irs_normalized' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE despatch_documents ADD COLUMN irs_normalized TEXT")
+    
     # UNIQUE INDEX ekle - aynı firma_kodu + invoice_number kombinasyonu tekrar edilemez
     cursor.execute('''
         CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_invoice 
@@ -128,7 +146,7 @@ def merge_databases():
     print("📊 AK GİPS verileri aktarılıyor...")
     
     if os.path.exists('data/db/akgips.db'):
-        ak_conn = sqlite3.connect('data/db/akgips.db')
+        ak_conn = get_connection('data/db/akgips.db')
         ak_cursor = ak_conn.cursor()
         
         # Faturaları kopyala
@@ -180,12 +198,15 @@ def merge_databases():
         ak_cursor.execute('SELECT * FROM invoice_lines')
         for line in ak_cursor.fetchall():
             merged_cursor.execute('''
-                INSERT OR IGNORE INTO invoice_lines (
+                INSERT INTO invoice_lines (
                     invoice_id, line_id, item_name, quantity, unit,
-                    unit_price, line_total
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    unit_price, line_total, despatch_id_full
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(invoice_id, line_id) DO UPDATE SET
+                    despatch_id_full = COALESCE(invoice_lines.despatch_id_full, excluded.despatch_id_full)
             ''', (invoice_id_map[line[1]], line[2], line[3], line[4],
-                  line[5], line[6], line[7]))
+                  line[5], line[6], line[7],
+                  line[9] if len(line) > 9 else None))  # despatch_id_full (eski DB'lerde yok)
         
         # İrsaliyeleri kopyala (parser zaten A- prefix ekliyor)
         ak_cursor.execute('SELECT * FROM despatch_documents')
@@ -197,9 +218,10 @@ def merge_databases():
             merged_cursor.execute('''
                 INSERT INTO despatch_documents (
                     invoice_id, despatch_id_full, despatch_id_short,
-                    issue_date, description
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (invoice_id_map[desp[1]], full_id, short_id, desp[4], desp[5]))
+                    issue_date, description, irs_normalized
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', (invoice_id_map[desp[1]], full_id, short_id, desp[4], desp[5],
+                  normalize_irs_number(short_id)))
         
         ak_conn.close()
         print(f"  ✓ {len(invoices)} AK GİPS faturası eklendi (A- prefix)")
@@ -213,7 +235,7 @@ def merge_databases():
     
     fullboard_db_path = 'data/db/fullboard.db'
     if os.path.exists(fullboard_db_path):
-        fb_conn = sqlite3.connect(fullboard_db_path)
+        fb_conn = get_connection(fullboard_db_path)
         fb_cursor = fb_conn.cursor()
         
         # Faturaları kopyala
@@ -265,12 +287,15 @@ def merge_databases():
         fb_cursor.execute('SELECT * FROM invoice_lines')
         for line in fb_cursor.fetchall():
             merged_cursor.execute('''
-                INSERT OR IGNORE INTO invoice_lines (
+                INSERT INTO invoice_lines (
                     invoice_id, line_id, item_name, quantity, unit,
-                    unit_price, line_total
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    unit_price, line_total, despatch_id_full
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(invoice_id, line_id) DO UPDATE SET
+                    despatch_id_full = COALESCE(invoice_lines.despatch_id_full, excluded.despatch_id_full)
             ''', (invoice_id_map[line[1]], line[2], line[3], line[4],
-                  line[5], line[6], line[7]))
+                  line[5], line[6], line[7],
+                  line[9] if len(line) > 9 else None))  # despatch_id_full (eski DB'lerde yok)
         
         # İrsaliyeleri kopyala (parser zaten F- prefix ekliyor)
         fb_cursor.execute('SELECT * FROM despatch_documents')
@@ -282,9 +307,10 @@ def merge_databases():
             merged_cursor.execute('''
                 INSERT INTO despatch_documents (
                     invoice_id, despatch_id_full, despatch_id_short,
-                    issue_date, description
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (invoice_id_map[desp[1]], full_id, short_id, desp[4], desp[5]))
+                    issue_date, description, irs_normalized
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', (invoice_id_map[desp[1]], full_id, short_id, desp[4], desp[5],
+                  normalize_irs_number(short_id)))
         
         fb_conn.close()
         print(f"  ✓ {len(invoices)} FULLBOARD faturası eklendi (F- prefix)")
@@ -296,7 +322,7 @@ def merge_databases():
     
     api_db_path = 'data/db/api.db'
     if os.path.exists(api_db_path):
-        api_conn = sqlite3.connect(api_db_path)
+        api_conn = get_connection(api_db_path)
         api_cursor = api_conn.cursor()
         
         # API invoices tablosunu kontrol et
@@ -381,12 +407,14 @@ def merge_databases():
                     
                     # İrsaliye numarasını despatch_documents tablosuna ekle
                     # API prefix ile ekle
+                    short_id = f'API-{irsaliye_no}'
                     merged_cursor.execute('''
                         INSERT INTO despatch_documents (
                             invoice_id, despatch_id_full, despatch_id_short,
-                            issue_date, description
-                        ) VALUES (?, ?, ?, ?, ?)
-                    ''', (new_invoice_id, irsaliye_no, f'API-{irsaliye_no}', None, None))
+                            issue_date, description, irs_normalized
+                        ) VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (new_invoice_id, irsaliye_no, short_id, None, None,
+                          normalize_irs_number(short_id)))
             
             api_conn.close()
             print(f"  ✓ {len(api_invoices)} API faturası eklendi (API prefix)")
@@ -405,7 +433,7 @@ def merge_databases():
     print()
     
     # Özet
-    conn = sqlite3.connect('data/db/birlesik.db')
+    conn = get_connection('data/db/birlesik.db')
     cursor = conn.cursor()
     
     cursor.execute("SELECT COUNT(*) FROM invoices WHERE firma_kodu = 'A'")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fatura Ödeme Durumu Kuralı (SQL)
+================================
+
+paid_amount / remaining_amount / payment_status değerlerinin SQL ifadeleri.
+Şema katmanındaki payment_records trigger'ları (schema_migration) ile
+PaymentManager'ın toplu yeniden hesaplama ve tutarlılık kontrolü aynı
+kuralı buradan alır.
+
+Kullanım:
+    from src.database.payment_status import payment_status_assignments
+    
+    sql = f"UPDATE invoices SET {payment_status_assignments('COALESCE(paid_amount, 0)')} WHERE id = ?"
+    cursor.execute(sql, (invoice_id,))
+"""
+
+
+# Ödeme durumu kuralı ({total}: fatura toplamı, {paid}: ödenen toplam ifadesi).
+# Kuruş altı farklar yuvarlanır.
+REMAINING_RULE = "MAX(0, ROUND({total} - {paid}, 2))"
+STATUS_RULE = """CASE
+                WHEN ROUND({total} - {paid}, 2) <= 0 THEN 'PAID'
+                WHEN {paid} > 0 THEN 'PARTIAL'
+                ELSE 'UNPAID'
+            END"""
+
+# Ödeme yazımlarında faturayı güncelleyen trigger'lar
+PAYMENT_STATUS_TRIGGERS = [
+    'trg_payment_status_insert',
+    'trg_payment_status_update',
+    'trg_payment_status_delete',
+]
+
+
+def payment_status_assignments(paid: str, total: str = "COALESCE(total_amount, 0)") -> str:
+    """UPDATE invoices SET ... için paid_amount / remaining_amount / payment_status atamaları"""
+    return (
+        f"paid_amount = {paid},\n"
+        f"            remaining_amount = {REMAINING_RULE.format(total=total, paid=paid)},\n"
+        f"            payment_status = {STATUS_RULE.format(total=total, paid=paid)}"
+    )
@@ -8,16 +8,27 @@ Mevcut veritabanını yeni finansal takip sistemine uygun hale getirir.
 
 Yapılan Değişiklikler:
 1. invoices tablosuna yeni sütunlar ekler (invoice_type, payment_status, vb.)
-2. Yeni tablolar oluşturur (payment_records, irs_matching, balance_snapshots, line_matching)
+   despatch_documents tablosuna normalize IRS sütunu ekler (irs_normalized)
+2. Yeni tablolar oluşturur (payment_records, irs_matching, irs_reconciliation, balance_snapshots, line_matching)
+   ve artımlı IRS eşleştirme için takip tabloları/trigger'ları (sales_irs, irs_match_changes)
 3. Performance için index'ler ekler
 4. Mevcut verileri günceller (invoice_type ataması)
+5. Trigger'larla güncel tutulan bilanço özeti ve defterini oluşturur (balance_summary, balance_ledger)
+   ve ödeme kayıtlarından fatura ödeme durumunu artımlı güncelleyen trigger'ları kurar
 """
 
-import sqlite3
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import backup_database, get_connection
+from src.database.payment_status import PAYMENT_STATUS_TRIGGERS, payment_status_assignments
+from src.parsers.description_parser import normalize_irs_number
+
 
 class DatabaseMigration:
     """Veritabanı migration işlemlerini yöneten sınıf"""
@@ -48,9 +59,8 @@ class DatabaseMigration:
             
             self.backup_path = backup_dir / f"birlesik_backup_{timestamp}.db"
             
-            # SQLite veritabanını kopyala
-            import shutil
-            shutil.copy2(self.db_path, self.backup_path)
+            # SQLite backup API (WAL dosyasındaki son değişiklikler dahil)
+            backup_database(self.db_path, self.backup_path)
             
             print(f"✅ Backup oluşturuldu: {self.backup_path}")
             return True
@@ -101,6 +111,38 @@ class DatabaseMigration:
         
         return added_count
     
+    def add_irs_normalized_column(self, cursor) -> int:
+        """
+        despatch_documents tablosuna irs_normalized sütununu ekle ve doldur
+        
+        IRS eşleştirmesi her çalıştırmada normalize etmek yerine bu sütunu
+        index üzerinden kullanır. Yeni kayıtlar merge sırasında doldurulur.
+        
+        Returns:
+            Doldurulan kayıt sayısı
+        """
+        print("\n🔢 despatch_documents.irs_normalized hazırlanıyor...")
+        
+        if not self.check_column_exists(cursor, 'despatch_documents', 'irs_normalized'):
+            cursor.execute("ALTER TABLE despatch_documents ADD COLUMN irs_normalized TEXT")
+            print("  ✅ Eklendi: irs_normalized")
+        else:
+            print("  ⏭️  Zaten var: irs_normalized")
+        
+        # Normalizasyon Python tarafında (description_parser ile aynı kural)
+        cursor.connection.create_function(
+            "normalize_irs", 1, normalize_irs_number, deterministic=True
+        )
+        cursor.execute("""
+            UPDATE despatch_documents
+            SET irs_normalized = normalize_irs(despatch_id_short)
+            WHERE irs_normalized IS NULL
+        """)
+        updated = cursor.rowcount
+        
+        print(f"  ✅ {updated} irsaliye için normalize numara hesaplandı")
+        return updated
+    
     def create_payment_records_table(self, cursor) -> bool:
         """Ödeme kayıtları tablosunu oluştur"""
         if self.check_table_exists(cursor, 'payment_records'):
@@ -149,6 +191,417 @@ class DatabaseMigration:
         print("  ✅ irs_matching tablosu oluşturuldu")
         return True
     
+    def create_irs_reconciliation_table(self, cursor) -> bool:
+        """Çoka-çok irsaliye mutabakatı (tutar dağıtımı) tablosunu oluştur"""
+        if self.check_table_exists(cursor, 'irs_reconciliation'):
+            print("  ⏭️  irs_reconciliation tablosu zaten var")
+            return False
+        
+        cursor.execute("""
+            CREATE TABLE irs_reconciliation (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                irs_number TEXT NOT NULL,
+                irs_normalized TEXT NOT NULL,
+                purchase_invoice_id INTEGER NOT NULL,
+                sales_invoice_id INTEGER NOT NULL,
+                purchase_share REAL,
+                sales_share REAL,
+                purchase_amount REAL,
+                sales_amount REAL,
+                profit_loss REAL,
+                profit_margin REAL,
+                status TEXT,
+                allocation_method TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (purchase_invoice_id) REFERENCES invoices (id),
+                FOREIGN KEY (sales_invoice_id) REFERENCES invoices (id)
+            )
+        """)
+        print("  ✅ irs_reconciliation tablosu oluşturuldu")
+        return True
+    
+    def create_irs_tracking_tables(self, cursor) -> bool:
+        """
+        Artımlı (incremental) IRS eşleştirme için takip tablolarını oluştur
+        
+        - sales_irs: Satış faturası -> description'dan çıkarılan normalize IRS
+        - irs_match_changes: Son eşleştirmeden beri değişen fatura ID'leri
+          (invoices ve despatch_documents üzerindeki trigger'larla dolar)
+        """
+        if self.check_table_exists(cursor, 'irs_match_changes'):
+            print("  ⏭️  IRS takip tabloları zaten var")
+            return False
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sales_irs (
+                invoice_id INTEGER NOT NULL,
+                irs_normalized TEXT NOT NULL,
+                PRIMARY KEY (invoice_id, irs_normalized),
+                FOREIGN KEY (invoice_id) REFERENCES invoices (id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sales_irs_normalized
+            ON sales_irs(irs_normalized)
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE irs_match_changes (
+                invoice_id INTEGER PRIMARY KEY,
+                queued_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Eşleştirmeyi etkileyen sütunlar (ödeme sütunları bilerek hariç)
+        triggers = [
+            ("trg_irs_invoice_insert", "AFTER INSERT ON invoices", ["NEW.id"]),
+            ("trg_irs_invoice_update",
+             "AFTER UPDATE OF invoice_type, invoice_number, issue_date, total_amount, "
+             "description, supplier_name, customer_name, firma_kodu ON invoices",
+             ["NEW.id"]),
+            ("trg_irs_invoice_delete", "AFTER DELETE ON invoices", ["OLD.id"]),
+            ("trg_irs_despatch_insert", "AFTER INSERT ON despatch_documents", ["NEW.invoice_id"]),
+            ("trg_irs_despatch_update", "AFTER UPDATE ON despatch_documents",
+             ["OLD.invoice_id", "NEW.invoice_id"]),
+            ("trg_irs_despatch_delete", "AFTER DELETE ON despatch_documents", ["OLD.invoice_id"]),
+        ]
+        
+        for trigger_name, event, values in triggers:
+            statements = "".join(
+                f"INSERT OR IGNORE INTO irs_match_changes (invoice_id) VALUES ({value}); "
+                for value in values
+            )
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger_name} {event}
+                BEGIN {statements}END
+            """)
+        
+        # Mevcut tüm faturalar ilk artımlı çalıştırmada işlensin
+        cursor.execute("INSERT OR IGNORE INTO irs_match_changes (invoice_id) SELECT id FROM invoices")
+        
+        print("  ✅ IRS takip tabloları ve trigger'ları oluşturuldu")
+        return True
+    
+    def create_payment_status_triggers(self, cursor) -> bool:
+        """
+        Fatura ödeme durumunu artımlı güncelleyen trigger'ları oluştur
+        
+        payment_records ekleme/güncelleme/silme işlemlerinde faturanın
+        paid_amount değeri ödeme tutarı kadar değiştirilir; remaining_amount ve
+        payment_status PaymentManager ile aynı kuralla aynı UPDATE içinde
+        hesaplanır. Yeni eklenen faturaların kalan tutarı ve toplam tutarı
+        değişen faturaların durumu da trigger'larla güncellenir; toplu
+        yüklemelerden sonra ayrıca yeniden hesaplama gerekmez.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+            (PAYMENT_STATUS_TRIGGERS[0],)
+        )
+        if cursor.fetchone():
+            print("  ⏭️  Ödeme durumu trigger'ları zaten var")
+            return False
+        
+        def apply_payment(row, delta):
+            """row.invoice_id faturasının ödenen tutarına delta ekle"""
+            return f"""
+                UPDATE invoices
+                SET {payment_status_assignments(f"ROUND(COALESCE(paid_amount, 0) {delta}, 2)")}
+                WHERE id = {row}.invoice_id;"""
+        
+        refresh_invoice = f"""
+                UPDATE invoices
+                SET {payment_status_assignments("COALESCE(paid_amount, 0)")}
+                WHERE id = NEW.id;"""
+        
+        insert_trigger, update_trigger, delete_trigger = PAYMENT_STATUS_TRIGGERS
+        triggers = [
+            (insert_trigger, "AFTER INSERT ON payment_records",
+             apply_payment('NEW', '+ NEW.amount')),
+            (update_trigger,
+             "AFTER UPDATE OF invoice_id, amount ON payment_records "
+             "WHEN OLD.invoice_id IS NOT NEW.invoice_id OR OLD.amount IS NOT NEW.amount",
+             apply_payment('OLD', '- OLD.amount') + apply_payment('NEW', '+ NEW.amount')),
+            (delete_trigger, "AFTER DELETE ON payment_records",
+             apply_payment('OLD', '- OLD.amount')),
+            ("trg_payment_status_invoice_insert",
+             "AFTER INSERT ON invoices WHEN NEW.remaining_amount IS NULL",
+             refresh_invoice),
+            ("trg_payment_status_invoice_total",
+             "AFTER UPDATE OF total_amount ON invoices WHEN OLD.total_amount IS NOT NEW.total_amount",
+             refresh_invoice),
+        ]
+        
+        for trigger_name, event, statements in triggers:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger_name} {event}
+                BEGIN {statements}
+                END
+            """)
+        
+        # Başlangıç durumu: ödemesi olan faturaları ödeme kayıtlarıyla eşitle
+        cursor.execute(f"""
+            UPDATE invoices
+            SET {payment_status_assignments("ROUND(p.total_paid, 2)")}
+            FROM (
+                SELECT invoice_id, SUM(amount) as total_paid
+                FROM payment_records
+                GROUP BY invoice_id
+            ) p
+            WHERE invoices.id = p.invoice_id
+        """)
+        
+        print("  ✅ Ödeme durumu trigger'ları oluşturuldu")
+        return True
+    
+    def create_balance_summary_table(self, cursor) -> bool:
+        """
+        Bilanço özet tablosunu oluştur (trigger'larla güncel tutulur)
+        
+        - PURCHASE / SALES: fatura sayısı, toplam, ödenen, kalan
+        - MATCH: eşleşme sayısı, toplam kar, toplam zarar, kar marjı toplamı
+        
+        BalanceCalculator bu tablo varsa faturaları taramak yerine 3 satır okur.
+        """
+        if self.check_table_exists(cursor, 'balance_summary'):
+            print("  ⏭️  balance_summary tablosu zaten var")
+            return False
+        
+        cursor.execute("""
+            CREATE TABLE balance_summary (
+                bucket TEXT PRIMARY KEY,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                total_amount REAL NOT NULL DEFAULT 0,
+                paid_amount REAL NOT NULL DEFAULT 0,
+                remaining_amount REAL NOT NULL DEFAULT 0,
+                total_profit REAL NOT NULL DEFAULT 0,
+                total_loss REAL NOT NULL DEFAULT 0,
+                margin_sum REAL NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        
+        # Fatura satırının özete katkısı (sign: +1 ekle, -1 çıkar)
+        def invoice_delta(row, sign):
+            return f"""
+                UPDATE balance_summary SET
+                    item_count = item_count {sign} 1,
+                    total_amount = total_amount {sign} COALESCE({row}.total_amount, 0),
+                    paid_amount = paid_amount {sign} COALESCE({row}.paid_amount, 0),
+                    remaining_amount = remaining_amount {sign} COALESCE({row}.remaining_amount, 0)
+                WHERE bucket = {row}.invoice_type;"""
+        
+        # Eşleşme satırının özete katkısı (MatchFrame ile aynı formüller;
+        # BalanceCalculator.check_match_consistency() karşılaştırır)
+        def match_delta(row, sign):
+            profit = f"(COALESCE({row}.sales_amount, 0) - COALESCE({row}.purchase_amount, 0))"
+            return f"""
+                UPDATE balance_summary SET
+                    item_count = item_count {sign} 1,
+                    total_profit = total_profit {sign} MAX({profit}, 0),
+                    total_loss = total_loss {sign} MAX(-{profit}, 0),
+                    margin_sum = margin_sum {sign} (CASE WHEN {row}.purchase_amount > 0
+                        THEN {profit} * 100.0 / {row}.purchase_amount ELSE 0 END)
+                WHERE bucket = 'MATCH';"""
+        
+        triggers = [
+            ("trg_balance_invoice_insert", "AFTER INSERT ON invoices",
+             invoice_delta("NEW", "+")),
+            ("trg_balance_invoice_update",
+             "AFTER UPDATE OF invoice_type, total_amount, paid_amount, remaining_amount ON invoices",
+             invoice_delta("OLD", "-") + invoice_delta("NEW", "+")),
+            ("trg_balance_invoice_delete", "AFTER DELETE ON invoices",
+             invoice_delta("OLD", "-")),
+            ("trg_balance_match_insert", "AFTER INSERT ON irs_matching",
+             match_delta("NEW", "+")),
+            ("trg_balance_match_update",
+             "AFTER UPDATE OF purchase_amount, sales_amount ON irs_matching",
+             match_delta("OLD", "-") + match_delta("NEW", "+")),
+            ("trg_balance_match_delete", "AFTER DELETE ON irs_matching",
+             match_delta("OLD", "-")),
+        ]
+        
+        for trigger_name, event, statements in triggers:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger_name} {event}
+                BEGIN {statements}
+                END
+            """)
+        
+        self.rebuild_balance_summary(cursor)
+        
+        print("  ✅ balance_summary tablosu ve trigger'ları oluşturuldu")
+        return True
+    
+    def rebuild_balance_summary(self, cursor) -> None:
+        """balance_summary tablosunu invoices ve irs_matching'den yeniden hesapla"""
+        cursor.execute("DELETE FROM balance_summary")
+        cursor.execute("""
+            INSERT INTO balance_summary (bucket) VALUES ('PURCHASE'), ('SALES'), ('MATCH')
+        """)
+        cursor.execute("""
+            UPDATE balance_summary SET
+                item_count = t.item_count,
+                total_amount = t.total_amount,
+                paid_amount = t.paid_amount,
+                remaining_amount = t.remaining_amount
+            FROM (
+                SELECT
+                    invoice_type,
+                    COUNT(*) as item_count,
+                    COALESCE(SUM(total_amount), 0) as total_amount,
+                    COALESCE(SUM(paid_amount), 0) as paid_amount,
+                    COALESCE(SUM(remaining_amount), 0) as remaining_amount
+                FROM invoices
+                GROUP BY invoice_type
+            ) t
+            WHERE balance_summary.bucket = t.invoice_type
+        """)
+        cursor.execute("""
+            UPDATE balance_summary SET
+                item_count = t.item_count,
+                total_profit = t.total_profit,
+                total_loss = t.total_loss,
+                margin_sum = t.margin_sum
+            FROM (
+                SELECT
+                    COUNT(*) as item_count,
+                    COALESCE(SUM(MAX(profit, 0)), 0) as total_profit,
+                    COALESCE(SUM(MAX(-profit, 0)), 0) as total_loss,
+                    COALESCE(SUM(CASE WHEN purchase_amount > 0
+                        THEN profit * 100.0 / purchase_amount ELSE 0 END), 0) as margin_sum
+                FROM (
+                    SELECT
+                        purchase_amount,
+                        COALESCE(sales_amount, 0) - COALESCE(purchase_amount, 0) as profit
+                    FROM irs_matching
+                )
+            ) t
+            WHERE balance_summary.bucket = 'MATCH'
+        """)
+    
+    # Bilanço defteri sütunları -> fatura/eşleşme satırının katkısı
+    # (balance_snapshots ile aynı sütun adları; {row} = NEW veya OLD)
+    LEDGER_INVOICE_COLUMNS = {
+        'total_purchases': "CASE WHEN {row}.invoice_type = 'PURCHASE' THEN COALESCE({row}.total_amount, 0) ELSE 0 END",
+        'total_paid_to_suppliers': "CASE WHEN {row}.invoice_type = 'PURCHASE' THEN COALESCE({row}.paid_amount, 0) ELSE 0 END",
+        'outstanding_payables': "CASE WHEN {row}.invoice_type = 'PURCHASE' THEN COALESCE({row}.remaining_amount, 0) ELSE 0 END",
+        'total_sales': "CASE WHEN {row}.invoice_type = 'SALES' THEN COALESCE({row}.total_amount, 0) ELSE 0 END",
+        'total_received_from_customers': "CASE WHEN {row}.invoice_type = 'SALES' THEN COALESCE({row}.paid_amount, 0) ELSE 0 END",
+        'outstanding_receivables': "CASE WHEN {row}.invoice_type = 'SALES' THEN COALESCE({row}.remaining_amount, 0) ELSE 0 END",
+    }
+    LEDGER_MATCH_COLUMNS = {
+        'total_profit': "COALESCE({row}.sales_amount, 0) - COALESCE({row}.purchase_amount, 0)",
+        'total_matched_invoices': "1",
+    }
+    
+    def create_balance_ledger_table(self, cursor) -> bool:
+        """
+        Bilanço defteri (balance_ledger) tablosunu oluştur
+        
+        Bilançoyu etkileyen her olay (fatura ekleme/güncelleme/silme, ödeme,
+        eşleşme değişikliği) trigger'larla tek satır fark (delta) olarak yazılır.
+        İlk satır (OPENING) mevcut toplamları içerir; böylece:
+        - Snapshot = önceki snapshot + sonraki defter satırları
+        - Herhangi bir tarihteki bilanço = defterin o tarihe kadarki toplamı
+        """
+        if self.check_table_exists(cursor, 'balance_ledger'):
+            print("  ⏭️  balance_ledger tablosu zaten var")
+            return False
+        
+        columns = {**self.LEDGER_INVOICE_COLUMNS, **self.LEDGER_MATCH_COLUMNS}
+        column_defs = ",\n".join(f"                {name} REAL NOT NULL DEFAULT 0" for name in columns)
+        
+        cursor.execute(f"""
+            CREATE TABLE balance_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_time TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+                event_type TEXT NOT NULL,
+                invoice_id INTEGER,
+                match_id INTEGER,
+{column_defs}
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ledger_event_time
+            ON balance_ledger(event_time)
+        """)
+        
+        # Snapshot'ın defterde hangi satıra kadar olan durumu içerdiği
+        if not self.check_column_exists(cursor, 'balance_snapshots', 'ledger_id'):
+            cursor.execute("ALTER TABLE balance_snapshots ADD COLUMN ledger_id INTEGER")
+        
+        def ledger_insert(event_type, source_columns, id_column, id_row, sign_rows):
+            """sign_rows: [('+', 'NEW'), ('-', 'OLD')] gibi katkı listesi"""
+            names = list(source_columns)
+            values = [
+                " ".join(
+                    f"{sign} ({source_columns[name].format(row=row)})"
+                    for sign, row in sign_rows
+                )
+                for name in names
+            ]
+            return f"""
+                INSERT INTO balance_ledger (event_type, {id_column}, {', '.join(names)})
+                VALUES ({event_type}, {id_row}.id, {', '.join(values)});"""
+        
+        invoice_changed = " OR ".join(
+            f"OLD.{column} IS NOT NEW.{column}"
+            for column in ('invoice_type', 'total_amount', 'paid_amount', 'remaining_amount')
+        )
+        # Sadece ödeme sütunları değiştiyse olay tipi PAYMENT
+        invoice_update_type = (
+            "CASE WHEN OLD.invoice_type IS NEW.invoice_type "
+            "AND OLD.total_amount IS NEW.total_amount "
+            "THEN 'PAYMENT' ELSE 'INVOICE_UPDATE' END"
+        )
+        match_changed = "OLD.purchase_amount IS NOT NEW.purchase_amount OR OLD.sales_amount IS NOT NEW.sales_amount"
+        
+        invoice_columns = self.LEDGER_INVOICE_COLUMNS
+        match_columns = self.LEDGER_MATCH_COLUMNS
+        triggers = [
+            ("trg_ledger_invoice_insert", "AFTER INSERT ON invoices",
+             ledger_insert("'INVOICE_INSERT'", invoice_columns, 'invoice_id', 'NEW', [('+', 'NEW')])),
+            ("trg_ledger_invoice_update",
+             f"AFTER UPDATE OF invoice_type, total_amount, paid_amount, remaining_amount ON invoices "
+             f"WHEN {invoice_changed}",
+             ledger_insert(invoice_update_type, invoice_columns, 'invoice_id', 'NEW',
+                           [('+', 'NEW'), ('-', 'OLD')])),
+            ("trg_ledger_invoice_delete", "AFTER DELETE ON invoices",
+             ledger_insert("'INVOICE_DELETE'", invoice_columns, 'invoice_id', 'OLD', [('-', 'OLD')])),
+            ("trg_ledger_match_insert", "AFTER INSERT ON irs_matching",
+             ledger_insert("'MATCH_INSERT'", match_columns, 'match_id', 'NEW', [('+', 'NEW')])),
+            ("trg_ledger_match_update",
+             f"AFTER UPDATE OF purchase_amount, sales_amount ON irs_matching WHEN {match_changed}",
+             ledger_insert("'MATCH_UPDATE'", match_columns, 'match_id', 'NEW',
+                           [('+', 'NEW'), ('-', 'OLD')])),
+            ("trg_ledger_match_delete", "AFTER DELETE ON irs_matching",
+             ledger_insert("'MATCH_DELETE'", match_columns, 'match_id', 'OLD', [('-', 'OLD')])),
+        ]
+        
+        for trigger_name, event, statements in triggers:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger_name} {event}
+                BEGIN {statements}
+                END
+            """)
+        
+        # Açılış satırı: mevcut toplamlar
+        invoice_sums = ", ".join(
+            f"COALESCE(SUM({expr.format(row='invoices')}), 0)"
+            for expr in invoice_columns.values()
+        )
+        match_sums = ", ".join(
+            f"(SELECT COALESCE(SUM({expr.format(row='irs_matching')}), 0) FROM irs_matching)"
+            for expr in match_columns.values()
+        )
+        cursor.execute(f"""
+            INSERT INTO balance_ledger (event_type, {', '.join(columns)})
+            SELECT 'OPENING', {invoice_sums}, {match_sums}
+            FROM invoices
+        """)
+        
+        print("  ✅ balance_ledger tablosu ve trigger'ları oluşturuldu")
+        return True
+    
     def create_balance_snapshots_table(self, cursor) -> bool:
         """Bilanço snapshot tablosunu oluştur"""
         if self.check_table_exists(cursor, 'balance_snapshots'):
@@ -210,10 +663,27 @@ class DatabaseMigration:
             ("idx_payment_status", "invoices", "payment_status"),
             ("idx_firma_kodu", "invoices", "firma_kodu"),
             ("idx_irs_number", "irs_matching", "irs_number"),
+            ("idx_reconciliation_irs", "irs_reconciliation", "irs_normalized"),
+            ("idx_despatch_irs_normalized", "despatch_documents", "irs_normalized"),
+            ("idx_despatch_short", "despatch_documents", "despatch_id_short"),
+            ("idx_despatch_invoice", "despatch_documents", "invoice_id"),
             ("idx_payment_invoice", "payment_records", "invoice_id"),
             ("idx_snapshot_date", "balance_snapshots", "snapshot_date"),
+            # Yaşlandırma (aging) ve vade sorguları için bileşik index'ler
+            ("idx_invoice_type_issue", "invoices", "invoice_type, issue_date"),
+            ("idx_invoice_type_due", "invoices", "invoice_type, payment_due_date"),
+            ("idx_payment_invoice_date", "payment_records", "invoice_id, payment_date"),
+            # Aylık bölümlü export (firma + ay aralığı)
+            ("idx_invoice_firma_issue", "invoices", "firma_kodu, issue_date"),
+            # Web JSON API keyset sayfalama (issue_date DESC, id DESC)
+            ("idx_invoice_issue", "invoices", "issue_date"),
+            ("idx_invoice_status_issue", "invoices", "payment_status, issue_date"),
+            ("idx_despatch_issue", "despatch_documents", "issue_date"),
         ]
         
+        # Yerini idx_invoice_type_issue aldı (as-of yaşlandırma durum filtresi kullanmaz)
+        cursor.execute("DROP INDEX IF EXISTS idx_invoice_type_status_issue")
+        
         created_count = 0
         for index_name, table_name, column_name in indexes:
             try:
@@ -286,16 +756,19 @@ class DatabaseMigration:
                 return False
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # 1. invoices tablosuna sütunlar ekle
             self.add_columns_to_invoices(cursor)
+            self.add_irs_normalized_column(cursor)
             
             # 2. Yeni tabloları oluştur
             print("\n📋 Yeni tablolar oluşturuluyor...")
             self.create_payment_records_table(cursor)
             self.create_irs_matching_table(cursor)
+            self.create_irs_tracking_tables(cursor)
+            self.create_irs_reconciliation_table(cursor)
             self.create_balance_snapshots_table(cursor)
             self.create_line_matching_table(cursor)
             
@@ -306,6 +779,12 @@ class DatabaseMigration:
             self.populate_invoice_types(cursor)
             self.calculate_remaining_amounts(cursor)
             
+            # 5. Ödeme durumu trigger'ları, bilanço özet tablosu ve defteri
+            #    (güncel verilerle doldurulur)
+            self.create_payment_status_triggers(cursor)
+            self.create_balance_summary_table(cursor)
+            self.create_balance_ledger_table(cursor)
+            
             # Commit
             conn.commit()
             
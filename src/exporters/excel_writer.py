@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Akışlı (Streaming) Excel Yazıcı
+===============================
+
+Exporter'ların ortak yazma katmanı. xlsxwriter'ı constant_memory modunda
+kullanır: her satır yazıldığı anda geçici dosyaya aktarılır, bellekte
+çalışma kitabının tamamı tutulmaz. Veriler SQLite cursor'ından
+fetchmany() ile parça parça okunur.
+
+- Biçimler sütun başına bir kez oluşturulur (hücre başına stil nesnesi yok)
+- Satırlar yalnızca artan sırada yazılabilir (constant_memory kısıtı)
+- Sayfa sırası oluşturma sırasıdır; Özet gibi ilk sayfa önce eklenmeli
+
+Kullanım:
+    from src.exporters.excel_writer import StreamingExcelWriter, iter_rows
+    
+    writer = StreamingExcelWriter('cikti.xlsx')
+    ws = writer.add_sheet('Faturalar')
+    cursor.execute('SELECT invoice_number, total_amount FROM invoices')
+    writer.write_table(ws, [('Fatura No', 20, None), ('Tutar', 18, '#,##0.00')],
+                       iter_rows(cursor))
+    writer.close()
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import xlsxwriter
+
+
+# fetchmany() parça boyutu
+CHUNK_SIZE = 5000
+
+# Tutar sütunları için sayı biçimi
+NUMBER_FORMAT = '#,##0.00'
+
+# Tablo başlık stili (eski openpyxl çıktısıyla aynı görünüm)
+HEADER_STYLE = {
+    'bold': True,
+    'font_color': '#FFFFFF',
+    'font_size': 11,
+    'bg_color': '#366092',
+    'align': 'center',
+    'valign': 'vcenter',
+    'border': 1,
+}
+
+# Veri hücresi stili
+CELL_STYLE = {'border': 1}
+
+# (başlık, genişlik, sayı biçimi)
+Column = Tuple[str, float, Optional[str]]
+
+
+def iter_rows(cursor, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Cursor sonucunu fetchmany() parçalarıyla satır satır döndürür
+    
+    fetchall() gibi tüm sonucu belleğe almaz.
+    """
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+class StreamingExcelWriter:
+    """xlsxwriter constant_memory tabanlı Excel yazıcı"""
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: Çıktı .xlsx dosyası (close() çağrısında yazılır)
+        """
+        self.path = Path(path)
+        self.workbook = xlsxwriter.Workbook(str(self.path), {
+            'constant_memory': True,
+            'strings_to_formulas': False,   # "=" ile başlayan açıklamalar metin kalsın
+            'strings_to_urls': False,
+        })
+        self._formats: Dict[tuple, object] = {}
+    
+    def format(self, **style):
+        """Stil sözlüğünden xlsxwriter Format (aynı stil tekrar oluşturulmaz)"""
+        key = tuple(sorted(style.items()))
+        if key not in self._formats:
+            self._formats[key] = self.workbook.add_format(style)
+        return self._formats[key]
+    
+    def add_sheet(self, title: str):
+        """Yeni sayfa ekle (sayfa sırası ekleme sırasıdır)"""
+        return self.workbook.add_worksheet(title)
+    
+    def column_formats(self, columns: Sequence[Column], cell_style: dict = CELL_STYLE,
+                       column_styles: Optional[Sequence[Optional[dict]]] = None) -> List[object]:
+        """
+        Her sütun için hücre formatı
+        
+        Args:
+            columns: (başlık, genişlik, sayı biçimi) listesi
+            cell_style: Varsayılan hücre stili (kenarlık)
+            column_styles: Sütun bazında cell_style yerine geçen stiller (None = varsayılan)
+        """
+        formats = []
+        for col, (_, _, num_format) in enumerate(columns):
+            custom = column_styles[col] if column_styles else None
+            style = dict(custom if custom is not None else cell_style)
+            if num_format:
+                style['num_format'] = num_format
+            formats.append(self.format(**style))
+        return formats
+    
+    def write_table(self, worksheet, columns: Sequence[Column], rows: Iterable[Sequence],
+                    transform: Optional[Callable[[Sequence], Sequence]] = None,
+                    start_row: int = 0, header_style: dict = HEADER_STYLE,
+                    cell_style: dict = CELL_STYLE,
+                    column_styles: Optional[Sequence[Optional[dict]]] = None) -> int:
+        """
+        Başlık satırı ve verileri akışlı olarak yaz
+        
+        Args:
+            worksheet: add_sheet() ile alınan sayfa
+            columns: (başlık, genişlik, sayı biçimi) listesi
+            rows: Satırlar (genellikle iter_rows(cursor))
+            transform: Satırı yazmadan önce dönüştüren fonksiyon (türetilmiş sütunlar)
+            start_row: Başlığın yazılacağı satır (0 tabanlı)
+            header_style / cell_style / column_styles: Stil sözlükleri
+        
+        Returns:
+            Yazılan veri satırı sayısı
+        """
+        header_format = self.format(**header_style)
+        cell_formats = self.column_formats(columns, cell_style, column_styles)
+        
+        for col, (header, width, _) in enumerate(columns):
+            worksheet.set_column(col, col, width)
+            worksheet.write_string(start_row, col, header, header_format)
+        
+        row_num = start_row
+        for row in rows:
+            if transform is not None:
+                row = transform(row)
+            row_num += 1
+            for col, value in enumerate(row):
+                worksheet.write(row_num, col, value, cell_formats[col])
+        
+        return row_num - start_row
+    
+    def close(self) -> Path:
+        """Çalışma kitabını diske yaz"""
+        self.workbook.close()
+        return self.path
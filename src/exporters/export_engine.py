@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bildirimsel (Declarative) Export Motoru
+=======================================
+
+Her çalışma kitabı bir WorkbookSpec ile tanımlanır: kaynak veritabanı,
+çıktı dosyası ve sayfalar. Sayfalar SQL + sütun tanımlarından oluşur;
+motor sorguyu çalıştırır, satırları StreamingExcelWriter ile akışlı yazar.
+
+- Column: başlık, SQL sonuç sütunu, genişlik, sayı biçimi
+  derive verilirse değer derive(*args sütunları) ile türetilir (örn. ADET)
+- SheetSpec: tablo sayfası (SQL + sütunlar + isteğe bağlı alt bilgi)
+- SummarySpec: Özet sayfası (istatistik sorguları + fatura listesi)
+- WorkbookSpec: veritabanı, çıktı klasörü/dosya adı, sayfalar
+
+Kaynak veritabanı değişmediyse export atlanır (export_fingerprint.py).
+
+Aynı tanımlar export_tables() ile CSV / JSON Lines / Parquet olarak da
+yazılabilir (table_writer.py): tablo sayfası başına bir dosya, Excel
+biçimleri ve Özet sayfası olmadan.
+
+Tanımlar export_specs.py içindedir; akgips/fullboard/birlesik/api
+exporter'ları yalnızca ilgili tanımı çalıştırır.
+
+Kullanım:
+    from src.exporters.export_engine import export_workbook
+    from src.exporters.export_specs import BIRLESIK_EXPORT
+    
+    result = export_workbook(BIRLESIK_EXPORT)
+    print(result['filename'], result['sheets'])
+    
+    tables = export_tables(BIRLESIK_EXPORT, 'jsonl')
+    print(tables['files'])
+"""
+
+import os
+import sys
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+# Proje kök dizinini sys.path'e ekle
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.connection import get_connection
+from src.exporters.excel_writer import (
+    StreamingExcelWriter, iter_rows, HEADER_STYLE, CELL_STYLE
+)
+from src.exporters.export_fingerprint import (
+    export_fingerprint, load_sidecar, save_sidecar, sidecar_path
+)
+from src.exporters.table_writer import FORMATS, write_table
+
+
+# Tablo çıktılarının kök klasörü (proje köküne göre): data/export/<isim>/<sayfa>.<biçim>
+TABLES_DIR = 'data/export'
+
+# Sayfa başlıklarından dosya adı (Türkçe karakterler ASCII'ye)
+ASCII_TABLE = str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU')
+
+
+# ========== TANIMLAR ==========
+
+class Column(NamedTuple):
+    """Sayfadaki tek sütun"""
+    header: str
+    source: Optional[str]                 # SQL sonuç sütunu (alias) adı
+    width: float = 15
+    num_format: Optional[str] = None
+    derive: Optional[Callable] = None     # Türetilmiş değer: derive(*args değerleri)
+    args: Tuple[str, ...] = ()            # derive girdileri (boşsa (source,))
+    style: Optional[dict] = None          # Sayfanın cell_style'ı yerine geçer
+
+
+class SheetSpec(NamedTuple):
+    """SQL sorgusundan beslenen tablo sayfası"""
+    title: str
+    sql: str
+    columns: Sequence[Column]
+    header_style: dict = HEADER_STYLE
+    cell_style: dict = CELL_STYLE
+    footer: Optional[Callable] = None     # footer(writer, worksheet, row, cursor) -> istatistik dict
+
+
+class SummarySpec(NamedTuple):
+    """Özet sayfası: başlık, istatistik satırları ve fatura listesi"""
+    title: str
+    heading: str
+    stats: Sequence[Tuple[str, str, str, Optional[Callable]]]   # (anahtar, etiket, SQL, biçimleyici)
+    list_title: str
+    list_sql: str
+    list_columns: Sequence[Column]        # Başlıksız liste; genişlikler sayfaya uygulanır
+
+
+class WorkbookSpec(NamedTuple):
+    """Tek bir Excel çıktısı"""
+    name: str
+    db_path: str                          # Proje köküne göre
+    output_dir: str                       # Proje köküne göre
+    filename: str                         # '{timestamp}' içerebilir
+    sheets: Sequence[Any]                 # SummarySpec / SheetSpec (yazım sırası = sayfa sırası)
+    cleanup: Optional[str] = None         # Yazmadan önce silinecek eski dosyalar (glob)
+
+
+# ========== SATIR DÖNÜŞÜMÜ ==========
+
+def row_builder(columns: Sequence[Column], description) -> Optional[Callable]:
+    """
+    Cursor satırını sütun tanımlarına göre dönüştüren fonksiyon
+    
+    Sütunlar sorgu sırasıyla birebir aynıysa None döner (satırlar olduğu
+    gibi yazılır); aksi halde konumlar bir kez çözülür.
+    """
+    names = [d[0] for d in description]
+    if all(c.derive is None for c in columns) and [c.source for c in columns] == names:
+        return None
+    
+    index = {name: i for i, name in enumerate(names)}
+    
+    def position(name):
+        if name not in index:
+            raise ValueError(f"Sorguda '{name}' sütunu yok (mevcut: {', '.join(names)})")
+        return index[name]
+    
+    getters = []
+    for column in columns:
+        if column.derive is None:
+            getters.append(itemgetter(position(column.source)))
+        else:
+            positions = [position(name) for name in (column.args or (column.source,))]
+            getters.append(lambda row, f=column.derive, p=positions: f(*[row[i] for i in p]))
+    
+    return lambda row: tuple(getter(row) for getter in getters)
+
+
+# ========== SAYFA YAZIMI ==========
+
+def write_sheet(writer: StreamingExcelWriter, cursor, spec: SheetSpec, params=()) -> Tuple[int, Dict]:
+    """
+    Tablo sayfasını yaz
+    
+    Args:
+        params: SQL parametreleri (bölümlü export'ta firma/ay sınırları)
+    
+    Returns:
+        (veri satırı sayısı, alt bilginin döndürdüğü istatistikler)
+    """
+    worksheet = writer.add_sheet(spec.title)
+    cursor.execute(spec.sql, params)
+    
+    count = writer.write_table(
+        worksheet,
+        [(c.header, c.width, c.num_format) for c in spec.columns],
+        iter_rows(cursor),
+        transform=row_builder(spec.columns, cursor.description),
+        header_style=spec.header_style,
+        cell_style=spec.cell_style,
+        column_styles=[c.style for c in spec.columns],
+    )
+    
+    stats = {}
+    if spec.footer is not None:
+        stats = spec.footer(writer, worksheet, count + 2, cursor) or {}
+    return count, stats
+
+
+def write_summary(writer: StreamingExcelWriter, cursor, spec: SummarySpec) -> Tuple[int, Dict]:
+    """
+    Özet sayfasını yaz
+    
+    Returns:
+        (listelenen fatura sayısı, {anahtar: değer} istatistikleri)
+    """
+    worksheet = writer.add_sheet(spec.title)
+    bold = writer.format(bold=True)
+    
+    # Başlık
+    worksheet.merge_range('A1:D1', spec.heading,
+                          writer.format(bold=True, font_size=16, font_color='#366092'))
+    worksheet.merge_range('A2:D2', f'Rapor Tarihi: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
+                          writer.format(italic=True, font_size=10))
+    
+    # İstatistikler
+    stats = {}
+    row = 3
+    for key, label, sql, formatter in spec.stats:
+        cursor.execute(sql)
+        value = cursor.fetchone()[0]
+        stats[key] = value
+        worksheet.write(row, 0, label, bold)
+        worksheet.write(row, 1, formatter(value) if formatter else value)
+        row += 1
+    row += 1
+    
+    # Fatura listesi
+    worksheet.write(row, 0, spec.list_title, writer.format(bold=True, font_size=12))
+    row += 1
+    
+    cursor.execute(spec.list_sql)
+    transform = row_builder(spec.list_columns, cursor.description)
+    count = 0
+    for values in iter_rows(cursor):
+        if transform is not None:
+            values = transform(values)
+        for col, value in enumerate(values):
+            worksheet.write(row, col, value)
+        row += 1
+        count += 1
+    
+    for col, column in enumerate(spec.list_columns):
+        worksheet.set_column(col, col, column.width)
+    
+    return count, stats
+
+
+# ========== ÇALIŞMA KİTABI ==========
+
+def remove_old_outputs(output_dir: Path, spec: WorkbookSpec, output: Path):
+    """Önceki çıktıları sil (cleanup glob'u yoksa sadece aynı isimli dosya)"""
+    if spec.cleanup is None:
+        if output.exists():
+            output.unlink()
+            print(f"🗑️  Eski Excel dosyası silindi")
+        return
+    
+    for old_file in sorted(output_dir.glob(spec.cleanup)):
+        try:
+            old_file.unlink()
+            print(f"🗑️  Eski dosya silindi: {old_file.name}")
+        except Exception as e:
+            print(f"⚠️  Eski dosya silinemedi: {old_file.name} - {e}")
+
+
+def resolve_output(spec: WorkbookSpec, output_path=None) -> Path:
+    """Çıktı dosyasının tam yolu (klasör yoksa oluşturulur)"""
+    if output_path is not None:
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        return output
+    
+    output_dir = PROJECT_ROOT / spec.output_dir
+    if not output_dir.exists():
+        output_dir.mkdir(parents=True)
+        print(f"✓ '{spec.output_dir}' klasörü oluşturuldu")
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = output_dir / spec.filename.format(timestamp=timestamp)
+    remove_old_outputs(output_dir, spec, output)
+    return output
+
+
+def export_workbook(spec: WorkbookSpec, db_path=None, output_path=None, verbose: bool = True,
+                    force: bool = False) -> Dict:
+    """
+    Tanımdaki çalışma kitabını oluştur
+    
+    Kaynak veritabanı ve tanım son export'tan beri değişmediyse (parmak izi
+    yan dosyası eşleşiyorsa) dosya yeniden üretilmez.
+    
+    Args:
+        spec: WorkbookSpec
+        db_path: Kaynak veritabanı (varsayılan: spec.db_path)
+        output_path: Çıktı dosyası (varsayılan: spec.output_dir / spec.filename)
+        verbose: Sonuç raporunu yazdır
+        force: Parmak izine bakmadan yeniden üret
+    
+    Returns:
+        {'name', 'filename', 'sheets': {sayfa: satır sayısı}, 'stats': {...}, 'skipped': bool}
+    """
+    db_path = Path(db_path) if db_path else PROJECT_ROOT / spec.db_path
+    if not db_path.exists():
+        raise FileNotFoundError(f"Veritabanı bulunamadı: {db_path}")
+    
+    output_dir = Path(output_path).parent if output_path is not None else PROJECT_ROOT / spec.output_dir
+    sidecar = sidecar_path(output_dir, spec)
+    fingerprint = export_fingerprint(spec, db_path)
+    
+    if not force:
+        cached = load_sidecar(sidecar, fingerprint, output_path)
+        if cached is not None:
+            cached['skipped'] = True
+            if verbose:
+                print(f"⏭️  {spec.name}: veritabanı değişmedi, mevcut dosya güncel: "
+                      f"{os.path.relpath(cached['filename'], PROJECT_ROOT)}")
+            return cached
+    
+    output = resolve_output(spec, output_path)
+    
+    result = {'name': spec.name, 'filename': str(output), 'sheets': {}, 'stats': {}, 'skipped': False}
+    
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        writer = StreamingExcelWriter(output)
+        for sheet in spec.sheets:
+            if isinstance(sheet, SummarySpec):
+                count, stats = write_summary(writer, cursor, sheet)
+            else:
+                count, stats = write_sheet(writer, cursor, sheet)
+            result['sheets'][sheet.title] = count
+            result['stats'].update(stats)
+        writer.close()
+    finally:
+        conn.close()
+    
+    save_sidecar(sidecar, fingerprint, result)
+    
+    if verbose:
+        print_report(spec, result)
+    return result
+
+
+def print_report(spec: WorkbookSpec, result: Dict):
+    """Oluşturulan dosyanın içerik özetini yazdır"""
+    print(f"\n{'=' * 70}")
+    print(f"✓ Excel dosyası oluşturuldu: {os.path.relpath(result['filename'], PROJECT_ROOT)}")
+    print(f"{'=' * 70}")
+    print(f"\nİçerik:")
+    for sheet in spec.sheets:
+        count = result['sheets'][sheet.title]
+        if isinstance(sheet, SummarySpec):
+            print(f"  📊 {sheet.title} sayfası")
+        else:
+            print(f"  📄 {sheet.title}: {count:,} satır")
+    
+    summaries = [sheet for sheet in spec.sheets if isinstance(sheet, SummarySpec)]
+    if summaries:
+        print()
+    for summary in summaries:
+        for key, label, _, formatter in summary.stats:
+            value = result['stats'].get(key)
+            print(f"{label} {formatter(value) if formatter else value}")
+    print()
+
+
+# ========== TABLO ÇIKTILARI (CSV / JSONL / PARQUET) ==========
+
+def table_filename(title: str, fmt: str) -> str:
+    """Sayfa başlığından dosya adı: "Fatura Satırları" → fatura_satirlari.csv"""
+    return title.translate(ASCII_TABLE).lower().replace(' ', '_') + FORMATS[fmt]
+
+
+def export_tables(spec: WorkbookSpec, fmt: str = 'csv', db_path=None, output_dir=None,
+                  verbose: bool = True, force: bool = False) -> Dict:
+    """
+    Tanımdaki tablo sayfalarını makine okunur dosyalara yaz
+    
+    SQL, sütunlar ve türetilmiş değerler Excel ile aynıdır; sayı biçimleri,
+    stiller, alt bilgiler ve Özet sayfası yazılmaz. Dosya adları sabittir
+    (zaman damgası yok), her çalıştırmada üzerine yazılır. Parmak izi
+    eşleşirse atlanır.
+    
+    Args:
+        spec: WorkbookSpec
+        fmt: 'csv' / 'jsonl' / 'parquet'
+        db_path: Kaynak veritabanı (varsayılan: spec.db_path)
+        output_dir: Çıktı klasörü (varsayılan: data/export/<spec.name>)
+        verbose: Sonuç raporunu yazdır
+        force: Parmak izine bakmadan yeniden üret
+    
+    Returns:
+        {'name', 'format', 'filename' (klasör), 'files': {sayfa: dosya},
+         'sheets': {sayfa: satır sayısı}, 'stats': {}, 'skipped': bool}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Bilinmeyen tablo biçimi: {fmt} (seçenekler: {', '.join(FORMATS)})")
+    
+    db_path = Path(db_path) if db_path else PROJECT_ROOT / spec.db_path
+    if not db_path.exists():
+        raise FileNotFoundError(f"Veritabanı bulunamadı: {db_path}")
+    
+    output_dir = Path(output_dir) if output_dir is not None else PROJECT_ROOT / TABLES_DIR / spec.name
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sidecar = sidecar_path(output_dir, spec, fmt)
+    fingerprint = export_fingerprint(spec, db_path)
+    
+    if not force:
+        cached = load_sidecar(sidecar, fingerprint)
+        if cached is not None:
+            cached['skipped'] = True
+            if verbose:
+                print(f"⏭️  {spec.name} ({fmt}): veritabanı değişmedi, mevcut dosyalar güncel: "
+                      f"{os.path.relpath(cached['filename'], PROJECT_ROOT)}")
+            return cached
+    
+    result = {'name': spec.name, 'format': fmt, 'filename': str(output_dir),
+              'files': {}, 'sheets': {}, 'stats': {}, 'skipped': False}
+    
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        for sheet in spec.sheets:
+            if isinstance(sheet, SummarySpec):
+                continue
+            
+            output = output_dir / table_filename(sheet.title, fmt)
+            partial = output.with_name(output.name + '.tmp')
+            cursor.execute(sheet.sql)
+            try:
+                count = write_table(
+                    partial,
+                    [c.header for c in sheet.columns],
+                    iter_rows(cursor),
+                    transform=row_builder(sheet.columns, cursor.description),
+                    fmt=fmt,
+                )
+            except Exception:
+                partial.unlink(missing_ok=True)
+                raise
+            # Okuyucular yarım dosya görmesin
+            partial.replace(output)
+            
+            result['files'][sheet.title] = str(output)
+            result['sheets'][sheet.title] = count
+    finally:
+        conn.close()
+    
+    save_sidecar(sidecar, fingerprint, result)
+    
+    if verbose:
+        print(f"\n✓ {fmt.upper()} dosyaları oluşturuldu: {os.path.relpath(output_dir, PROJECT_ROOT)}")
+        for title, path in result['files'].items():
+            print(f"  📄 {Path(path).name}: {result['sheets'][title]:,} satır")
+    return result
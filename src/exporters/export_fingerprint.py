@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export Parmak İzi (Değişmediyse Atla)
+=====================================
+
+Her export, çıktı klasörüne ".<isim>.fingerprint.json" yan dosyası yazar:
+kaynak veritabanının parmak izi + export tanımının imzası + motor sürümü.
+Sonraki çalıştırmada parmak izi aynıysa ve dosya hâlâ duruyorsa Excel
+yeniden üretilmez.
+
+Veritabanı parmak izi:
+- Ana dosya ve (doluysa) -wal dosyasının boyutu + mtime_ns
+  (WAL modunda commit'ler önce -wal'a, checkpoint'te ana dosyaya yazılır)
+- Başlıktaki file change counter (rollback journal modunda her commit'te artar)
+- PRAGMA schema_version
+- Her tablonun COUNT(*) ve MAX(rowid) değeri (kaba mtime çözünürlüğüne karşı;
+  WITHOUT ROWID tablolarda sadece COUNT(*))
+
+PRAGMA data_version yalnızca aynı bağlantı içinde anlamlı olduğu için
+süreçler arası karşılaştırmada kullanılmaz.
+
+Kullanım:
+    from src.exporters.export_fingerprint import export_fingerprint, load_sidecar
+    
+    fingerprint = export_fingerprint(spec, db_path)
+    cached = load_sidecar(sidecar_path(output_dir, spec), fingerprint)
+"""
+
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+
+
+# Çıktı biçimini değiştiren motor değişikliklerinde artırılır
+EXPORT_FORMAT_VERSION = 1
+
+# SQLite başlığında file change counter konumu (4 byte, big-endian)
+CHANGE_COUNTER_OFFSET = 24
+
+
+def _file_state(path: Path) -> Optional[list]:
+    """Dosya boyutu ve mtime_ns (yoksa None)"""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def database_fingerprint(db_path) -> Dict:
+    """
+    Veritabanının içerik değişikliğini yansıtan parmak izi
+    
+    Args:
+        db_path: SQLite dosyası
+    
+    Returns:
+        JSON'a yazılabilir dict
+    """
+    db_path = Path(db_path)
+    
+    # Dosya durumları bağlantı açılmadan önce okunur (açılış boş -wal oluşturur)
+    wal_state = _file_state(Path(f"{db_path}-wal"))
+    with open(db_path, 'rb') as db_file:
+        header = db_file.read(100)
+    
+    fingerprint = {
+        'file': _file_state(db_path),
+        'wal': wal_state if wal_state and wal_state[0] > 0 else None,
+        'change_counter': int.from_bytes(header[CHANGE_COUNTER_OFFSET:CHANGE_COUNTER_OFFSET + 4], 'big'),
+        'tables': {},
+    }
+    
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        fingerprint['schema_version'] = cursor.execute("PRAGMA schema_version").fetchone()[0]
+        tables = cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        for table, sql in tables:
+            # WITHOUT ROWID tablolarda (sales_irs, balance_summary) sadece satır sayısı
+            max_rowid = 'NULL' if 'WITHOUT ROWID' in (sql or '').upper() else 'MAX(rowid)'
+            fingerprint['tables'][table] = list(cursor.execute(
+                f'SELECT COUNT(*), {max_rowid} FROM "{table}"'
+            ).fetchone())
+    finally:
+        conn.close()
+    
+    return fingerprint
+
+
+def _describe(value):
+    """json.dumps için fonksiyonları modül.isim olarak yazar"""
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    return repr(value)
+
+
+def spec_signature(spec) -> str:
+    """Export tanımının (SQL, sütunlar, biçimler, türetme fonksiyonları) özeti"""
+    payload = json.dumps(spec, default=_describe, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def export_fingerprint(spec, db_path) -> Dict:
+    """Motor sürümü + tanım imzası + veritabanı parmak izi"""
+    return {
+        'version': EXPORT_FORMAT_VERSION,
+        'spec': spec_signature(spec),
+        'database': database_fingerprint(db_path),
+    }
+
+
+def sidecar_path(output_dir: Path, spec, fmt: str = 'xlsx') -> Path:
+    """Parmak izi yan dosyası (zaman damgalı dosya adlarından bağımsız, biçim başına bir tane)"""
+    suffix = '' if fmt == 'xlsx' else f".{fmt}"
+    return Path(output_dir) / f".{spec.name}{suffix}.fingerprint.json"
+
+
+def load_sidecar(path: Path, fingerprint: Dict, output_path=None) -> Optional[Dict]:
+    """
+    Kayıtlı export sonucu (parmak izi eşleşiyor ve dosya duruyorsa)
+    
+    Args:
+        path: Yan dosya
+        fingerprint: export_fingerprint() sonucu
+        output_path: Özel çıktı yolu istendiyse kayıtlı dosya bu olmalı
+    
+    Returns:
+        Kayıtlı sonuç dict'i veya None (yeniden üretilmeli)
+    """
+    if not path.exists():
+        return None
+    try:
+        saved = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    
+    if saved.get('fingerprint') != fingerprint:
+        return None
+    filename = saved.get('result', {}).get('filename')
+    if not filename or not Path(filename).exists():
+        return None
+    # Tablo çıktılarında (CSV/JSONL/Parquet) sayfa başına bir dosya
+    if not all(Path(path).exists() for path in saved['result'].get('files', {}).values()):
+        return None
+    if output_path is not None and Path(output_path).resolve() != Path(filename).resolve():
+        return None
+    return saved['result']
+
+
+def save_sidecar(path: Path, fingerprint: Dict, result: Dict):
+    """Export sonucunu parmak iziyle birlikte kaydet"""
+    payload = {
+        'fingerprint': fingerprint,
+        'result': result,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding='utf-8')
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export Tanımları
+================
+
+Tüm Excel çıktılarının sayfa tanımları (SQL + sütunlar + türetilmiş
+sütunlar). Motor: export_engine.py
+
+- AKGIPS_EXPORT / FULLBOARD_EXPORT: tek firma XML veritabanları
+- BIRLESIK_EXPORT: birlesik.db (Firma sütunu + açıklama)
+- BIRLESIK_MONTHLY_EXPORT: birlesik.db, firma + ay başına ayrı dosya
+- API_EXPORT: api.db (API_Faturalar sayfası + istatistikler)
+
+EXPORTS sözlüğü isimden tanıma erişim sağlar (update_all_excels).
+
+Kullanım:
+    from src.exporters.export_specs import run_export
+    
+    run_export('birlesik')
+    run_export('birlesik', fmt='parquet')    # data/export/birlesik/*.parquet
+"""
+
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.exporters.excel_writer import NUMBER_FORMAT
+from src.exporters.export_engine import (
+    Column, SheetSpec, SummarySpec, WorkbookSpec, export_tables, export_workbook
+)
+from src.exporters.partition_export import PartitionSpec, export_partitions
+from src.parsers.description_parser import extract_irsaliye_label
+
+
+# ========== TÜRETİLMİŞ DEĞERLER ==========
+
+def adet_degeri(quantity, unit):
+    """ADET sütunu: TNE ise miktar * 1000 / 35, EA ise miktarın kendisi"""
+    if quantity is None:
+        return None
+    if unit == 'TNE':
+        return quantity * 1000 / 35
+    if unit == 'EA':
+        return quantity
+    return None
+
+
+def money_text(value) -> str:
+    """Özet sayfası tutar gösterimi: 1,234.56 TRY"""
+    return f'{value or 0:,.2f} TRY'
+
+
+def format_date_dmy(date_str: str) -> str:
+    """
+    Tarihi gün.ay.yıl formatına çevirir
+    
+    Args:
+        date_str: Tarih string'i (çeşitli formatlar)
+    
+    Returns:
+        str: gün.ay.yıl formatında tarih
+    """
+    if not date_str:
+        return ""
+    
+    try:
+        # ISO formatı (2024-10-08)
+        if '-' in date_str:
+            dt = datetime.fromisoformat(date_str.split('T')[0])
+            return dt.strftime('%d.%m.%Y')
+        # Zaten noktalı format (08.10.2024)
+        return date_str
+    except ValueError:
+        return date_str
+
+
+# Aynı açıklama çok sık tekrar eder; her farklı değer bir kez işlenir
+irsaliye_label = lru_cache(maxsize=65536)(extract_irsaliye_label)
+
+
+# ========== XML VERİTABANLARI (akgips / fullboard / birlesik) ==========
+
+FIRMA_COLUMN = Column('Firma', 'firma_kodu', 10)
+
+INVOICE_COLUMNS = [
+    Column('Fatura No', 'invoice_number', 20),
+    Column('Tarih', 'issue_date', 12),
+    Column('Toplam Tutar (TL)', 'total_amount', 18, NUMBER_FORMAT),
+    Column('Vergi Matrahı', 'taxable_amount', 18, NUMBER_FORMAT),
+    Column('KDV Tutarı', 'tax_amount', 18, NUMBER_FORMAT),
+    Column('Satıcı Firma', 'supplier_name', 40),
+    Column('Müşteri Firma', 'customer_name', 40),
+]
+
+LINE_COLUMNS = [
+    Column('Fatura No', 'invoice_number', 20),
+    Column('Satır No', 'line_id', 10),
+    Column('Ürün/Hizmet Adı', 'item_name', 40),
+    Column('Miktar', 'quantity', 12, NUMBER_FORMAT),
+    Column('Birim', 'unit', 10),
+    Column('Birim Fiyat', 'unit_price', 15, NUMBER_FORMAT),
+    Column('Satır Toplamı', 'line_total', 15, NUMBER_FORMAT),
+    Column('ADET', None, 15, NUMBER_FORMAT, derive=adet_degeri, args=('quantity', 'unit')),
+]
+
+DESPATCH_COLUMNS = [
+    Column('Fatura No', 'invoice_number', 20),
+    Column('İrsaliye No (Kısa)', 'despatch_id_short', 20),
+    Column('İrsaliye No (Tam)', 'despatch_id_full', 25),
+    Column('Tarih', 'issue_date', 12),
+    Column('Açıklama', 'description', 50),
+    Column('Toplam Tutar (TL)', 'total_amount', 18, NUMBER_FORMAT),
+]
+
+SUMMARY_STATS = [
+    ('invoice_count', 'Toplam Fatura Sayısı:', 'SELECT COUNT(*) FROM invoices', None),
+    ('total_amount', 'Toplam Fatura Tutarı:', 'SELECT SUM(total_amount) FROM invoices', money_text),
+    ('total_tax', 'Toplam KDV Tutarı:', 'SELECT SUM(tax_amount) FROM invoices', money_text),
+    ('line_count', 'Toplam Fatura Satırı:', 'SELECT COUNT(*) FROM invoice_lines', None),
+    ('despatch_count', 'Toplam İrsaliye:', 'SELECT COUNT(*) FROM despatch_documents', None),
+]
+
+SUMMARY_LIST_COLUMNS = [
+    Column('Fatura No', 'invoice_number', 30),
+    Column('Tarih', 'issue_date', 20),
+    Column('Tutar', 'total_amount', 20, derive=money_text),
+    Column('Satıcı', 'supplier_name', 50),
+]
+
+
+def firma_export(name: str) -> WorkbookSpec:
+    """Tek firma XML veritabanı (data/db/<name>.db) çıktısı"""
+    return WorkbookSpec(
+        name=name,
+        db_path=f'data/db/{name}.db',
+        output_dir=f'data/excel/{name}',
+        filename=f'efatura_{name}_{{timestamp}}.xlsx',
+        cleanup='efatura_*.xlsx',
+        sheets=[
+            SummarySpec(
+                title='Özet',
+                heading='E-FATURA VERİTABANI ÖZETİ',
+                stats=SUMMARY_STATS,
+                list_title='FATURA LİSTESİ',
+                list_sql='''
+                    SELECT invoice_number, issue_date, total_amount, supplier_name
+                    FROM invoices
+                    ORDER BY issue_date DESC
+                ''',
+                list_columns=SUMMARY_LIST_COLUMNS,
+            ),
+            SheetSpec(
+                title='Faturalar',
+                sql='''
+                    SELECT
+                        invoice_number, issue_date, total_amount,
+                        taxable_amount, tax_amount, supplier_name, customer_name
+                    FROM invoices
+                    ORDER BY issue_date DESC
+                ''',
+                columns=INVOICE_COLUMNS,
+            ),
+            SheetSpec(
+                title='Fatura Satırları',
+                sql='''
+                    SELECT
+                        i.invoice_number, il.line_id, il.item_name,
+                        il.quantity, il.unit, il.unit_price, il.line_total
+                    FROM invoice_lines il
+                    JOIN invoices i ON il.invoice_id = i.id
+                    ORDER BY i.issue_date DESC, il.line_id
+                ''',
+                columns=LINE_COLUMNS,
+            ),
+            SheetSpec(
+                title='İrsaliyeler',
+                sql='''
+                    SELECT
+                        i.invoice_number, d.despatch_id_short, d.despatch_id_full,
+                        d.issue_date, d.description, i.total_amount
+                    FROM despatch_documents d
+                    JOIN invoices i ON d.invoice_id = i.id
+                    ORDER BY i.invoice_number, d.despatch_id_short
+                ''',
+                columns=DESPATCH_COLUMNS,
+            ),
+        ],
+    )
+
+
+AKGIPS_EXPORT = firma_export('akgips')
+FULLBOARD_EXPORT = firma_export('fullboard')
+
+BIRLESIK_EXPORT = WorkbookSpec(
+    name='birlesik',
+    db_path='data/db/birlesik.db',
+    output_dir='data/excel/birlesik',
+    filename='efatura_birlesik.xlsx',   # Sabit dosya adı (tek dosya)
+    sheets=[
+        SummarySpec(
+            title='Özet',
+            heading='E-FATURA VERİTABANI ÖZETİ',
+            stats=SUMMARY_STATS,
+            list_title='FATURA LİSTESİ',
+            # DISTINCT ile tekrarları engelle
+            list_sql='''
+                SELECT DISTINCT invoice_number, issue_date, total_amount, supplier_name
+                FROM invoices
+                GROUP BY invoice_number
+                ORDER BY issue_date DESC
+            ''',
+            list_columns=SUMMARY_LIST_COLUMNS,
+        ),
+        SheetSpec(
+            title='Faturalar',
+            sql='''
+                SELECT DISTINCT
+                    firma_kodu, invoice_number, issue_date, total_amount,
+                    taxable_amount, tax_amount, supplier_name, customer_name, description
+                FROM invoices
+                GROUP BY invoice_number
+                ORDER BY firma_kodu, issue_date DESC
+            ''',
+            columns=[FIRMA_COLUMN] + INVOICE_COLUMNS + [Column('Açıklama', 'description', 50)],
+        ),
+        SheetSpec(
+            title='Fatura Satırları',
+            sql='''
+                SELECT
+                    i.firma_kodu, i.invoice_number, il.line_id, il.item_name,
+                    il.quantity, il.unit, il.unit_price, il.line_total
+                FROM invoice_lines il
+                JOIN invoices i ON il.invoice_id = i.id
+                ORDER BY i.firma_kodu, i.issue_date DESC, il.line_id
+            ''',
+            columns=[FIRMA_COLUMN] + LINE_COLUMNS,
+        ),
+        SheetSpec(
+            title='İrsaliyeler',
+            sql='''
+                SELECT
+                    i.firma_kodu, i.invoice_number, d.despatch_id_short, d.despatch_id_full,
+                    d.issue_date, d.description, i.total_amount
+                FROM despatch_documents d
+                JOIN invoices i ON d.invoice_id = i.id
+                ORDER BY i.firma_kodu, i.invoice_number, d.despatch_id_short
+            ''',
+            columns=[FIRMA_COLUMN] + DESPATCH_COLUMNS,
+        ),
+    ],
+)
+
+
+# Firma + ay başına birer çalışma kitabı (partition_export.py)
+BIRLESIK_MONTHLY_EXPORT = PartitionSpec(
+    name='birlesik_aylik',
+    db_path='data/db/birlesik.db',
+    output_dir='data/excel/aylik',
+    filename='{firma}/efatura_{firma}_{month}.xlsx',
+    partitions_sql='''
+        SELECT DISTINCT firma_kodu, substr(issue_date, 1, 7)
+        FROM invoices
+        WHERE firma_kodu IS NOT NULL AND issue_date IS NOT NULL
+        ORDER BY 1, 2
+    ''',
+    firma_names={'A': 'akgips', 'F': 'fullboard', 'API': 'api'},
+    sheets=[
+        SheetSpec(
+            title='Faturalar',
+            sql='''
+                SELECT DISTINCT
+                    invoice_number, issue_date, total_amount,
+                    taxable_amount, tax_amount, supplier_name, customer_name, description
+                FROM invoices
+                WHERE firma_kodu = :firma AND issue_date >= :start AND issue_date < :end
+                GROUP BY invoice_number
+                ORDER BY issue_date DESC
+            ''',
+            columns=INVOICE_COLUMNS + [Column('Açıklama', 'description', 50)],
+        ),
+        SheetSpec(
+            title='Fatura Satırları',
+            sql='''
+                SELECT
+                    i.invoice_number, il.line_id, il.item_name,
+                    il.quantity, il.unit, il.unit_price, il.line_total
+                FROM invoices i
+                JOIN invoice_lines il ON il.invoice_id = i.id
+                WHERE i.firma_kodu = :firma AND i.issue_date >= :start AND i.issue_date < :end
+                ORDER BY i.issue_date DESC, il.line_id
+            ''',
+            columns=LINE_COLUMNS,
+        ),
+        SheetSpec(
+            title='İrsaliyeler',
+            sql='''
+                SELECT
+                    i.invoice_number, d.despatch_id_short, d.despatch_id_full,
+                    d.issue_date, d.description, i.total_amount
+                FROM invoices i
+                JOIN despatch_documents d ON d.invoice_id = i.id
+                WHERE i.firma_kodu = :firma AND i.issue_date >= :start AND i.issue_date < :end
+                ORDER BY i.invoice_number, d.despatch_id_short
+            ''',
+            columns=DESPATCH_COLUMNS,
+        ),
+    ],
+)
+
+
+# ========== API VERİTABANI ==========
+
+API_HEADER_STYLE = {
+    'bold': True,
+    'bg_color': '#D7E4BC',
+    'border': 1,
+    'align': 'center',
+    'valign': 'vcenter',
+}
+
+API_TEXT_STYLE = {
+    'border': 1,
+    'align': 'left',
+    'valign': 'top',
+    'text_wrap': True,
+}
+
+API_CURRENCY_STYLE = {'border': 1}
+API_CURRENCY_FORMAT = '#,##0.00 ₺'
+
+
+def api_statistics(writer, worksheet, row: int, cursor) -> Dict:
+    """API_Faturalar tablosunun altına giden/gelen istatistiklerini yazar"""
+    cursor.execute('''
+        SELECT
+            COUNT(*),
+            SUM(COALESCE(invoice_type, '') != 'PURCHASE_INVOICE'),
+            SUM(COALESCE(invoice_type, '') = 'PURCHASE_INVOICE'),
+            TOTAL(total_amount),
+            TOTAL(CASE WHEN COALESCE(invoice_type, '') != 'PURCHASE_INVOICE' THEN total_amount END),
+            TOTAL(CASE WHEN COALESCE(invoice_type, '') = 'PURCHASE_INVOICE' THEN total_amount END)
+        FROM invoices
+    ''')
+    total_count, giden_count, gelen_count, total_amount, giden_total, gelen_total = cursor.fetchone()
+    giden_count, gelen_count = giden_count or 0, gelen_count or 0
+    
+    stats_format = writer.format(bold=True, bg_color='#FFF2CC', border=1)
+    text_format = writer.format(**API_TEXT_STYLE)
+    
+    worksheet.write(row, 0, 'İSTATİSTİKLER', stats_format)
+    worksheet.write(row + 1, 0, f'Toplam Fatura: {total_count}', text_format)
+    worksheet.write(row + 2, 0, f'  🟢 Giden: {giden_count}', text_format)
+    worksheet.write(row + 3, 0, f'  🔴 Gelen: {gelen_count}', text_format)
+    worksheet.write(row + 5, 0, f'Toplam Tutar: {total_amount:,.2f} ₺', text_format)
+    worksheet.write(row + 6, 0, f'  🟢 Giden: {giden_total:,.2f} ₺', text_format)
+    worksheet.write(row + 7, 0, f'  🔴 Gelen: {gelen_total:,.2f} ₺', text_format)
+    
+    return {
+        'total_count': total_count,
+        'giden_count': giden_count,
+        'gelen_count': gelen_count,
+        'total_amount': total_amount,
+        'giden_total': giden_total,
+        'gelen_total': gelen_total,
+    }
+
+
+API_EXPORT = WorkbookSpec(
+    name='api',
+    db_path='data/db/api.db',
+    output_dir='kayıtlar',
+    filename='API_Faturalar_{timestamp}.xlsx',
+    cleanup='API_Faturalar_*.xlsx',
+    sheets=[
+        SheetSpec(
+            title='API_Faturalar',
+            sql='''
+                SELECT
+                    api_id as id,
+                    issue_date as date,
+                    invoice_number as invoiceNumber,
+                    total_amount as totalTL,
+                    taxable_amount as taxableAmount,
+                    firm_name as firmName,
+                    description,
+                    invoice_type as type
+                FROM invoices
+                ORDER BY issue_date DESC, id DESC
+            ''',
+            columns=[
+                Column('id', 'id', 12),
+                Column('date', 'date', 15, derive=format_date_dmy),
+                Column('invoiceNumber', 'invoiceNumber', 20),
+                Column('totalTL', 'totalTL', 18, API_CURRENCY_FORMAT, style=API_CURRENCY_STYLE),
+                Column('taxableAmount', 'taxableAmount', 18, API_CURRENCY_FORMAT, style=API_CURRENCY_STYLE),
+                Column('firmName', 'firmName', 30),
+                Column('description', 'description', 50),
+                Column('irsaliyeNo', None, 20, derive=irsaliye_label, args=('description',)),
+            ],
+            header_style=API_HEADER_STYLE,
+            cell_style=API_TEXT_STYLE,
+            footer=api_statistics,
+        ),
+    ],
+)
+
+
+# İsimden tanıma (update_all_excels ve komut satırı)
+EXPORTS = {
+    'akgips': AKGIPS_EXPORT,
+    'fullboard': FULLBOARD_EXPORT,
+    'birlesik': BIRLESIK_EXPORT,
+    'api': API_EXPORT,
+    'birlesik_aylik': BIRLESIK_MONTHLY_EXPORT,
+}
+
+
+def run_export(name: str, fmt: str = 'xlsx', **kwargs) -> Dict:
+    """
+    İsmi verilen çıktıyı oluştur
+    
+    Args:
+        name: EXPORTS anahtarı (akgips, fullboard, birlesik, api, birlesik_aylik)
+        fmt: 'xlsx' (varsayılan) veya tablo biçimi: 'csv' / 'jsonl' / 'parquet'
+        **kwargs: export_workbook parametreleri (db_path, output_path, verbose, force);
+                  tablo biçimlerinde export_tables parametreleri (db_path, output_dir, verbose, force)
+    """
+    if name not in EXPORTS:
+        raise ValueError(f"Bilinmeyen export: {name} (seçenekler: {', '.join(EXPORTS)})")
+    if isinstance(EXPORTS[name], PartitionSpec):
+        if fmt != 'xlsx':
+            raise ValueError(f"{name} bölümlü export'u sadece xlsx üretir")
+        return export_partitions(EXPORTS[name], **kwargs)
+    if fmt == 'xlsx':
+        return export_workbook(EXPORTS[name], **kwargs)
+    return export_tables(EXPORTS[name], fmt, **kwargs)
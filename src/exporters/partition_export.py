@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aylık Bölümlü (Partitioned) Excel Export
+========================================
+
+Tek büyük efatura_birlesik.xlsx yerine her firma ve ay için ayrı bir
+çalışma kitabı üretir:
+
+    data/excel/aylik/akgips/efatura_akgips_2025-11.xlsx
+    data/excel/aylik/fullboard/efatura_fullboard_2025-11.xlsx
+
+Sadece verisi değişen bölümler yeniden yazılır:
+- Veritabanı parmak izi (export_fingerprint) değişmediyse hiçbir bölüm okunmaz
+- Değiştiyse her bölümün sayfa satırları okunup özetlenir (sha256);
+  özeti manifest'tekiyle aynı olan bölümün dosyasına dokunulmaz
+- Verisi kalmayan bölümün dosyası silinir
+
+Manifest çıktı klasöründeki ".<isim>.partitions.json" dosyasıdır.
+Sayfa SQL'leri :firma, :start ve :end parametreleriyle filtrelenir
+(issue_date >= 'YYYY-MM' AND issue_date < sonraki ay); tarihsiz faturalar
+aylık bölümlere girmez.
+
+Kullanım:
+    from src.exporters.partition_export import export_partitions
+    from src.exporters.export_specs import BIRLESIK_MONTHLY_EXPORT
+    
+    result = export_partitions(BIRLESIK_MONTHLY_EXPORT)
+    print(result['written'], result['unchanged'], result['removed'])
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+from src.exporters.excel_writer import StreamingExcelWriter, iter_rows
+from src.exporters.export_engine import PROJECT_ROOT, SheetSpec, write_sheet
+from src.exporters.export_fingerprint import (
+    EXPORT_FORMAT_VERSION, database_fingerprint, spec_signature
+)
+
+
+class PartitionSpec(NamedTuple):
+    """Firma + ay başına bir çalışma kitabı"""
+    name: str
+    db_path: str                          # Proje köküne göre
+    output_dir: str                       # Proje köküne göre
+    filename: str                         # '{firma}' ve '{month}' içerir (alt klasör olabilir)
+    partitions_sql: str                   # (firma_kodu, 'YYYY-MM') satırları
+    sheets: Sequence[SheetSpec]           # SQL'ler :firma, :start, :end ile filtrelenir
+    firma_names: Optional[dict] = None    # Dosya adında firma kodu yerine (örn. 'A' → 'akgips')
+
+
+def next_month(month: str) -> str:
+    """'2025-12' → '2026-01'"""
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def partition_params(firma: str, month: str) -> Dict:
+    """Sayfa SQL'lerinin parametreleri"""
+    return {'firma': firma, 'start': month, 'end': next_month(month)}
+
+
+def partition_digest(cursor, spec: PartitionSpec, params: Dict) -> str:
+    """Bölümün tüm sayfa satırlarının özeti (yazmadan, sadece okuyarak)"""
+    digest = hashlib.sha256()
+    for sheet in spec.sheets:
+        digest.update(sheet.title.encode('utf-8'))
+        cursor.execute(sheet.sql, params)
+        for row in iter_rows(cursor):
+            digest.update(repr(row).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def manifest_path(output_dir: Path, spec: PartitionSpec) -> Path:
+    return output_dir / f".{spec.name}.partitions.json"
+
+
+def load_manifest(path: Path) -> Dict:
+    """Kayıtlı manifest (yoksa / bozuksa boş)"""
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def export_partitions(spec: PartitionSpec, db_path=None, output_dir=None, verbose: bool = True,
+                      force: bool = False) -> Dict:
+    """
+    Değişen firma/ay bölümlerini yeniden yaz
+    
+    Args:
+        spec: PartitionSpec
+        db_path: Kaynak veritabanı (varsayılan: spec.db_path)
+        output_dir: Çıktı klasörü (varsayılan: spec.output_dir)
+        verbose: Sonuç raporunu yazdır
+        force: Özetlere bakmadan tüm bölümleri yeniden yaz
+    
+    Returns:
+        {'name', 'filename' (klasör), 'partitions': {'A/2025-11': {...}},
+         'sheets': {sayfa: yazılan satır}, 'written', 'unchanged', 'removed', 'skipped'}
+    """
+    db_path = Path(db_path) if db_path else PROJECT_ROOT / spec.db_path
+    if not db_path.exists():
+        raise FileNotFoundError(f"Veritabanı bulunamadı: {db_path}")
+    
+    output_dir = Path(output_dir) if output_dir is not None else PROJECT_ROOT / spec.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = manifest_path(output_dir, spec)
+    manifest = load_manifest(manifest_file)
+    
+    signature = {'version': EXPORT_FORMAT_VERSION, 'spec': spec_signature(spec)}
+    database = database_fingerprint(db_path)
+    
+    # Tanım değiştiyse eski özetler geçersiz
+    previous = manifest.get('partitions', {})
+    if force or manifest.get('signature') != signature:
+        previous = {}
+    
+    result = {'name': spec.name, 'filename': str(output_dir), 'partitions': {}, 'sheets': {},
+              'written': 0, 'unchanged': 0, 'removed': 0, 'skipped': False}
+    
+    # Veritabanı hiç değişmediyse bölümleri okumaya gerek yok
+    if (previous and manifest.get('database') == database
+            and all((output_dir / entry['filename']).exists() for entry in previous.values())):
+        result['partitions'] = previous
+        result['unchanged'] = len(previous)
+        result['skipped'] = True
+        if verbose:
+            print(f"⏭️  {spec.name}: veritabanı değişmedi, {len(previous)} bölüm güncel: "
+                  f"{os.path.relpath(output_dir, PROJECT_ROOT)}")
+        return result
+    
+    names = spec.firma_names or {}
+    partitions = {}
+    
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        keys = cursor.execute(spec.partitions_sql).fetchall()
+        
+        for firma, month in keys:
+            key = f"{firma}/{month}"
+            params = partition_params(firma, month)
+            filename = spec.filename.format(firma=names.get(firma, firma), month=month)
+            output = output_dir / filename
+            
+            digest = partition_digest(cursor, spec, params)
+            entry = previous.get(key)
+            if entry and entry['digest'] == digest and entry['filename'] == filename and output.exists():
+                partitions[key] = entry
+                result['unchanged'] += 1
+                continue
+            
+            output.parent.mkdir(parents=True, exist_ok=True)
+            writer = StreamingExcelWriter(output)
+            sheets = {}
+            for sheet in spec.sheets:
+                count, _ = write_sheet(writer, cursor, sheet, params)
+                sheets[sheet.title] = count
+                result['sheets'][sheet.title] = result['sheets'].get(sheet.title, 0) + count
+            writer.close()
+            
+            partitions[key] = {'digest': digest, 'filename': filename, 'sheets': sheets}
+            result['written'] += 1
+            if verbose:
+                print(f"  📝 {key}: {os.path.relpath(output, PROJECT_ROOT)} "
+                      f"({sum(sheets.values()):,} satır)")
+    finally:
+        conn.close()
+    
+    # Verisi kalmayan bölümler (force / tanım değişikliğinde de eski manifest'e göre)
+    for key, entry in manifest.get('partitions', {}).items():
+        if key in partitions:
+            continue
+        stale = output_dir / entry['filename']
+        if stale.exists() and all(stale != output_dir / e['filename'] for e in partitions.values()):
+            stale.unlink()
+            if verbose:
+                print(f"  🗑️  {key}: {entry['filename']} silindi (bölümde veri kalmadı)")
+        result['removed'] += 1
+    
+    result['partitions'] = partitions
+    manifest_file.write_text(json.dumps({
+        'signature': signature,
+        'database': database,
+        'partitions': partitions,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    
+    if verbose:
+        print(f"\n✓ {spec.name}: {result['written']} bölüm yazıldı, {result['unchanged']} bölüm değişmedi"
+              + (f", {result['removed']} bölüm silindi" if result['removed'] else ""))
+    return result
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Makine Okunur Tablo Çıktıları (CSV / JSON Lines / Parquet)
+==========================================================
+
+Excel yazmak ve geri okumak en yavaş yoldur; programların okuyacağı
+veriler için export motoru aynı sayfa tanımlarından düz tablo dosyaları
+da üretebilir. Satırlar cursor'dan fetchmany() ile gelir ve diske akışlı
+yazılır (tüm sonuç bellekte tutulmaz).
+
+- csv:     UTF-8, başlık satırı, csv modülü (tırnaklama/yeni satırlar güvenli)
+- jsonl:   Satır başına bir JSON nesnesi (None → null, tipler korunur)
+- parquet: pyarrow ile CHUNK_SIZE satırlık row group'lar
+           (pyarrow opsiyoneldir: pip install pyarrow)
+
+Okuma tarafında load_table() aynı isimli dosyalardan en hızlısını seçer,
+hızlı dosya yoksa veya Excel'den eskiyse Excel'e düşer.
+
+Kullanım:
+    from src.exporters.table_writer import write_table, load_table
+    
+    cursor.execute('SELECT invoice_number, total_amount FROM invoices')
+    write_table('faturalar.jsonl', ['Fatura No', 'Tutar'], iter_rows(cursor))
+    
+    df, path = load_table(Path('data/excel/api/API_Giden_Faturalar'), sheet_name='Tum_Faturalar')
+"""
+
+import csv
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.exporters.excel_writer import CHUNK_SIZE
+
+
+# Biçim → dosya uzantısı
+FORMATS = {
+    'csv': '.csv',
+    'jsonl': '.jsonl',
+    'parquet': '.parquet',
+}
+
+# load_table() tercih sırası (Excel en son)
+READ_ORDER = ('parquet', 'jsonl', 'csv')
+
+
+def parquet_available() -> bool:
+    """pyarrow kurulu mu"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _clean(value):
+    """pandas kaynaklı NaN değerlerini None yapar (JSON/CSV'de boş kalsın)"""
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _rows(rows: Iterable[Sequence], transform: Optional[Callable]) -> Iterable[Sequence]:
+    if transform is None:
+        return rows
+    return map(transform, rows)
+
+
+# ========== YAZICILAR ==========
+
+def write_csv(path: Path, headers: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """CSV yaz, satır sayısını döndür"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow([_clean(value) for value in row])
+            count += 1
+    return count
+
+
+def write_jsonl(path: Path, headers: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """JSON Lines yaz, satır sayısını döndür"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            record = dict(zip(headers, map(_clean, row)))
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def _arrow_array(pa, values: list):
+    """Değerlerden arrow dizisi; karışık tipli (örn. sayı + metin) sütunlar metin olur"""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def _wider_type(pa, current, new):
+    """İki parçanın sütun tiplerini kapsayan tip (boş < tam sayı < ondalık < metin)"""
+    if current == new or pa.types.is_null(new):
+        return current
+    if pa.types.is_null(current):
+        return new
+    numeric = (pa.types.is_integer, pa.types.is_floating)
+    if all(any(check(t) for check in numeric) for t in (current, new)):
+        return pa.float64()
+    return pa.string()
+
+
+def _rewrite_parquet(pq, path: Path, schema):
+    """Yazılmış row group'ları genişletilmiş şemayla kopyala, dosyaya yazmaya devam eden writer döndür"""
+    previous = path.with_name(path.name + '.old')
+    path.replace(previous)
+    source = pq.ParquetFile(str(previous))
+    writer = pq.ParquetWriter(str(path), schema)
+    try:
+        for index in range(source.num_row_groups):
+            writer.write_table(source.read_row_group(index).cast(schema))
+    except Exception:
+        writer.close()
+        raise
+    finally:
+        source.close()
+        previous.unlink()
+    return writer
+
+
+def write_parquet(path: Path, headers: Sequence[str], rows: Iterable[Sequence],
+                  chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Parquet yaz (her parça bir row group), satır sayısını döndür
+    
+    Sütun tipleri parçalardan çıkarılır. Sonraki bir parça tipi genişletirse
+    (boş → herhangi, tam sayı → ondalık, farklı tipler → metin) o ana kadar
+    yazılan row group'lar yeni şemayla yeniden yazılır. Hiç değer gelmeyen
+    sütunlar null tipinde kalır.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet çıktısı için pyarrow gerekli: pip install pyarrow") from None
+    
+    rows = iter(rows)
+    schema = None
+    writer = None
+    count = 0
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk and writer is not None:
+                break
+            
+            columns = [[_clean(value) for value in values] for values in zip(*chunk)] or [[] for _ in headers]
+            arrays = [_arrow_array(pa, values) for values in columns]
+            chunk_schema = pa.schema([
+                pa.field(header, _wider_type(pa, schema.field(index).type if schema else pa.null(), array.type))
+                for index, (header, array) in enumerate(zip(headers, arrays))
+            ])
+            
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), chunk_schema)
+            elif not chunk_schema.equals(schema):
+                writer.close()
+                writer = _rewrite_parquet(pq, path, chunk_schema)
+            schema = chunk_schema
+            
+            writer.write_table(pa.Table.from_arrays(
+                [array.cast(field.type) for array, field in zip(arrays, schema)],
+                schema=schema,
+            ))
+            count += len(chunk)
+            if len(chunk) < chunk_size:
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+    'parquet': write_parquet,
+}
+
+
+def write_table(path, headers: Sequence[str], rows: Iterable[Sequence],
+                transform: Optional[Callable[[Sequence], Sequence]] = None,
+                fmt: Optional[str] = None) -> int:
+    """
+    Satırları dosyaya akışlı yaz
+    
+    Args:
+        path: Çıktı dosyası
+        headers: Sütun başlıkları
+        rows: Satırlar (genellikle iter_rows(cursor))
+        transform: Satırı yazmadan önce dönüştüren fonksiyon (row_builder)
+        fmt: 'csv' / 'jsonl' / 'parquet' (varsayılan: dosya uzantısı)
+    
+    Returns:
+        Yazılan veri satırı sayısı
+    """
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip('.')
+    if fmt not in WRITERS:
+        raise ValueError(f"Bilinmeyen tablo biçimi: {fmt} (seçenekler: {', '.join(WRITERS)})")
+    return WRITERS[fmt](path, list(headers), _rows(rows, transform))
+
+
+# ========== OKUMA ==========
+
+def read_table(path, sheet_name=None) -> pd.DataFrame:
+    """
+    Tablo dosyasını DataFrame olarak oku
+    
+    JSON Lines'ta tarih/tip dönüşümü yapılmaz; değerler yazıldığı gibi gelir.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.parquet':
+        return pd.read_parquet(path)
+    if suffix == '.jsonl':
+        return pd.read_json(path, lines=True, dtype=False, convert_dates=False, precise_float=True)
+    if suffix == '.csv':
+        return pd.read_csv(path, encoding='utf-8')
+    return pd.read_excel(path, sheet_name=sheet_name or 0)
+
+
+def find_table(stem) -> Optional[Path]:
+    """
+    Aynı isimli dosyalardan okunacak olanı seç
+    
+    Hızlı biçimler (parquet > jsonl > csv) Excel'den eski değilse tercih
+    edilir; yoksa .xlsx döner. Hiçbiri yoksa None.
+    """
+    stem = Path(stem)
+    excel = stem.with_suffix('.xlsx')
+    excel_mtime = excel.stat().st_mtime if excel.exists() else None
+    
+    for fmt in READ_ORDER:
+        if fmt == 'parquet' and not parquet_available():
+            continue
+        candidate = stem.with_suffix(FORMATS[fmt])
+        if candidate.exists() and (excel_mtime is None or candidate.stat().st_mtime >= excel_mtime):
+            return candidate
+    
+    return excel if excel_mtime is not None else None
+
+
+def load_table(stem, sheet_name=None) -> Tuple[pd.DataFrame, Path]:
+    """
+    find_table() ile seçilen dosyayı oku
+    
+    Args:
+        stem: Uzantısız dosya yolu (örn. data/excel/api/API_Giden_Faturalar)
+        sheet_name: Excel'e düşülürse okunacak sayfa
+    
+    Returns:
+        (DataFrame, okunan dosya)
+    
+    Raises:
+        FileNotFoundError: Hiçbir biçimde dosya yoksa
+    """
+    path = find_table(stem)
+    if path is None:
+        raise FileNotFoundError(f"Tablo dosyası bulunamadı: {Path(stem).name}.(parquet|jsonl|csv|xlsx)")
+    return read_table(path, sheet_name), path
@@ -8,7 +8,11 @@ Finansal takip ve analiz modülleri.
 
 Modüller:
 - irs_matcher: İrsaliye eşleştirme ve kar/zarar hesaplama
+- irs_reconciler: Çoka-çok irsaliye mutabakatı ve tutar dağıtımı
+- match_frame: Eşleşmeler üzerinde vektörel kar/zarar hesaplama
 - payment_manager: Ödeme kayıt ve yönetimi
+- bank_statement: Banka ekstresi (CSV/MT940) okuma
+- payment_matcher: Ekstre işlemi -> fatura eşleştirme önerileri
 - debt_tracker: Borç/alacak takibi
 - balance_calculator: Bilanço hesaplama
 """
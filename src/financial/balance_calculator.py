@@ -10,116 +10,237 @@ Amaç:
 - Kar/zarar, borç/alacak, net pozisyon analizi
 - Zaman içinde trend analizi
 
+Toplamlar tek sorguda hesaplanır; migration ile oluşturulan balance_summary
+tablosu varsa (trigger'larla güncel tutulur) doğrudan ondan okunur.
+Snapshot'lar balance_ledger defteri üzerinden artımlı kaydedilir
+(önceki snapshot + yeni olaylar); get_balance_as_of() geçmiş bir tarihteki
+bilançoyu verir (kayıt zamanına göre; defter başlangıcından önce None).
+
 Kullanım:
     from src.financial.balance_calculator import BalanceCalculator
     
     bc = BalanceCalculator()
     balance = bc.calculate_current_balance()
     bc.save_snapshot()
+    bc.get_balance_as_of('2025-10-31')
     bc.print_balance_sheet()
 """
 
 import sqlite3
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+from src.financial.match_frame import MatchFrame
 
 
 class BalanceCalculator:
     """Bilanço hesaplama sınıfı"""
     
-    def __init__(self, db_path: str = None):
+    # Alış/satış toplamları + eşleşme kar/zarar toplamları tek sorguda
+    # (balance_summary tablosu ile aynı satır yapısı)
+    TOTALS_QUERY = """
+        SELECT
+            invoice_type as bucket,
+            COUNT(*) as item_count,
+            COALESCE(SUM(total_amount), 0) as total_amount,
+            COALESCE(SUM(paid_amount), 0) as paid_amount,
+            COALESCE(SUM(remaining_amount), 0) as remaining_amount,
+            0 as total_profit,
+            0 as total_loss,
+            0 as margin_sum
+        FROM invoices
+        WHERE invoice_type IN ('PURCHASE', 'SALES')
+        GROUP BY invoice_type
+        
+        UNION ALL
+        
+        SELECT
+            'MATCH',
+            COUNT(*),
+            0, 0, 0,
+            COALESCE(SUM(MAX(profit, 0)), 0),
+            COALESCE(SUM(MAX(-profit, 0)), 0),
+            COALESCE(SUM(CASE WHEN purchase_amount > 0
+                THEN profit * 100.0 / purchase_amount ELSE 0 END), 0)
+        FROM (
+            SELECT
+                purchase_amount,
+                COALESCE(sales_amount, 0) - COALESCE(purchase_amount, 0) as profit
+            FROM irs_matching
+        )
+    """
+    
+    # balance_snapshots ve balance_ledger ortak tutar sütunları
+    LEDGER_COLUMNS = [
+        'total_purchases', 'total_paid_to_suppliers', 'outstanding_payables',
+        'total_sales', 'total_received_from_customers', 'outstanding_receivables',
+        'total_profit', 'total_matched_invoices',
+    ]
+    
+    def __init__(self, db_path: str = None, use_summary: bool = True):
         """
         Args:
             db_path: Veritabanı dosya yolu (None ise birlesik.db kullanılır)
+            use_summary: balance_summary tablosu varsa ondan oku
         """
         if db_path is None:
             project_root = Path(__file__).resolve().parent.parent.parent
             db_path = project_root / "data" / "db" / "birlesik.db"
         
         self.db_path = str(db_path)
+        self.use_summary = use_summary
     
-    def get_purchase_totals(self) -> Dict:
-        """Alış faturası toplamları (Fabrikalardan alışlar)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @staticmethod
+    def has_table(conn: sqlite3.Connection, table: str) -> bool:
+        """Tablo var mı?"""
+        row = conn.execute("""
+            SELECT 1 FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (table,)).fetchone()
+        return row is not None
+    
+    @staticmethod
+    def has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+        """Tabloda sütun var mı?"""
+        return column in [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    
+    def has_summary_table(self, conn: sqlite3.Connection) -> bool:
+        """Trigger'larla güncel tutulan balance_summary tablosu var mı?"""
+        return self.has_table(conn, 'balance_summary')
+    
+    def get_totals(self, conn: sqlite3.Connection = None) -> Dict:
+        """
+        Alış, satış ve kar/zarar toplamları
         
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as count,
-                COALESCE(SUM(total_amount), 0) as total,
-                COALESCE(SUM(paid_amount), 0) as paid,
-                COALESCE(SUM(remaining_amount), 0) as remaining
-            FROM invoices
-            WHERE invoice_type = 'PURCHASE'
-        """)
-        
-        row = cursor.fetchone()
-        conn.close()
+        balance_summary varsa sabit sürede 3 satır okunur, yoksa
+        invoices ve irs_matching tek sorguda toplanır.
         
+        Args:
+            conn: Açık bağlantı (verilmezse yeni bağlantı açılır)
+        
+        Returns:
+            {'PURCHASE': {...}, 'SALES': {...}, 'MATCH': {...}}
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection(self.db_path)
+        
+        try:
+            if self.use_summary and self.has_summary_table(conn):
+                query = "SELECT * FROM balance_summary"
+            else:
+                query = self.TOTALS_QUERY
+            
+            cursor = conn.execute(query)
+            columns = [description[0] for description in cursor.description]
+            rows = {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+        finally:
+            if own_conn:
+                conn.close()
+        
+        empty = dict.fromkeys(columns[1:], 0)
+        totals = {}
+        for bucket in ('PURCHASE', 'SALES', 'MATCH'):
+            values = {**empty, **rows.get(bucket, {})}
+            values.pop('bucket', None)
+            # Trigger toplamlarındaki kayan nokta artıklarını temizle
+            for key, value in values.items():
+                if key not in ('item_count', 'margin_sum'):
+                    values[key] = round(value, 2) + 0.0
+            totals[bucket] = values
+        return totals
+    
+    @staticmethod
+    def _invoice_totals(values: Dict) -> Dict:
+        """Fatura toplamlarını eski sözlük yapısına çevir"""
         return {
-            'count': row[0],
-            'total': row[1],
-            'paid': row[2],
-            'remaining': row[3]
+            'count': values['item_count'],
+            'total': values['total_amount'],
+            'paid': values['paid_amount'],
+            'remaining': values['remaining_amount']
         }
     
-    def get_sales_totals(self) -> Dict:
-        """Satış faturası toplamları (Müşterilere satışlar)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as count,
-                COALESCE(SUM(total_amount), 0) as total,
-                COALESCE(SUM(paid_amount), 0) as paid,
-                COALESCE(SUM(remaining_amount), 0) as remaining
-            FROM invoices
-            WHERE invoice_type = 'SALES'
-        """)
-        
-        row = cursor.fetchone()
-        conn.close()
-        
+    @staticmethod
+    def _profit_loss_totals(values: Dict) -> Dict:
+        """Eşleşme toplamlarını eski sözlük yapısına çevir"""
+        count = values['item_count']
         return {
-            'count': row[0],
-            'total': row[1],
-            'paid': row[2],
-            'remaining': row[3]
+            'matched_count': count,
+            'total_profit': values['total_profit'],
+            'total_loss': values['total_loss'],
+            'net_profit': values['total_profit'] - values['total_loss'],
+            'avg_profit_margin': values['margin_sum'] / count if count else 0
         }
     
-    def get_profit_loss_totals(self) -> Dict:
+    def get_purchase_totals(self, conn: sqlite3.Connection = None) -> Dict:
+        """Alış faturası toplamları (Fabrikalardan alışlar)"""
+        return self._invoice_totals(self.get_totals(conn)['PURCHASE'])
+    
+    def get_sales_totals(self, conn: sqlite3.Connection = None) -> Dict:
+        """Satış faturası toplamları (Müşterilere satışlar)"""
+        return self._invoice_totals(self.get_totals(conn)['SALES'])
+    
+    def get_profit_loss_totals(self, conn: sqlite3.Connection = None) -> Dict:
         """Kar/zarar toplamları (İrsaliye eşleştirmelerinden)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._profit_loss_totals(self.get_totals(conn)['MATCH'])
+    
+    def check_match_consistency(self, conn: sqlite3.Connection = None,
+                                tolerance: float = 0.01) -> Dict:
+        """
+        Kar/zarar toplamlarını MatchFrame hesabıyla karşılaştır
         
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as matched_count,
-                COALESCE(SUM(CASE WHEN profit_loss > 0 THEN profit_loss ELSE 0 END), 0) as profit,
-                COALESCE(SUM(CASE WHEN profit_loss < 0 THEN ABS(profit_loss) ELSE 0 END), 0) as loss,
-                COALESCE(SUM(profit_loss), 0) as net_profit,
-                COALESCE(AVG(profit_margin), 0) as avg_margin
-            FROM irs_matching
-        """)
+        Eşleşme kar/zarar kuralı iki yerde yazılıdır: MatchFrame (IRSMatcher
+        raporu, pandas) ve balance_summary trigger'ları / TOTALS_QUERY (SQL).
+        irs_matching satırlarından MatchFrame özeti çıkarılıp 'MATCH'
+        toplamlarıyla karşılaştırılır.
         
-        row = cursor.fetchone()
-        conn.close()
+        Args:
+            conn: Açık bağlantı (verilmezse yeni bağlantı açılır)
+            tolerance: Kabul edilen mutlak fark
         
+        Returns:
+            Farklı çıkan alanlar {alan: (MatchFrame, bilanço)}; tutarlıysa boş
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection(self.db_path)
+        
+        try:
+            frame = MatchFrame(pd.read_sql_query(
+                "SELECT purchase_amount, sales_amount FROM irs_matching", conn
+            )).summary()
+            totals = self.get_profit_loss_totals(conn)
+        finally:
+            if own_conn:
+                conn.close()
+        
+        expected = {
+            'matched_count': frame['total_matches'],
+            'total_profit': frame['total_profit'],
+            'total_loss': frame['total_loss'],
+            'net_profit': frame['net_profit'],
+            'avg_profit_margin': frame['avg_profit_margin'],
+        }
         return {
-            'matched_count': row[0],
-            'total_profit': row[1],
-            'total_loss': row[2],
-            'net_profit': row[3],
-            'avg_profit_margin': row[4]
+            key: (value, totals[key])
+            for key, value in expected.items()
+            if abs(value - totals[key]) > tolerance
         }
     
-    def calculate_current_balance(self) -> Dict:
-        """Mevcut finansal durumu hesapla"""
-        purchases = self.get_purchase_totals()
-        sales = self.get_sales_totals()
-        profit_loss = self.get_profit_loss_totals()
+    def calculate_current_balance(self, conn: sqlite3.Connection = None) -> Dict:
+        """Mevcut finansal durumu hesapla (tek sorgu)"""
+        totals = self.get_totals(conn)
+        purchases = self._invoice_totals(totals['PURCHASE'])
+        sales = self._invoice_totals(totals['SALES'])
+        profit_loss = self._profit_loss_totals(totals['MATCH'])
         
         # Net pozisyon = Alacaklar - Borçlar
         net_balance = sales['remaining'] - purchases['remaining']
@@ -162,49 +283,169 @@ class BalanceCalculator:
         
         return balance
     
+    def _snapshot_from_totals(self, conn: sqlite3.Connection) -> Dict:
+        """Snapshot değerlerini toplamlardan hesapla"""
+        balance = self.calculate_current_balance(conn)
+        ledger_id = None
+        if self.has_table(conn, 'balance_ledger'):
+            ledger_id = conn.execute("SELECT MAX(id) FROM balance_ledger").fetchone()[0]
+        
+        return {
+            'total_purchases': balance['total_purchases'],
+            'total_paid_to_suppliers': balance['paid_to_suppliers'],
+            'outstanding_payables': balance['outstanding_payables'],
+            'total_sales': balance['total_sales'],
+            'total_received_from_customers': balance['received_from_customers'],
+            'outstanding_receivables': balance['outstanding_receivables'],
+            'total_profit': balance['net_profit'],
+            'total_matched_invoices': balance['matched_invoices'],
+            'ledger_id': ledger_id,
+        }
+    
+    def _ledger_delta(self, conn: sqlite3.Connection, after_id: int, until: str = None) -> Dict:
+        """
+        Defterde after_id'den sonraki satırların toplamı
+        
+        Args:
+            after_id: Bu ID'den sonraki satırlar
+            until: Sadece bu zamana kadarki olaylar ('YYYY-MM-DD HH:MM:SS')
+        """
+        sums = ", ".join(f"COALESCE(SUM({column}), 0)" for column in self.LEDGER_COLUMNS)
+        time_filter = "AND event_time <= ?" if until else ""
+        params = (after_id, until) if until else (after_id,)
+        
+        row = conn.execute(f"""
+            SELECT MAX(id), {sums}
+            FROM balance_ledger
+            WHERE id > ? {time_filter}
+        """, params).fetchone()
+        
+        delta = dict(zip(self.LEDGER_COLUMNS, row[1:]))
+        delta['ledger_id'] = row[0] if row[0] is not None else after_id
+        return delta
+    
+    def _snapshot_from_ledger(self, conn: sqlite3.Connection) -> Optional[Dict]:
+        """Snapshot değerlerini önceki snapshot + defter farkından hesapla"""
+        conn.row_factory = sqlite3.Row
+        previous = conn.execute("""
+            SELECT * FROM balance_snapshots
+            WHERE ledger_id IS NOT NULL
+            ORDER BY ledger_id DESC
+            LIMIT 1
+        """).fetchone()
+        conn.row_factory = None
+        
+        if previous is None:
+            return None
+        
+        delta = self._ledger_delta(conn, previous['ledger_id'])
+        values = {
+            column: round((previous[column] or 0) + delta[column], 2) + 0.0
+            for column in self.LEDGER_COLUMNS
+        }
+        values['total_matched_invoices'] = int(values['total_matched_invoices'])
+        values['ledger_id'] = delta['ledger_id']
+        return values
+    
     def save_snapshot(self) -> int:
-        """Mevcut durumu snapshot olarak kaydet"""
-        balance = self.calculate_current_balance()
+        """
+        Mevcut durumu snapshot olarak kaydet
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        balance_ledger varsa snapshot = önceki snapshot + defterdeki yeni
+        satırlar (geçmiş taranmaz); yoksa toplamlar yeniden hesaplanır.
+        """
+        conn = get_connection(self.db_path, isolation_level=None)
         
-        cursor.execute("""
-            INSERT INTO balance_snapshots (
-                snapshot_date,
-                total_purchases,
-                total_sales,
-                total_paid_to_suppliers,
-                total_received_from_customers,
-                outstanding_payables,
-                outstanding_receivables,
-                net_balance,
-                total_profit,
-                total_matched_invoices
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            balance['snapshot_date'],
-            balance['total_purchases'],
-            balance['total_sales'],
-            balance['paid_to_suppliers'],
-            balance['received_from_customers'],
-            balance['outstanding_payables'],
-            balance['outstanding_receivables'],
-            balance['net_balance'],
-            balance['net_profit'],
-            balance['matched_invoices']
-        ))
-        
-        snapshot_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        try:
+            # Okuma ve yazma aynı tutarlı görüntü üzerinde
+            conn.execute("BEGIN IMMEDIATE")
+            
+            values = None
+            if self.has_table(conn, 'balance_ledger'):
+                values = self._snapshot_from_ledger(conn)
+            if values is None:
+                values = self._snapshot_from_totals(conn)
+            
+            values['snapshot_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            values['net_balance'] = round(values['outstanding_receivables'] - values['outstanding_payables'], 2) + 0.0
+            
+            ledger_column = ['ledger_id'] if self.has_column(conn, 'balance_snapshots', 'ledger_id') else []
+            columns = ['snapshot_date'] + self.LEDGER_COLUMNS + ['net_balance'] + ledger_column
+            
+            cursor = conn.execute(f"""
+                INSERT INTO balance_snapshots ({', '.join(columns)})
+                VALUES ({', '.join('?' for _ in columns)})
+            """, [values[column] for column in columns])
+            
+            snapshot_id = cursor.lastrowid
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
         
         print(f"💾 Snapshot kaydedildi (ID: {snapshot_id})")
         return snapshot_id
     
+    def get_balance_as_of(self, as_of: str) -> Optional[Dict]:
+        """
+        Belirli bir tarihteki bilanço (balance_ledger ile)
+        
+        O tarihten önceki en son snapshot alınır ve üzerine snapshot ile
+        tarih arasındaki defter satırları eklenir.
+        
+        Tarih, defterin kayıt zamanıdır (event_time: fatura/ödeme sisteme
+        girildiği an), fatura veya ödeme tarihi değil. Defterin ilk satırı
+        (OPENING) migration anında yazıldığından daha önceki tarihler için
+        bilgi yoktur ve None döner.
+        
+        Args:
+            as_of: 'YYYY-MM-DD' (gün sonu) veya 'YYYY-MM-DD HH:MM:SS'
+        
+        Returns:
+            balance_snapshots sütunlarıyla sözlük (defter yoksa veya tarih
+            defterin başlangıcından önceyse None)
+        """
+        until = f"{as_of} 23:59:59" if len(as_of) == 10 else as_of
+        
+        conn = get_connection(self.db_path)
+        try:
+            if not self.has_table(conn, 'balance_ledger'):
+                print("⚠️  balance_ledger tablosu yok (migration çalıştırın)")
+                return None
+            
+            first_event = conn.execute("SELECT MIN(event_time) FROM balance_ledger").fetchone()[0]
+            if first_event is None or until < first_event:
+                print(f"⚠️  {as_of} için defter kaydı yok (defter başlangıcı: {first_event or '-'})")
+                return None
+            
+            conn.row_factory = sqlite3.Row
+            anchor = conn.execute("""
+                SELECT * FROM balance_snapshots
+                WHERE ledger_id IS NOT NULL AND snapshot_date <= ?
+                ORDER BY ledger_id DESC
+                LIMIT 1
+            """, (until,)).fetchone()
+            conn.row_factory = None
+            
+            after_id = anchor['ledger_id'] if anchor else 0
+            delta = self._ledger_delta(conn, after_id, until)
+        finally:
+            conn.close()
+        
+        balance = {
+            column: round(((anchor[column] or 0) if anchor else 0) + delta[column], 2) + 0.0
+            for column in self.LEDGER_COLUMNS
+        }
+        balance['total_matched_invoices'] = int(balance['total_matched_invoices'])
+        balance['net_balance'] = round(balance['outstanding_receivables'] - balance['outstanding_payables'], 2) + 0.0
+        balance['snapshot_date'] = until
+        return balance
+    
     def get_historical_snapshots(self, limit: int = 10) -> List[Dict]:
         """Geçmiş snapshot'ları getir"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -329,6 +570,13 @@ def main():
     balance = bc.calculate_current_balance()
     bc.print_balance_sheet(balance)
     
+    # Kar/zarar toplamları MatchFrame ile aynı mı?
+    mismatches = bc.check_match_consistency()
+    for key, (frame_value, summary_value) in mismatches.items():
+        print(f"⚠️  {key}: MatchFrame {frame_value:,.2f} / bilanço {summary_value:,.2f}")
+    if mismatches:
+        print("   balance_summary yeniden hesaplanmalı: DatabaseMigration.rebuild_balance_summary()")
+    
     # Snapshot kaydet mi?
     print("\n" + "=" * 80)
     response = input("\nBu durumu snapshot olarak kaydetmek ister misiniz? (y/N): ")
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banka Ekstresi Okuma Modülü
+===========================
+
+Banka ekstrelerini (CSV veya MT940) ortak işlem (transaction) satırlarına çevirir.
+PaymentManager.import_bank_statement() bu satırları toplu ödeme olarak yükler.
+
+Desteklenen formatlar:
+- CSV: Başlık satırlı; Türkçe/İngilizce sütun adları (tarih/date, tutar/amount,
+  açıklama/description, fatura_no/invoice_number, invoice_id, referans/reference,
+  karşı taraf/counterparty). Ayraç (, ; tab) otomatik bulunur.
+- MT940: SWIFT hesap özeti (:61: işlem satırı + :86: açıklama)
+
+Her işlem:
+    {
+        'payment_date': 'YYYY-MM-DD',
+        'amount': 1234.56,              # Her zaman pozitif
+        'direction': 'CREDIT' | 'DEBIT', # CREDIT = gelen (tahsilat), DEBIT = giden (ödeme)
+        'description': '...',
+        'counterparty': '...',
+        'reference_number': '...',
+        'invoice_id': None | int,
+        'invoice_number': None | '...'
+    }
+
+Kullanım:
+    from src.financial.bank_statement import BankStatementReader
+    
+    transactions = BankStatementReader().read('ekstre.csv')
+"""
+
+import csv
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# e-Fatura numarası: 3 karakter seri + yıl + 9 hane sıra (örn: AKG2025000008577)
+INVOICE_NUMBER_PATTERN = re.compile(r'\b[A-Z0-9]{3}20\d{2}\d{9}\b')
+
+# MT940 :61: satırı: tarih, (valör), C/D/RC/RD, (fon kodu), tutar, işlem tipi + referans
+MT940_LINE_PATTERN = re.compile(
+    r'^(?P<date>\d{6})(?P<entry>\d{4})?(?P<mark>R?[CD])(?P<funds>[A-Z])?'
+    r'(?P<amount>\d+,\d*)(?P<rest>.*)$'
+)
+MT940_TAG_PATTERN = re.compile(r'^:(?P<tag>\d{2}[A-Z]?):(?P<value>.*)$')
+
+# İşleme özel olmayan referanslar (tekrar kontrolünde referanssız sayılır)
+NO_REFERENCES = {'', 'NONREF'}
+
+
+class BankStatementReader:
+    """CSV / MT940 banka ekstresi okuyucu sınıfı"""
+    
+    CREDIT = 'CREDIT'
+    DEBIT = 'DEBIT'
+    
+    # CSV sütun adı -> işlem alanı (küçük harf, boşluksuz karşılaştırılır)
+    CSV_COLUMNS = {
+        'payment_date': ['tarih', 'islemtarihi', 'işlemtarihi', 'date', 'paymentdate', 'valor', 'valör'],
+        'amount': ['tutar', 'amount', 'islemtutari', 'işlemtutarı'],
+        'direction': ['borc/alacak', 'borç/alacak', 'yon', 'yön', 'direction', 'type'],
+        'description': ['aciklama', 'açıklama', 'description', 'details'],
+        'counterparty': ['karsitaraf', 'karşıtaraf', 'gonderen', 'gönderen', 'alici', 'alıcı',
+                         'counterparty', 'name'],
+        'reference_number': ['referans', 'referansno', 'dekontno', 'reference', 'referencenumber'],
+        'invoice_id': ['invoice_id', 'invoiceid', 'faturaid'],
+        'invoice_number': ['faturano', 'fatura_no', 'invoicenumber', 'invoice_number'],
+    }
+    
+    DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y%m%d']
+    
+    def read(self, path, file_format: str = None) -> List[Dict]:
+        """
+        Ekstreyi oku
+        
+        Args:
+            path: Dosya yolu
+            file_format: 'csv' veya 'mt940' (None ise uzantı/içerikten bulunur)
+        
+        Returns:
+            İşlem listesi
+        """
+        path = Path(path)
+        text = self._read_text(path)
+        
+        if file_format is None:
+            is_mt940 = path.suffix.lower() in ('.sta', '.mt940', '.940') or ':61:' in text
+            file_format = 'mt940' if is_mt940 else 'csv'
+        
+        if file_format == 'mt940':
+            return self.parse_mt940(text)
+        if file_format == 'csv':
+            return self.parse_csv(text)
+        raise ValueError(f"Desteklenmeyen ekstre formatı: {file_format}")
+    
+    @staticmethod
+    def _read_text(path: Path) -> str:
+        """Dosyayı UTF-8 (BOM'lu/BOM'suz), olmazsa Windows-1254 olarak oku"""
+        raw = path.read_bytes()
+        for encoding in ('utf-8-sig', 'cp1254'):
+            try:
+                return raw.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return raw.decode('latin-1')
+    
+    @staticmethod
+    def parse_amount(value) -> Optional[float]:
+        """'1.234,56' / '1,234.56' / '1234.56' / '-500' -> float"""
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        
+        text = str(value).strip().replace(' ', '').replace('TL', '').replace('TRY', '')
+        if not text:
+            return None
+        
+        # Son ayraç ondalık ayracıdır
+        if ',' in text and '.' in text:
+            if text.rfind(',') > text.rfind('.'):
+                text = text.replace('.', '').replace(',', '.')
+            else:
+                text = text.replace(',', '')
+        elif ',' in text:
+            text = text.replace(',', '.')
+        
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    
+    def parse_date(self, value) -> Optional[str]:
+        """Desteklenen tarih formatlarından 'YYYY-MM-DD'"""
+        text = str(value or '').strip()[:10]
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return None
+    
+    @staticmethod
+    def find_invoice_numbers(text: str) -> List[str]:
+        """Açıklamadaki e-Fatura numaraları"""
+        return list(dict.fromkeys(INVOICE_NUMBER_PATTERN.findall((text or '').upper())))
+    
+    def _transaction(self, **fields) -> Dict:
+        """Eksik alanları tamamlanmış işlem sözlüğü"""
+        transaction = {
+            'payment_date': None,
+            'amount': None,
+            'direction': self.CREDIT,
+            'description': '',
+            'counterparty': '',
+            'reference_number': None,
+            'invoice_id': None,
+            'invoice_number': None,
+        }
+        transaction.update(fields)
+        
+        reference = (transaction['reference_number'] or '').strip()
+        transaction['reference_number'] = None if reference.upper() in NO_REFERENCES else reference
+        
+        if not transaction['invoice_number']:
+            numbers = self.find_invoice_numbers(transaction['description'])
+            if len(numbers) == 1:
+                transaction['invoice_number'] = numbers[0]
+        return transaction
+    
+    # ========== CSV ==========
+    
+    def _map_csv_header(self, header: List[str]) -> Dict[str, str]:
+        """CSV başlıklarını işlem alanlarına eşle"""
+        mapping = {}
+        for column in header:
+            key = re.sub(r'[\s_]+', '', column.strip().lower())
+            for field, aliases in self.CSV_COLUMNS.items():
+                if field not in mapping and key in [re.sub(r'[\s_]+', '', alias) for alias in aliases]:
+                    mapping[field] = column
+        return mapping
+    
+    def parse_csv(self, text: str) -> List[Dict]:
+        """CSV ekstresini işlem listesine çevir"""
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        
+        reader = csv.DictReader(text.splitlines(), dialect=dialect)
+        mapping = self._map_csv_header(reader.fieldnames or [])
+        
+        if 'amount' not in mapping or 'payment_date' not in mapping:
+            raise ValueError(f"CSV'de tarih/tutar sütunu bulunamadı: {reader.fieldnames}")
+        
+        transactions = []
+        for row in reader:
+            value = lambda field: (row.get(mapping[field]) or '').strip() if field in mapping else ''
+            
+            amount = self.parse_amount(value('amount'))
+            payment_date = self.parse_date(value('payment_date'))
+            if amount is None or amount == 0 or payment_date is None:
+                continue
+            
+            # Yön sütunu yoksa tutarın işaretinden
+            direction_text = value('direction').upper()
+            if direction_text:
+                is_debit = direction_text[0] in ('B', 'D') or direction_text.startswith('ÇIK')
+            else:
+                is_debit = amount < 0
+            
+            invoice_id = value('invoice_id')
+            transactions.append(self._transaction(
+                payment_date=payment_date,
+                amount=abs(amount),
+                direction=self.DEBIT if is_debit else self.CREDIT,
+                description=value('description'),
+                counterparty=value('counterparty'),
+                reference_number=value('reference_number') or None,
+                invoice_id=int(invoice_id) if invoice_id.isdigit() else None,
+                invoice_number=value('invoice_number').upper() or None,
+            ))
+        
+        return transactions
+    
+    # ========== MT940 ==========
+    
+    def parse_mt940(self, text: str) -> List[Dict]:
+        """MT940 hesap özetini işlem listesine çevir"""
+        # Devam satırlarını önceki etikete ekle
+        fields = []
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith(('{', '}', '-}')):
+                continue
+            match = MT940_TAG_PATTERN.match(line)
+            if match:
+                fields.append([match.group('tag'), match.group('value')])
+            elif fields:
+                fields[-1][1] += '\n' + line
+        
+        transactions = []
+        current = None
+        
+        for tag, value in fields:
+            if tag == '61':
+                if current:
+                    transactions.append(current)
+                current = self._parse_mt940_line(value)
+            elif tag == '86' and current is not None:
+                description = ' '.join(part.strip() for part in value.splitlines())
+                current['description'] = description
+                current['counterparty'] = self._mt940_counterparty(description)
+                numbers = self.find_invoice_numbers(description)
+                if len(numbers) == 1:
+                    current['invoice_number'] = numbers[0]
+        
+        if current:
+            transactions.append(current)
+        
+        return [t for t in transactions if t['amount']]
+    
+    def _parse_mt940_line(self, value: str) -> Optional[Dict]:
+        """
+        :61: satırını çöz
+        
+        Referans: banka referansı (// sonrası), yoksa müşteri referansı.
+        :20: ekstre referansı tüm satırlarda aynı olduğundan kullanılmaz;
+        referansı olmayan (NONREF) satırlar referanssız kalır.
+        """
+        first_line, _, extra = value.partition('\n')
+        match = MT940_LINE_PATTERN.match(first_line.strip())
+        if not match:
+            return None
+        
+        # RC/RD = iptal (ters kayıt)
+        mark = match.group('mark')
+        is_debit = (mark == 'D') or (mark == 'RC')
+        
+        rest = match.group('rest')
+        customer_reference, _, bank_reference = rest[4:].partition('//')
+        reference = bank_reference.strip()
+        if reference.upper() in NO_REFERENCES:
+            reference = customer_reference.strip()
+        
+        return self._transaction(
+            payment_date=datetime.strptime(match.group('date'), '%y%m%d').strftime('%Y-%m-%d'),
+            amount=self.parse_amount(match.group('amount')),
+            direction=self.DEBIT if is_debit else self.CREDIT,
+            description=extra.strip(),
+            reference_number=reference,
+        )
+    
+    @staticmethod
+    def _mt940_counterparty(description: str) -> str:
+        """:86: alanından karşı taraf adı (?32/?33 alt alanları veya ilk parça)"""
+        subfields = dict(re.findall(r'\?(\d{2})([^?]*)', description))
+        if subfields:
+            return ' '.join(subfields.get(key, '').strip() for key in ('32', '33')).strip()
+        return description.split('/')[0].strip()
@@ -23,6 +23,28 @@ import sqlite3
 from typing import List, Dict, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
+import sys
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+
+
+# Yaşlandırma kategorileri (gün)
+AGING_BUCKETS = ['0-30', '31-60', '61-90', '90+']
+NOT_DUE_BUCKET = 'Vadesi gelmemiş'
+
+# Yaşlandırma tabanı -> gün hesabında kullanılan tarih
+AGING_BASES = {
+    'issue_date': "i.issue_date",
+    'due_date': "COALESCE(i.payment_due_date, i.issue_date)",
+}
+
+# Kalan tutar (get_payables/get_receivables ile aynı kural: ödenmişse 0,
+# kalan hiç hesaplanmamışsa toplam)
+REMAINING_EXPR = """CASE WHEN COALESCE(i.payment_status, 'UNPAID') = 'PAID' THEN 0
+                ELSE COALESCE(NULLIF(i.remaining_amount, 0), i.total_amount, 0) END"""
 
 
 class DebtTracker:
@@ -49,7 +71,7 @@ class DebtTracker:
         Returns:
             Borç listesi
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -88,7 +110,8 @@ class DebtTracker:
                 'issue_date': row['issue_date'],
                 'total_amount': row['total_amount'] or 0,
                 'paid_amount': row['paid_amount'] or 0,
-                'remaining_amount': row['remaining_amount'] or row['total_amount'] or 0,
+                'remaining_amount': 0 if row['payment_status'] == 'PAID'
+                                    else row['remaining_amount'] or row['total_amount'] or 0,
                 'payment_status': row['payment_status'] or 'UNPAID',
                 'payment_due_date': row['payment_due_date'],
                 'days_old': int(row['days_old']) if row['days_old'] else 0
@@ -104,7 +127,7 @@ class DebtTracker:
         Returns:
             Alacak listesi
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -134,7 +157,8 @@ class DebtTracker:
                 'issue_date': row['issue_date'],
                 'total_amount': row['total_amount'] or 0,
                 'paid_amount': row['paid_amount'] or 0,
-                'remaining_amount': row['remaining_amount'] or row['total_amount'] or 0,
+                'remaining_amount': 0 if row['payment_status'] == 'PAID'
+                                    else row['remaining_amount'] or row['total_amount'] or 0,
                 'payment_status': row['payment_status'] or 'UNPAID',
                 'payment_due_date': row['payment_due_date'],
                 'days_old': int(row['days_old']) if row['days_old'] else 0
@@ -143,54 +167,193 @@ class DebtTracker:
         conn.close()
         return receivables
     
-    def get_payables_summary(self) -> Dict:
-        """Borç özet bilgileri"""
-        payables = self.get_payables()
-        
-        total_payables = sum(p['remaining_amount'] for p in payables)
-        unpaid = [p for p in payables if p['payment_status'] == 'UNPAID']
-        partial = [p for p in payables if p['payment_status'] == 'PARTIAL']
-        
-        # Firma bazında dağılım
-        by_firma = {}
-        for p in payables:
-            firma = p['firma_kodu']
-            if firma not in by_firma:
-                by_firma[firma] = {
-                    'count': 0,
-                    'total': 0,
-                    'remaining': 0
-                }
-            by_firma[firma]['count'] += 1
-            by_firma[firma]['total'] += p['total_amount']
-            by_firma[firma]['remaining'] += p['remaining_amount']
+    def get_summary(self, invoice_type: str) -> Dict:
+        """
+        Borç/alacak özet bilgileri (tek gruplu SQL sorgusu)
+        
+        Args:
+            invoice_type: 'PURCHASE' (borçlar) veya 'SALES' (alacaklar)
+        
+        Returns:
+            Toplamlar, durum sayıları ve firma bazında dağılım
+        """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT
+                i.firma_kodu,
+                COUNT(*) as count,
+                COALESCE(SUM(i.total_amount), 0) as total,
+                COALESCE(SUM(i.paid_amount), 0) as paid,
+                COALESCE(SUM({REMAINING_EXPR}), 0) as remaining,
+                SUM(COALESCE(i.payment_status, 'UNPAID') = 'UNPAID') as unpaid_count,
+                SUM(i.payment_status = 'PARTIAL') as partial_count
+            FROM invoices i
+            WHERE i.invoice_type = ?
+            GROUP BY i.firma_kodu
+            ORDER BY MIN(i.issue_date), MIN(i.id)
+        """, (invoice_type,))
+        
+        rows = cursor.fetchall()
+        conn.close()
         
         return {
-            'total_invoices': len(payables),
-            'total_amount': sum(p['total_amount'] for p in payables),
-            'total_paid': sum(p['paid_amount'] for p in payables),
-            'total_remaining': total_payables,
-            'unpaid_count': len(unpaid),
-            'partial_count': len(partial),
-            'by_firma': by_firma
+            'total_invoices': sum(row['count'] for row in rows),
+            'total_amount': sum(row['total'] for row in rows),
+            'total_paid': sum(row['paid'] for row in rows),
+            'total_remaining': sum(row['remaining'] for row in rows),
+            'unpaid_count': sum(row['unpaid_count'] or 0 for row in rows),
+            'partial_count': sum(row['partial_count'] or 0 for row in rows),
+            'by_firma': {
+                row['firma_kodu']: {
+                    'count': row['count'],
+                    'total': row['total'],
+                    'remaining': row['remaining']
+                }
+                for row in rows
+            }
         }
     
+    def get_payables_summary(self) -> Dict:
+        """Borç özet bilgileri"""
+        return self.get_summary('PURCHASE')
+    
     def get_receivables_summary(self) -> Dict:
         """Alacak özet bilgileri"""
-        receivables = self.get_receivables()
+        summary = self.get_summary('SALES')
+        summary.pop('by_firma')
+        return summary
+    
+    def get_aging_summary(self, invoice_type: str, as_of: str = None,
+                          basis: str = 'issue_date') -> Dict:
+        """
+        Yaşlandırma analizi (SQL tarafında, julianday ile)
         
-        total_receivables = sum(r['remaining_amount'] for r in receivables)
-        unpaid = [r for r in receivables if r['payment_status'] == 'UNPAID']
-        partial = [r for r in receivables if r['payment_status'] == 'PARTIAL']
+        get_aging_buckets() ile aynı kategoriler; faturalar Python'a
+        taşınmadan gruplanır (items listesi yoktur).
         
-        return {
-            'total_invoices': len(receivables),
-            'total_amount': sum(r['total_amount'] for r in receivables),
-            'total_paid': sum(r['paid_amount'] for r in receivables),
-            'total_remaining': total_receivables,
-            'unpaid_count': len(unpaid),
-            'partial_count': len(partial)
-        }
+        as_of verilirse geçmiş bir tarih için rapor üretilir: o tarihe kadar
+        kesilmiş faturalar, o tarihe kadarki ödemeler (payment_records) düşülerek
+        yaşlandırılır. Ödeme durumuna bakılmaz (bugün PAID olan fatura o tarihte
+        açık olabilir); sorgu (invoice_type, issue_date) index'inde aralık taramasıdır.
+        
+        Gün farkı tarih düzeyinde hesaplanır (saat kısmı yok sayılır); vadesi
+        yarın olan fatura -1 gün ile 'Vadesi gelmemiş' grubuna düşer.
+        
+        Args:
+            invoice_type: 'PURCHASE' (borçlar) veya 'SALES' (alacaklar)
+            as_of: Rapor tarihi 'YYYY-MM-DD' (None ise bugün, güncel ödeme durumu)
+            basis: 'issue_date' (fatura tarihi) veya 'due_date'
+                   (vade tarihi; vadesi olmayan faturada fatura tarihi)
+        
+        Returns:
+            {'0-30': {'count': N, 'amount': X}, ...}
+            (basis='due_date' ise ayrıca 'Vadesi gelmemiş')
+        """
+        if basis not in AGING_BASES:
+            raise ValueError(f"Geçersiz yaşlandırma tabanı: {basis} ({', '.join(AGING_BASES)})")
+        
+        date_column = AGING_BASES[basis]
+        
+        if as_of is None:
+            reference = "date('now')"
+            remaining = REMAINING_EXPR
+            where_clause = "i.invoice_type = ? AND COALESCE(i.payment_status, 'UNPAID') != 'PAID'"
+            params = [invoice_type]
+        else:
+            # Geçmiş tarih: şu an PAID olan fatura o tarihte açık olabilir
+            reference = "date(:as_of)"
+            remaining = """i.total_amount - COALESCE((
+                        SELECT SUM(p.amount) FROM payment_records p
+                        WHERE p.invoice_id = i.id AND p.payment_date < date(:as_of, '+1 day')
+                    ), 0)"""
+            # Saatli tarihler ('YYYY-MM-DD HH:MM:SS') o günün içinde kalır
+            where_clause = """i.invoice_type = :invoice_type
+                AND i.issue_date < date(:as_of, '+1 day')"""
+            params = {'invoice_type': invoice_type, 'as_of': as_of}
+        
+        # Vade tabanında rapor tarihinden sonra vadesi gelecek olanlar ayrı
+        not_due_case = f"WHEN days_old < 0 THEN '{NOT_DUE_BUCKET}'" if basis == 'due_date' else ""
+        # Geçmiş tarihte o güne kadar tamamen ödenmiş olanlar hariç
+        open_filter = "WHERE remaining > 0" if as_of is not None else ""
+        
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT
+                CASE
+                    {not_due_case}
+                    WHEN days_old <= 30 THEN '0-30'
+                    WHEN days_old <= 60 THEN '31-60'
+                    WHEN days_old <= 90 THEN '61-90'
+                    ELSE '90+'
+                END as bucket,
+                COUNT(*),
+                COALESCE(SUM(remaining), 0)
+            FROM (
+                SELECT
+                    COALESCE(CAST(julianday({reference}) - julianday(date({date_column})) AS INTEGER), 0) as days_old,
+                    {remaining} as remaining
+                FROM invoices i
+                WHERE {where_clause}
+            )
+            {open_filter}
+            GROUP BY bucket
+        """, params)
+        
+        buckets = {bucket: {'count': 0, 'amount': 0} for bucket in AGING_BUCKETS}
+        if basis == 'due_date':
+            buckets = {NOT_DUE_BUCKET: {'count': 0, 'amount': 0}, **buckets}
+        
+        for bucket, count, amount in cursor.fetchall():
+            buckets[bucket] = {'count': count, 'amount': amount}
+        
+        conn.close()
+        return buckets
+    
+    def get_due_invoices(self, invoice_type: str, start_date: str = None,
+                         end_date: str = None) -> List[Dict]:
+        """
+        Vadesi belirli aralıkta olan ödenmemiş faturalar
+        ((invoice_type, payment_due_date) index'i ile aralık sorgusu)
+        
+        Args:
+            invoice_type: 'PURCHASE' (borçlar) veya 'SALES' (alacaklar)
+            start_date: Başlangıç vadesi 'YYYY-MM-DD' (None ise sınır yok)
+            end_date: Bitiş vadesi 'YYYY-MM-DD' (None ise sınır yok)
+        
+        Returns:
+            Vade tarihine göre sıralı fatura listesi
+        """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT
+                i.id,
+                i.invoice_number,
+                i.firma_kodu,
+                COALESCE(i.supplier_name, i.customer_name) as party_name,
+                i.issue_date,
+                i.payment_due_date,
+                i.total_amount,
+                {REMAINING_EXPR} as remaining_amount,
+                COALESCE(i.payment_status, 'UNPAID') as payment_status
+            FROM invoices i
+            WHERE i.invoice_type = ?
+            AND i.payment_due_date >= COALESCE(?, '')
+            AND i.payment_due_date <= COALESCE(?, '9999-12-31')
+            AND COALESCE(i.payment_status, 'UNPAID') != 'PAID'
+            ORDER BY i.payment_due_date ASC
+        """, (invoice_type, start_date, end_date))
+        
+        invoices = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return invoices
     
     def get_aging_buckets(self, debts: List[Dict]) -> Dict:
         """
@@ -202,18 +365,15 @@ class DebtTracker:
         - 61-90 gün: Vadesi geçen
         - 90+ gün: Çok eski
         
+        Fatura listesi gerekmiyorsa get_aging_summary() kullanın.
+        
         Args:
             debts: Borç/alacak listesi
             
         Returns:
             Yaşlandırma bucket'ları
         """
-        buckets = {
-            '0-30': {'count': 0, 'amount': 0, 'items': []},
-            '31-60': {'count': 0, 'amount': 0, 'items': []},
-            '61-90': {'count': 0, 'amount': 0, 'items': []},
-            '90+': {'count': 0, 'amount': 0, 'items': []}
-        }
+        buckets = {bucket: {'count': 0, 'amount': 0, 'items': []} for bucket in AGING_BUCKETS}
         
         for debt in debts:
             # Sadece ödenmemiş olanları say
@@ -238,10 +398,43 @@ class DebtTracker:
         
         return buckets
     
-    def print_payables_report(self):
-        """Borç raporunu yazdır"""
-        summary = self.get_payables_summary()
-        payables = self.get_payables()
+    @staticmethod
+    def _print_aging(aging: Dict, title: str = "YAŞLANDIRMA ANALİZİ"):
+        """Yaşlandırma satırlarını yazdır"""
+        print(f"\n📅 {title}:")
+        for bucket, data in aging.items():
+            if data['count'] > 0:
+                label = bucket if bucket == NOT_DUE_BUCKET else f"{bucket} gün"
+                print(f"   {label}: {data['count']} fatura - {data['amount']:,.2f} TRY")
+    
+    def print_aging_report(self, as_of: str = None, basis: str = 'issue_date'):
+        """
+        Borç ve alacak yaşlandırma raporu
+        
+        Args:
+            as_of: Rapor tarihi 'YYYY-MM-DD' (örn: geçmiş ay sonu; None ise bugün)
+            basis: 'issue_date' veya 'due_date'
+        """
+        basis_label = "Fatura Tarihine Göre" if basis == 'issue_date' else "Vade Tarihine Göre"
+        
+        print("\n" + "=" * 80)
+        print(f"📅 YAŞLANDIRMA RAPORU - {as_of or 'Bugün'} ({basis_label})")
+        print("=" * 80)
+        
+        self._print_aging(self.get_aging_summary('PURCHASE', as_of, basis), "BORÇLAR")
+        self._print_aging(self.get_aging_summary('SALES', as_of, basis), "ALACAKLAR")
+        
+        print("\n" + "=" * 80)
+    
+    def print_payables_report(self, summary: Dict = None):
+        """
+        Borç raporunu yazdır
+        
+        Args:
+            summary: Hazır get_payables_summary() sonucu (tekrar sorgulamamak için)
+        """
+        if summary is None:
+            summary = self.get_payables_summary()
         
         print("\n" + "=" * 80)
         print("📤 BORÇLARIMIZ (FABRİKALARA ÖDENECEK)")
@@ -264,18 +457,19 @@ class DebtTracker:
             print(f"      Kalan Borç: {data['remaining']:,.2f} TRY")
         
         # Yaşlandırma
-        aging = self.get_aging_buckets(payables)
-        print(f"\n📅 YAŞLANDIRMA ANALİZİ:")
-        for bucket, data in aging.items():
-            if data['count'] > 0:
-                print(f"   {bucket} gün: {data['count']} fatura - {data['amount']:,.2f} TRY")
+        self._print_aging(self.get_aging_summary('PURCHASE'))
         
         print("\n" + "=" * 80)
     
-    def print_receivables_report(self):
-        """Alacak raporunu yazdır"""
-        summary = self.get_receivables_summary()
-        receivables = self.get_receivables()
+    def print_receivables_report(self, summary: Dict = None):
+        """
+        Alacak raporunu yazdır
+        
+        Args:
+            summary: Hazır get_receivables_summary() sonucu (tekrar sorgulamamak için)
+        """
+        if summary is None:
+            summary = self.get_receivables_summary()
         
         print("\n" + "=" * 80)
         print("📥 ALACAKLARIMIZ (MÜŞTERİLERDEN TAHSİL EDİLECEK)")
@@ -290,11 +484,7 @@ class DebtTracker:
         print(f"   Kısmi Ödenen: {summary['partial_count']} fatura")
         
         # Yaşlandırma
-        aging = self.get_aging_buckets(receivables)
-        print(f"\n📅 YAŞLANDIRMA ANALİZİ:")
-        for bucket, data in aging.items():
-            if data['count'] > 0:
-                print(f"   {bucket} gün: {data['count']} fatura - {data['amount']:,.2f} TRY")
+        self._print_aging(self.get_aging_summary('SALES'))
         
         print("\n" + "=" * 80)
     
@@ -304,13 +494,14 @@ class DebtTracker:
         print("💰 BORÇ/ALACAK TAKİP RAPORU")
         print("=" * 80)
         
-        self.print_payables_report()
-        self.print_receivables_report()
-        
-        # Net durum
+        # Özetler bir kez hesaplanır, tüm bölümlerde kullanılır
         payables_summary = self.get_payables_summary()
         receivables_summary = self.get_receivables_summary()
         
+        self.print_payables_report(payables_summary)
+        self.print_receivables_report(receivables_summary)
+        
+        # Net durum
         net_position = receivables_summary['total_remaining'] - payables_summary['total_remaining']
         
         print("\n" + "=" * 80)
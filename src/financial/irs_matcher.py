@@ -13,17 +13,33 @@ Amaç:
 Mantık:
 1. Alış faturaları (AK GİPS, FULLBOARD) → despatch_documents tablosundan IRS numaraları
 2. Satış faturaları (API) → description alanından IRS numaraları (regex ile)
-3. Normalize edilmiş IRS numarası ile eşleştirme
+3. Normalize edilmiş IRS numarası ile eşleştirme (IRS -> satış faturası hash index'i)
 4. Kar/Zarar = Satış Tutarı - Alış Tutarı
 5. Kar Marjı = (Kar/Zarar ÷ Alış Tutarı) × 100
+
+Artımlı mod (--incremental):
+- invoices/despatch_documents trigger'ları değişen fatura ID'lerini
+  irs_match_changes tablosuna yazar
+- Sadece bu faturaların IRS numaralarını paylaşan grup yeniden eşleştirilir
+- Tüm güncelleme tek transaction içinde yapılır
 """
 
 import sqlite3
-import re
+import sys
+import json
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 from pathlib import Path
 
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.connection import get_connection
+from src.parsers.description_parser import normalize_irs_number, extract_normalized_irs
+from src.database.schema_migration import DatabaseMigration
+from src.financial.match_frame import MatchFrame
+
 
 class IRSMatcher:
     """İrsaliye eşleştirme ve kar/zarar hesaplama sınıfı"""
@@ -48,7 +64,6 @@ class IRSMatcher:
         Örnekler:
         - "A-14740" -> "14740"
         - "F-07904" -> "7904"
-        - "IRS2025000014740" -> "14740"
         - "IRS14740" -> "14740"
         - "14740" -> "14740"
         
@@ -58,25 +73,7 @@ class IRSMatcher:
         Returns:
             Normalize edilmiş numara (sadece rakamlar, baştaki sıfırlar yok)
         """
-        if not irs_full:
-            return ""
-        
-        # String'e çevir
-        irs = str(irs_full).strip().upper()
-        
-        # Firma prefix'ini kaldır (A-, F-, API-, vb.)
-        irs = re.sub(r'^[A-Z]+-', '', irs)
-        
-        # IRS önekini ve ardındaki sıfırları kaldır
-        # IRS2025000014740 -> 14740
-        # IRS000014740 -> 14740
-        irs = re.sub(r'^IRS\d*?0*', 'IRS', irs)
-        irs = irs.replace('IRS', '')
-        
-        # Baştaki sıfırları kaldır
-        irs = irs.lstrip('0') or '0'
-        
-        return irs
+        return normalize_irs_number(irs_full)
     
     def extract_irs_from_description(self, description: str) -> List[str]:
         """
@@ -95,48 +92,41 @@ class IRSMatcher:
         Returns:
             Bulunan irsaliye numaraları listesi (normalize edilmiş)
         """
-        if not description or description.strip() == '':
-            return []
-        
-        irs_numbers = []
-        
-        # Pattern'ler (öncelik sırasına göre)
-        patterns = [
-            r'IRS\s*NO[:\s]*([A-Z]-)?(\d+)',  # IRS NO: 14740 veya IRS NO: A-14740
-            r'İRSALİYE\s*(?:NO)?[:\s]*([A-Z]-)?(\d+)',  # İrsaliye: 14740
-            r'IRSALIYE\s*(?:NO)?[:\s]*([A-Z]-)?(\d+)',  # Irsaliye: 14740
-            r'IRS[:\s]*([A-Z]-)?(\d+)',  # IRS:14740
-            r'(?:^|\s)([A-Z]-)?(\d{5,})',  # Tek başına 5+ haneli numara
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, description.upper())
-            for match in matches:
-                # Son grubu al (rakamlar)
-                groups = match.groups()
-                number = groups[-1]  # Son grup her zaman rakamlar
-                
-                # 5 haneden kısa numaraları atla (false positive)
-                if len(number) >= 5:
-                    normalized = self.normalize_irs_number(number)
-                    if normalized and normalized not in irs_numbers:
-                        irs_numbers.append(normalized)
-        
-        return irs_numbers
+        return extract_normalized_irs(description)
     
-    def get_purchase_invoices_with_irs(self) -> List[Dict]:
+    def get_purchase_invoices_with_irs(self, irs_keys: set = None,
+                                       conn: sqlite3.Connection = None) -> List[Dict]:
         """
         Alış faturalarını (AK GİPS, FULLBOARD) ve irsaliye numaralarını getir
         
+        Args:
+            irs_keys: Sadece bu normalize IRS numaralarına sahip satırlar (None ise hepsi)
+            conn: Açık bağlantı (None ise yeni bağlantı açılır)
+        
         Returns:
             List of dicts with invoice and IRS info
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection(self.db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        # Persist edilmiş normalize sütun varsa kullan (migration ile eklenir)
+        has_column = self.has_irs_normalized_column(cursor)
+        irs_column = "d.irs_normalized" if has_column else "NULL"
+        
+        # IRS filtresi index üzerinden (NULL kalmış satırlar Python'da normalize edilir)
+        key_filter = ""
+        params = ()
+        if irs_keys is not None and has_column:
+            key_filter = """
+            AND (d.irs_normalized IN (SELECT value FROM json_each(?))
+                 OR d.irs_normalized IS NULL)"""
+            params = (json.dumps(list(irs_keys)),)
         
         # Alış faturaları ve irsaliye numaraları
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 i.id as invoice_id,
                 i.invoice_number,
@@ -145,15 +135,19 @@ class IRSMatcher:
                 i.issue_date,
                 i.supplier_name,
                 d.despatch_id_short,
-                d.despatch_id_full
+                d.despatch_id_full,
+                {irs_column} as irs_normalized
             FROM invoices i
             JOIN despatch_documents d ON i.id = d.invoice_id
-            WHERE i.invoice_type = 'PURCHASE'
-            ORDER BY i.issue_date DESC
-        """)
+            WHERE i.invoice_type = 'PURCHASE'{key_filter}
+            ORDER BY i.issue_date DESC, i.id DESC, d.id
+        """, params)
         
         invoices = []
         for row in cursor.fetchall():
+            irs_normalized = row['irs_normalized'] or self.normalize_irs_number(row['despatch_id_short'])
+            if irs_keys is not None and irs_normalized not in irs_keys:
+                continue
             invoices.append({
                 'invoice_id': row['invoice_id'],
                 'invoice_number': row['invoice_number'],
@@ -163,25 +157,39 @@ class IRSMatcher:
                 'supplier_name': row['supplier_name'],
                 'irs_short': row['despatch_id_short'],
                 'irs_full': row['despatch_id_full'],
-                'irs_normalized': self.normalize_irs_number(row['despatch_id_short'])
+                'irs_normalized': irs_normalized
             })
         
-        conn.close()
+        if own_conn:
+            conn.close()
         return invoices
     
-    def get_sales_invoices_with_irs(self) -> List[Dict]:
+    def get_sales_invoices_with_irs(self, invoice_ids: set = None,
+                                    conn: sqlite3.Connection = None) -> List[Dict]:
         """
         Satış faturalarını (API) ve description'dan çıkarılan irsaliye numaralarını getir
         
+        Args:
+            invoice_ids: Sadece bu fatura ID'leri (None ise hepsi)
+            conn: Açık bağlantı (None ise yeni bağlantı açılır)
+        
         Returns:
             List of dicts with invoice and IRS info
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection(self.db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         # Satış faturaları
-        cursor.execute("""
+        id_filter = ""
+        params = ()
+        if invoice_ids is not None:
+            id_filter = "AND id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(invoice_ids)),)
+        
+        cursor.execute(f"""
             SELECT 
                 id as invoice_id,
                 invoice_number,
@@ -193,8 +201,9 @@ class IRSMatcher:
             WHERE invoice_type = 'SALES'
             AND description IS NOT NULL
             AND description != ''
-            ORDER BY issue_date DESC
-        """)
+            {id_filter}
+            ORDER BY issue_date DESC, id DESC
+        """, params)
         
         invoices = []
         for row in cursor.fetchall():
@@ -212,9 +221,104 @@ class IRSMatcher:
                     'irs_numbers': irs_numbers  # Liste (birden fazla olabilir)
                 })
         
-        conn.close()
+        if own_conn:
+            conn.close()
         return invoices
     
+    @staticmethod
+    def build_sales_index(sales_invoices: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Normalize IRS numarası -> satış faturaları index'i oluştur
+        
+        Her anahtarın listesi satış faturalarının sırasını korur; böylece
+        eşleştirme sonucu eski iç içe döngü ile birebir aynı kalır.
+        
+        Args:
+            sales_invoices: get_sales_invoices_with_irs() çıktısı
+            
+        Returns:
+            {irs_normalized: [sales, ...]} dictionary'si
+        """
+        index = {}
+        for sales in sales_invoices:
+            for sales_irs in set(sales['irs_numbers']):
+                index.setdefault(sales_irs, []).append(sales)
+        return index
+    
+    @staticmethod
+    def build_match(purchase: Dict, sales: Dict) -> Dict:
+        """
+        Bir alış irsaliyesi ile satış faturasından eşleşme kaydı oluştur
+        
+        Args:
+            purchase: Alış faturası irsaliye satırı
+            sales: Satış faturası
+            
+        Returns:
+            Eşleşme dictionary'si (kar/zarar hesaplanmış)
+        """
+        purchase_amt = purchase['total_amount']
+        sales_amt = sales['total_amount']
+        
+        # Kar/Zarar hesapla
+        profit_loss = sales_amt - purchase_amt
+        profit_margin = (profit_loss / purchase_amt * 100) if purchase_amt > 0 else 0
+        
+        return {
+            'irs_number': purchase['irs_short'],
+            'irs_normalized': purchase['irs_normalized'],
+            'purchase_invoice_id': purchase['invoice_id'],
+            'purchase_invoice_no': purchase['invoice_number'],
+            'purchase_amount': purchase_amt,
+            'purchase_date': purchase['issue_date'],
+            'supplier': purchase['firma_kodu'],
+            'supplier_name': purchase['supplier_name'],
+            'sales_invoice_id': sales['invoice_id'],
+            'sales_invoice_no': sales['invoice_number'],
+            'sales_amount': sales_amt,
+            'sales_date': sales['issue_date'],
+            'customer_name': sales['customer_name'],
+            'profit_loss': profit_loss,
+            'profit_margin': profit_margin,
+            'status': 'PROFITABLE' if profit_loss > 0 else 'LOSS' if profit_loss < 0 else 'BREAK_EVEN'
+        }
+    
+    def match_invoices(self, purchase_invoices: List[Dict], sales_invoices: List[Dict]) -> List[Dict]:
+        """
+        Alış irsaliyelerini satış faturalarıyla hash-join ile eşleştir
+        
+        Kural (eski iç içe döngü ile aynı): alış satırları sırayla işlenir,
+        her satış faturası en fazla bir kez eşleşir ve bir alış satırı aynı
+        IRS'e sahip henüz eşleşmemiş TÜM satış faturalarını alır.
+        
+        Karmaşıklık: O(P + S×k) - her index girdisi en fazla bir kez geçilir
+        
+        Args:
+            purchase_invoices: get_purchase_invoices_with_irs() çıktısı
+            sales_invoices: get_sales_invoices_with_irs() çıktısı
+            
+        Returns:
+            Eşleşmelerin listesi
+        """
+        index = self.build_sales_index(sales_invoices)
+        matched_sales = set()  # Tekrar eşleşmeyi önle
+        matches = []
+        
+        for purchase in purchase_invoices:
+            # pop: aynı IRS'e sahip sonraki alış satırları için aday kalmaz
+            candidates = index.pop(purchase['irs_normalized'], None)
+            if not candidates:
+                continue
+            
+            for sales in candidates:
+                # Başka bir IRS üzerinden zaten eşleşmiş mi?
+                if sales['invoice_id'] in matched_sales:
+                    continue
+                matches.append(self.build_match(purchase, sales))
+                matched_sales.add(sales['invoice_id'])
+        
+        return matches
+    
     def find_matches(self) -> List[Dict]:
         """
         Alış ve satış faturalarında IRS numarası eşleşmesi ara
@@ -231,51 +335,7 @@ class IRSMatcher:
         print(f"   📦 {len(purchase_invoices)} alış faturasında irsaliye bulundu")
         print(f"   📤 {len(sales_invoices)} satış faturasında irsaliye bulundu")
         
-        matches = []
-        matched_sales = set()  # Tekrar eşleşmeyi önle
-        
-        # Her alış faturası için satış faturalarında eşleşme ara
-        for purchase in purchase_invoices:
-            purchase_irs = purchase['irs_normalized']
-            
-            for sales in sales_invoices:
-                # Bu satış faturası zaten eşleştirilmiş mi?
-                if sales['invoice_id'] in matched_sales:
-                    continue
-                
-                # Satış faturasının IRS numaralarından herhangi biri eşleşiyor mu?
-                for sales_irs in sales['irs_numbers']:
-                    if sales_irs == purchase_irs:
-                        # Eşleşme bulundu!
-                        purchase_amt = purchase['total_amount']
-                        sales_amt = sales['total_amount']
-                        
-                        # Kar/Zarar hesapla
-                        profit_loss = sales_amt - purchase_amt
-                        profit_margin = (profit_loss / purchase_amt * 100) if purchase_amt > 0 else 0
-                        
-                        match = {
-                            'irs_number': purchase['irs_short'],
-                            'irs_normalized': purchase_irs,
-                            'purchase_invoice_id': purchase['invoice_id'],
-                            'purchase_invoice_no': purchase['invoice_number'],
-                            'purchase_amount': purchase_amt,
-                            'purchase_date': purchase['issue_date'],
-                            'supplier': purchase['firma_kodu'],
-                            'supplier_name': purchase['supplier_name'],
-                            'sales_invoice_id': sales['invoice_id'],
-                            'sales_invoice_no': sales['invoice_number'],
-                            'sales_amount': sales_amt,
-                            'sales_date': sales['issue_date'],
-                            'customer_name': sales['customer_name'],
-                            'profit_loss': profit_loss,
-                            'profit_margin': profit_margin,
-                            'status': 'PROFITABLE' if profit_loss > 0 else 'LOSS' if profit_loss < 0 else 'BREAK_EVEN'
-                        }
-                        
-                        matches.append(match)
-                        matched_sales.add(sales['invoice_id'])
-                        break  # Bu alış faturası için eşleşme bulundu, diğer IRS'lere bakmaya gerek yok
+        matches = self.match_invoices(purchase_invoices, sales_invoices)
         
         self.matches = matches
         print(f"\n✅ {len(matches)} eşleşme bulundu")
@@ -299,12 +359,33 @@ class IRSMatcher:
             print("⚠️  Kaydedilecek eşleşme yok")
             return 0
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Önce mevcut eşleşmeleri temizle
         cursor.execute("DELETE FROM irs_matching")
         
+        saved_count = self.insert_matches(cursor, matches)
+        
+        # Artımlı takip varsa: tam çalıştırma sonrası kuyruk boşalır
+        if self.has_tracking_tables(cursor):
+            self.refresh_sales_irs(cursor)
+            cursor.execute("DELETE FROM irs_match_changes")
+        
+        conn.commit()
+        conn.close()
+        
+        print(f"💾 {saved_count} eşleşme veritabanına kaydedildi")
+        return saved_count
+    
+    @staticmethod
+    def insert_matches(cursor, matches: List[Dict]) -> int:
+        """
+        Eşleşmeleri irs_matching tablosuna ekle (commit yapmaz)
+        
+        Returns:
+            Eklenen eşleşme sayısı
+        """
         saved_count = 0
         for match in matches:
             try:
@@ -326,12 +407,227 @@ class IRSMatcher:
                 saved_count += 1
             except Exception as e:
                 print(f"⚠️  Eşleşme kaydedilemedi: {e}")
+        return saved_count
+    
+    # ========== ARTIMLI EŞLEŞTİRME ==========
+    
+    @staticmethod
+    def has_irs_normalized_column(cursor) -> bool:
+        """despatch_documents.irs_normalized sütunu var mı?"""
+        cursor.execute("PRAGMA table_info(despatch_documents)")
+        return 'irs_normalized' in [row[1] for row in cursor.fetchall()]
+    
+    @staticmethod
+    def has_tracking_tables(cursor) -> bool:
+        """Artımlı eşleştirme takip tabloları var mı?"""
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='irs_match_changes'
+        """)
+        return cursor.fetchone() is not None
+    
+    def refresh_sales_irs(self, cursor, invoice_ids: set = None) -> int:
+        """
+        sales_irs tablosunu description'lardan yeniden doldur
         
-        conn.commit()
-        conn.close()
+        Args:
+            cursor: Açık transaction'daki cursor
+            invoice_ids: Sadece bu faturalar (None ise tüm tablo)
+            
+        Returns:
+            Eklenen (fatura, IRS) satır sayısı
+        """
+        if invoice_ids is None:
+            cursor.execute("DELETE FROM sales_irs")
+            cursor.execute("""
+                SELECT id, description FROM invoices
+                WHERE invoice_type = 'SALES'
+                AND description IS NOT NULL AND description != ''
+            """)
+        else:
+            ids_json = json.dumps(list(invoice_ids))
+            cursor.execute("""
+                DELETE FROM sales_irs
+                WHERE invoice_id IN (SELECT value FROM json_each(?))
+            """, (ids_json,))
+            cursor.execute("""
+                SELECT id, description FROM invoices
+                WHERE invoice_type = 'SALES'
+                AND description IS NOT NULL AND description != ''
+                AND id IN (SELECT value FROM json_each(?))
+            """, (ids_json,))
+        
+        rows = [
+            (invoice_id, irs)
+            for invoice_id, description in cursor.fetchall()
+            for irs in self.extract_irs_from_description(description)
+        ]
+        cursor.executemany("""
+            INSERT OR IGNORE INTO sales_irs (invoice_id, irs_normalized) VALUES (?, ?)
+        """, rows)
+        return len(rows)
+    
+    @staticmethod
+    def expand_affected(cursor, irs_keys: set, sales_ids: set) -> Tuple[set, set]:
+        """
+        Etkilenen IRS numaraları ve satış faturalarının kapanışını bul
         
-        print(f"💾 {saved_count} eşleşme veritabanına kaydedildi")
-        return saved_count
+        Bir satış faturası birden fazla IRS içerebildiği için, IRS <-> satış
+        bağlantısıyla ulaşılabilen tüm grup birlikte yeniden eşleştirilir.
+        Grup dışındaki eşleşmeler bu değişiklikten etkilenmez.
+        
+        Returns:
+            (irs_keys, sales_ids)
+        """
+        irs_keys = set(irs_keys)
+        sales_ids = set(sales_ids)
+        pending_keys, pending_sales = set(irs_keys), set(sales_ids)
+        
+        while pending_keys or pending_sales:
+            new_sales = set()
+            if pending_keys:
+                cursor.execute("""
+                    SELECT DISTINCT invoice_id FROM sales_irs
+                    WHERE irs_normalized IN (SELECT value FROM json_each(?))
+                """, (json.dumps(list(pending_keys)),))
+                new_sales = {row[0] for row in cursor.fetchall()} - sales_ids
+            
+            new_keys = set()
+            lookup_sales = pending_sales | new_sales
+            if lookup_sales:
+                cursor.execute("""
+                    SELECT DISTINCT irs_normalized FROM sales_irs
+                    WHERE invoice_id IN (SELECT value FROM json_each(?))
+                """, (json.dumps(list(lookup_sales)),))
+                new_keys = {row[0] for row in cursor.fetchall()} - irs_keys
+            
+            sales_ids |= new_sales
+            irs_keys |= new_keys
+            pending_keys, pending_sales = new_keys, new_sales
+        
+        return irs_keys, sales_ids
+    
+    def find_matches_incremental(self) -> Dict:
+        """
+        Sadece son çalıştırmadan beri değişen faturaları yeniden eşleştir
+        
+        irs_match_changes kuyruğundaki faturaların eski ve yeni IRS
+        numaralarından etkilenen grup bulunur, gruba ait irs_matching
+        satırları silinip yeniden hesaplanır. Tümü tek transaction'dır;
+        hata olursa hiçbir değişiklik kalmaz ve kuyruk korunur.
+        
+        Returns:
+            {'changed_invoices', 'affected_irs', 'affected_sales',
+             'removed', 'saved', 'matches'} dictionary'si
+        """
+        print("\n🔁 Artımlı irsaliye eşleştirmesi...")
+        
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        
+        # Takip tabloları yoksa oluştur (ilk çalıştırmada tüm faturalar kuyruğa girer)
+        if not self.has_tracking_tables(cursor):
+            DatabaseMigration(self.db_path).create_irs_tracking_tables(cursor)
+            conn.commit()
+        
+        result = {
+            'changed_invoices': 0,
+            'affected_irs': 0,
+            'affected_sales': 0,
+            'removed': 0,
+            'saved': 0,
+            'matches': []
+        }
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            cursor.execute("SELECT invoice_id FROM irs_match_changes")
+            changed_ids = {row[0] for row in cursor.fetchall()}
+            result['changed_invoices'] = len(changed_ids)
+            
+            if not changed_ids:
+                conn.rollback()
+                print("   ✅ Değişen fatura yok, eşleşmeler güncel")
+                return result
+            
+            changed_json = json.dumps(list(changed_ids))
+            seed_keys = set()
+            seed_sales = set()
+            
+            # 1. Değişen faturaların ESKİ eşleşmeleri
+            cursor.execute("""
+                SELECT irs_number, sales_invoice_id FROM irs_matching
+                WHERE purchase_invoice_id IN (SELECT value FROM json_each(?1))
+                OR sales_invoice_id IN (SELECT value FROM json_each(?1))
+            """, (changed_json,))
+            for irs_number, sales_invoice_id in cursor.fetchall():
+                seed_keys.add(self.normalize_irs_number(irs_number))
+                seed_sales.add(sales_invoice_id)
+            
+            # 2. Değişen satış faturalarının ESKİ IRS numaraları
+            cursor.execute("""
+                SELECT irs_normalized FROM sales_irs
+                WHERE invoice_id IN (SELECT value FROM json_each(?))
+            """, (changed_json,))
+            seed_keys.update(row[0] for row in cursor.fetchall())
+            
+            # 3. Değişen satış faturalarının YENİ IRS numaraları
+            self.refresh_sales_irs(cursor, changed_ids)
+            cursor.execute("""
+                SELECT invoice_id, irs_normalized FROM sales_irs
+                WHERE invoice_id IN (SELECT value FROM json_each(?))
+            """, (changed_json,))
+            for invoice_id, irs_normalized in cursor.fetchall():
+                seed_sales.add(invoice_id)
+                seed_keys.add(irs_normalized)
+            
+            # 4. Değişen alış faturalarının YENİ irsaliyeleri
+            cursor.execute("""
+                SELECT d.despatch_id_short FROM despatch_documents d
+                JOIN invoices i ON i.id = d.invoice_id
+                WHERE i.invoice_type = 'PURCHASE'
+                AND d.invoice_id IN (SELECT value FROM json_each(?))
+            """, (changed_json,))
+            seed_keys.update(self.normalize_irs_number(row[0]) for row in cursor.fetchall())
+            
+            # 5. Etkilenen grubu genişlet
+            irs_keys, sales_ids = self.expand_affected(cursor, seed_keys, seed_sales)
+            result['affected_irs'] = len(irs_keys)
+            result['affected_sales'] = len(sales_ids)
+            
+            # 6. Grubun eski eşleşmelerini sil, yeniden hesapla
+            cursor.execute("""
+                DELETE FROM irs_matching
+                WHERE sales_invoice_id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(list(sales_ids)),))
+            result['removed'] = cursor.rowcount
+            
+            matches = []
+            if irs_keys and sales_ids:
+                purchase_invoices = self.get_purchase_invoices_with_irs(irs_keys=irs_keys, conn=conn)
+                sales_invoices = self.get_sales_invoices_with_irs(invoice_ids=sales_ids, conn=conn)
+                matches = self.match_invoices(purchase_invoices, sales_invoices)
+            
+            result['saved'] = self.insert_matches(cursor, matches)
+            result['matches'] = matches
+            
+            # 7. İşlenen kuyruğu temizle
+            cursor.execute("DELETE FROM irs_match_changes")
+            
+            conn.commit()
+            
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        print(f"   📝 {result['changed_invoices']} değişen fatura")
+        print(f"   🔗 {result['affected_irs']} IRS / {result['affected_sales']} satış faturası yeniden eşleştirildi")
+        print(f"   🗑️  {result['removed']} eski eşleşme silindi, 💾 {result['saved']} eşleşme kaydedildi")
+        
+        return result
     
     def generate_report(self, matches: List[Dict] = None) -> Dict:
         """
@@ -346,40 +642,14 @@ class IRSMatcher:
         if matches is None:
             matches = self.matches
         
-        if not matches:
-            return {
-                'total_matches': 0,
-                'profitable_count': 0,
-                'loss_count': 0,
-                'break_even_count': 0,
-                'total_profit': 0,
-                'total_loss': 0,
-                'net_profit': 0,
-                'avg_profit_margin': 0,
-                'matches': []
-            }
-        
-        # İstatistikler
-        profitable = [m for m in matches if m['profit_loss'] > 0]
-        loss_making = [m for m in matches if m['profit_loss'] < 0]
-        break_even = [m for m in matches if m['profit_loss'] == 0]
-        
-        total_profit = sum(m['profit_loss'] for m in profitable)
-        total_loss = sum(abs(m['profit_loss']) for m in loss_making)
-        net_profit = total_profit - total_loss
-        avg_margin = sum(m['profit_margin'] for m in matches) / len(matches)
-        
-        report = {
-            'total_matches': len(matches),
-            'profitable_count': len(profitable),
-            'loss_count': len(loss_making),
-            'break_even_count': len(break_even),
-            'total_profit': total_profit,
-            'total_loss': total_loss,
-            'net_profit': net_profit,
-            'avg_profit_margin': avg_margin,
-            'matches': matches
-        }
+        # Tüm hesaplamalar vektörel (NumPy/pandas)
+        frame = MatchFrame.from_matches(matches)
+        
+        report = frame.summary()
+        report['margin_percentiles'] = frame.percentiles()
+        report['by_supplier'] = frame.by_supplier().to_dict('records')
+        report['by_customer'] = frame.by_customer().to_dict('records')
+        report['matches'] = matches or []
         
         return report
     
@@ -404,6 +674,16 @@ class IRSMatcher:
         print(f"   Net Kar: {report['net_profit']:,.2f} TRY")
         print(f"   Ortalama Kar Marjı: {report['avg_profit_margin']:.2f}%")
         
+        if report['total_matches'] and report.get('margin_percentiles'):
+            p = report['margin_percentiles']
+            print(f"   Kar Marjı Dağılımı: P10 {p['p10']:.2f}% | P50 {p['p50']:.2f}% | P90 {p['p90']:.2f}%")
+        
+        if report.get('by_supplier'):
+            print(f"\n🏭 TEDARİKÇİ BAZINDA:")
+            for row in report['by_supplier']:
+                print(f"   {row['supplier_name']}: {row['match_count']} eşleşme, "
+                      f"Net Kar {row['net_profit']:,.2f} TRY ({row['avg_profit_margin']:.2f}%)")
+        
         # Detaylı liste (ilk 20)
         if report['matches']:
             print("\n" + "=" * 80)
@@ -451,6 +731,12 @@ class IRSMatcher:
 def main():
     """Ana fonksiyon"""
     matcher = IRSMatcher()
+    
+    if '--incremental' in sys.argv:
+        result = matcher.find_matches_incremental()
+        print(f"\n✅ Artımlı eşleştirme tamamlandı ({result['saved']} eşleşme güncellendi)")
+        return 0
+    
     report = matcher.run_full_analysis()
     
     # Sonuç kodu döndür
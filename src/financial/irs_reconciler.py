@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İrsaliye Mutabakat (Reconciliation) Modülü
+==========================================
+
+IRSMatcher her satış faturasını tek bir alış irsaliyesine bağlar. Gerçekte:
+- Bir alış faturası birden fazla irsaliye içerebilir (bire-çok)
+- Bir satış faturası birden fazla irsaliyeye atıf yapabilir (çoka-bir)
+- Aynı irsaliye birden fazla alış/satış faturasında geçebilir (çoka-çok)
+
+Bu modül tüm ilişkileri tutarları bölüştürerek eşleştirir:
+
+1. Alış faturası tutarı irsaliyelerine satır tutarlarına göre dağıtılır
+   (satır miktarı × birim fiyat; satırlar irsaliyeye bağlı değilse eşit)
+2. Satış faturası tutarı atıf yaptığı irsaliyelere, irsaliyelerin alış
+   tutarı oranında dağıtılır
+3. Aynı irsaliyedeki her (alış, satış) çifti iki tarafın payı oranında
+   tutar alır; toplamlar korunur (dağıtılan tutarların toplamı = fatura tutarı)
+
+Tüm hesaplama pandas ile küme bazlı (merge/groupby) yapılır.
+
+Kullanım:
+    from src.financial.irs_reconciler import IRSReconciler
+    
+    reconciler = IRSReconciler()
+    allocations = reconciler.reconcile()
+    reconciler.save_allocations(allocations)
+"""
+
+import json
+import sqlite3
+import sys
+from typing import Dict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.connection import get_connection
+from src.database.schema_migration import DatabaseMigration
+from src.financial.irs_matcher import IRSMatcher
+from src.financial.match_frame import MatchFrame
+
+
+def _safe_share(values: pd.Series, totals: pd.Series, counts: pd.Series) -> np.ndarray:
+    """values / totals; toplam 0 ise eşit pay (1 / count)"""
+    values = values.to_numpy(dtype=float)
+    totals = totals.to_numpy(dtype=float)
+    share = 1.0 / counts.to_numpy(dtype=float)
+    np.divide(values, totals, out=share, where=totals > 0)
+    return share
+
+
+class IRSReconciler:
+    """Çoka-çok irsaliye mutabakatı ve tutar dağıtımı sınıfı"""
+    
+    # Dağıtım yöntemleri
+    METHOD_LINES = 'LINES'   # Fatura satırlarının irsaliye bağlantısına göre
+    METHOD_EQUAL = 'EQUAL'   # Satır bilgisi yoksa irsaliyeler arasında eşit
+    
+    def __init__(self, db_path: str = None):
+        """
+        Args:
+            db_path: Veritabanı dosya yolu (None ise birlesik.db kullanılır)
+        """
+        if db_path is None:
+            project_root = Path(__file__).resolve().parent.parent.parent
+            db_path = project_root / "data" / "db" / "birlesik.db"
+        
+        self.db_path = str(db_path)
+        self.matcher = IRSMatcher(self.db_path)
+    
+    # ========== VERİ YÜKLEME ==========
+    
+    def load_purchase_despatches(self, conn: sqlite3.Connection) -> pd.DataFrame:
+        """Alış faturası - irsaliye satırları (fatura başına tekil irsaliye)"""
+        rows = self.matcher.get_purchase_invoices_with_irs(conn=conn)
+        df = pd.DataFrame(rows, columns=[
+            'invoice_id', 'invoice_number', 'total_amount', 'firma_kodu', 'issue_date',
+            'supplier_name', 'irs_short', 'irs_full', 'irs_normalized'
+        ])
+        df = df.rename(columns={
+            'invoice_id': 'purchase_invoice_id',
+            'invoice_number': 'purchase_invoice_no',
+            'total_amount': 'purchase_total',
+            'firma_kodu': 'supplier',
+            'issue_date': 'purchase_date',
+            'irs_short': 'irs_number',
+            'irs_full': 'despatch_id_full',
+        })
+        # Birleştirme tekrarlarından gelen aynı irsaliye satırlarını tekille
+        return df.drop_duplicates(['purchase_invoice_id', 'irs_normalized'])
+    
+    @staticmethod
+    def load_line_amounts(conn: sqlite3.Connection, invoice_ids=None) -> pd.DataFrame:
+        """
+        Fatura satırlarının irsaliye bazında toplamları
+        
+        Args:
+            conn: Açık bağlantı (birlesik.db veya parser veritabanı)
+            invoice_ids: Sadece bu faturalar (None = tümü)
+        """
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(invoice_lines)")]
+        if 'despatch_id_full' not in columns:
+            return pd.DataFrame(columns=['invoice_id', 'despatch_id_full', 'line_amount', 'line_quantity'])
+        
+        id_filter = ""
+        params = ()
+        if invoice_ids is not None:
+            id_filter = "AND invoice_id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps([int(i) for i in invoice_ids]),)
+        
+        return pd.read_sql_query(f"""
+            SELECT
+                invoice_id,
+                despatch_id_full,
+                SUM(COALESCE(line_total, quantity * unit_price, 0)) as line_amount,
+                SUM(COALESCE(quantity, 0)) as line_quantity
+            FROM invoice_lines
+            WHERE despatch_id_full IS NOT NULL
+            {id_filter}
+            GROUP BY invoice_id, despatch_id_full
+        """, conn, params=params)
+    
+    def load_sales_references(self, conn: sqlite3.Connection) -> pd.DataFrame:
+        """Satış faturası - atıf yapılan irsaliye satırları"""
+        rows = self.matcher.get_sales_invoices_with_irs(conn=conn)
+        df = pd.DataFrame(rows, columns=[
+            'invoice_id', 'invoice_number', 'total_amount', 'issue_date',
+            'customer_name', 'description', 'irs_numbers'
+        ])
+        df = df.drop(columns=['description']).rename(columns={
+            'invoice_id': 'sales_invoice_id',
+            'invoice_number': 'sales_invoice_no',
+            'total_amount': 'sales_total',
+            'issue_date': 'sales_date',
+            'irs_numbers': 'irs_normalized',
+        })
+        return df.explode('irs_normalized').dropna(subset=['irs_normalized'])
+    
+    # ========== DAĞITIM ==========
+    
+    @staticmethod
+    def despatch_shares(despatches: pd.DataFrame, lines: pd.DataFrame,
+                        invoice_key: str = 'invoice_id') -> pd.DataFrame:
+        """
+        Her faturanın tutarının irsaliyelerine düşen payını hesapla
+        
+        Args:
+            despatches: [invoice_key, despatch_id_full, ...] satırları
+            lines: load_line_amounts() çıktısı
+            invoice_key: despatches içindeki fatura ID sütunu
+        
+        Returns:
+            despatches + share, line_quantity, allocation_method sütunları
+        """
+        df = despatches.merge(
+            lines.rename(columns={'invoice_id': invoice_key}),
+            on=[invoice_key, 'despatch_id_full'],
+            how='left'
+        )
+        df['line_amount'] = df['line_amount'].astype(float)
+        
+        group = df.groupby(invoice_key)
+        invoice_line_total = group['line_amount'].transform('sum')
+        despatch_count = group[invoice_key].transform('size')
+        
+        df['share'] = _safe_share(df['line_amount'].fillna(0), invoice_line_total, despatch_count)
+        df['allocation_method'] = np.where(
+            invoice_line_total > 0, IRSReconciler.METHOD_LINES, IRSReconciler.METHOD_EQUAL
+        )
+        return df
+    
+    @classmethod
+    def allocate(cls, purchases: pd.DataFrame, lines: pd.DataFrame,
+                 sales: pd.DataFrame) -> pd.DataFrame:
+        """
+        Alış irsaliyeleri ile satış atıflarını tutar dağıtarak eşleştir
+        
+        Args:
+            purchases: load_purchase_despatches() çıktısı
+            lines: load_line_amounts() çıktısı
+            sales: load_sales_references() çıktısı
+        
+        Returns:
+            Her (irsaliye, alış, satış) çifti için bir satır;
+            purchase_amount / sales_amount dağıtılmış tutarlardır
+        """
+        # 1. Alış faturası -> irsaliye payı
+        p = cls.despatch_shares(purchases, lines, invoice_key='purchase_invoice_id')
+        p['purchase_allocated'] = p['purchase_total'].astype(float) * p['share']
+        
+        # İrsaliye içinde alış payı
+        key_group = p.groupby('irs_normalized')['purchase_allocated']
+        p['key_purchase_total'] = key_group.transform('sum')
+        p['purchase_key_share'] = _safe_share(
+            p['purchase_allocated'], p['key_purchase_total'], key_group.transform('size')
+        )
+        
+        # 2. Satış faturası -> irsaliye payı (sadece alışı bulunan irsaliyeler)
+        key_amounts = p.groupby('irs_normalized', as_index=False)['purchase_allocated'].sum()
+        key_amounts = key_amounts.rename(columns={'purchase_allocated': 'key_amount'})
+        s = sales.merge(key_amounts, on='irs_normalized', how='inner')
+        
+        sales_group = s.groupby('sales_invoice_id')['key_amount']
+        s['sales_share'] = _safe_share(
+            s['key_amount'], sales_group.transform('sum'), sales_group.transform('size')
+        )
+        s['sales_allocated'] = s['sales_total'].astype(float) * s['sales_share']
+        
+        # İrsaliye içinde satış payı
+        key_group = s.groupby('irs_normalized')['sales_allocated']
+        s['sales_key_share'] = _safe_share(
+            s['sales_allocated'], key_group.transform('sum'), key_group.transform('size')
+        )
+        
+        # 3. Aynı irsaliyedeki tüm (alış, satış) çiftleri
+        pairs = p.merge(s, on='irs_normalized', how='inner')
+        pairs['purchase_amount'] = pairs['purchase_allocated'] * pairs['sales_key_share']
+        pairs['sales_amount'] = pairs['sales_allocated'] * pairs['purchase_key_share']
+        
+        columns = [
+            'irs_number', 'irs_normalized', 'despatch_id_full',
+            'purchase_invoice_id', 'purchase_invoice_no', 'purchase_date',
+            'supplier', 'supplier_name', 'purchase_total', 'share', 'line_quantity',
+            'allocation_method',
+            'sales_invoice_id', 'sales_invoice_no', 'sales_date', 'customer_name',
+            'sales_total', 'sales_share',
+            'purchase_amount', 'sales_amount',
+        ]
+        pairs = pairs[columns].rename(columns={'share': 'purchase_share'})
+        
+        # Kar/zarar ve durum MatchFrame ile (vektörel)
+        return MatchFrame(pairs).df
+    
+    def reconcile(self) -> pd.DataFrame:
+        """Veritabanından yükle ve mutabakatı hesapla"""
+        conn = get_connection(self.db_path)
+        try:
+            purchases = self.load_purchase_despatches(conn)
+            lines = self.load_line_amounts(conn)
+            sales = self.load_sales_references(conn)
+        finally:
+            conn.close()
+        
+        return self.allocate(purchases, lines, sales)
+    
+    # ========== KAYIT VE RAPOR ==========
+    
+    def save_allocations(self, allocations: pd.DataFrame) -> int:
+        """
+        Dağıtım sonuçlarını irs_reconciliation tablosuna yaz (tek transaction)
+        
+        Returns:
+            Kaydedilen satır sayısı
+        """
+        columns = [
+            'irs_number', 'irs_normalized', 'purchase_invoice_id', 'sales_invoice_id',
+            'purchase_share', 'sales_share', 'purchase_amount', 'sales_amount',
+            'profit_loss', 'profit_margin', 'status', 'allocation_method'
+        ]
+        rows = allocations[columns].astype(object).where(allocations[columns].notna(), None)
+        
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                migration = DatabaseMigration(self.db_path)
+                if not migration.check_table_exists(cursor, 'irs_reconciliation'):
+                    migration.create_irs_reconciliation_table(cursor)
+                
+                cursor.execute("DELETE FROM irs_reconciliation")
+                cursor.executemany(f"""
+                    INSERT INTO irs_reconciliation ({', '.join(columns)})
+                    VALUES ({', '.join('?' * len(columns))})
+                """, rows.itertuples(index=False, name=None))
+        finally:
+            conn.close()
+        
+        print(f"💾 {len(rows)} mutabakat satırı veritabanına kaydedildi")
+        return len(rows)
+    
+    @staticmethod
+    def generate_report(allocations: pd.DataFrame) -> Dict:
+        """Mutabakat özeti (MatchFrame özeti + ilişki türleri)"""
+        frame = MatchFrame(allocations)
+        report = frame.summary()
+        
+        per_key = allocations.groupby('irs_normalized').agg(
+            purchases=('purchase_invoice_id', 'nunique'),
+            sales=('sales_invoice_id', 'nunique'),
+        )
+        report['despatch_count'] = len(per_key)
+        report['one_to_one'] = int(((per_key['purchases'] == 1) & (per_key['sales'] == 1)).sum())
+        report['one_to_many'] = int(((per_key['purchases'] == 1) & (per_key['sales'] > 1)).sum())
+        report['many_to_one'] = int(((per_key['purchases'] > 1) & (per_key['sales'] == 1)).sum())
+        report['many_to_many'] = int(((per_key['purchases'] > 1) & (per_key['sales'] > 1)).sum())
+        report['line_allocated'] = int((allocations['allocation_method'] == IRSReconciler.METHOD_LINES).sum())
+        report['margin_percentiles'] = frame.percentiles()
+        return report
+    
+    def print_report(self, report: Dict):
+        """Mutabakat raporunu yazdır"""
+        print("\n" + "=" * 80)
+        print("📊 İRSALİYE MUTABAKAT RAPORU (ÇOKA-ÇOK)")
+        print("=" * 80)
+        
+        print(f"\n🔗 İLİŞKİLER ({report['despatch_count']} irsaliye):")
+        print(f"   Bire-bir: {report['one_to_one']}")
+        print(f"   Bire-çok (1 alış, N satış): {report['one_to_many']}")
+        print(f"   Çoka-bir (N alış, 1 satış): {report['many_to_one']}")
+        print(f"   Çoka-çok: {report['many_to_many']}")
+        print(f"   Satır bazlı dağıtılan: {report['line_allocated']} / {report['total_matches']}")
+        
+        print(f"\n💰 FİNANSAL ÖZET:")
+        print(f"   Toplam Kar: {report['total_profit']:,.2f} TRY")
+        print(f"   Toplam Zarar: {report['total_loss']:,.2f} TRY")
+        print(f"   Net Kar: {report['net_profit']:,.2f} TRY")
+        print(f"   Ortalama Kar Marjı: {report['avg_profit_margin']:.2f}%")
+        print("\n" + "=" * 80)
+    
+    def run_full_reconciliation(self) -> Dict:
+        """Mutabakat: hesapla, kaydet, raporla"""
+        print(f"\n📁 Veritabanı: {self.db_path}")
+        
+        allocations = self.reconcile()
+        self.save_allocations(allocations)
+        
+        report = self.generate_report(allocations)
+        self.print_report(report)
+        return report
+
+
+def main():
+    """Ana fonksiyon"""
+    reconciler = IRSReconciler()
+    report = reconciler.run_full_reconciliation()
+    return 0 if report['total_matches'] > 0 else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IRS Eşleşme Çerçevesi (Match Frame)
+===================================
+
+İrsaliye eşleşmeleri üzerinde kar/zarar hesaplarını NumPy/pandas ile
+vektörel olarak yapar. IRSMatcher raporu ve IRSReconciler aynı
+hesaplamayı kullanır. Bilanço toplamları (balance_summary 'MATCH' satırı)
+aynı formülleri trigger'larda SQL ile uygular;
+BalanceCalculator.check_match_consistency() ikisini karşılaştırır.
+
+Hesaplananlar:
+- profit_loss = Satış Tutarı - Alış Tutarı
+- profit_margin = (profit_loss ÷ Alış Tutarı) × 100 (alış 0 ise 0)
+- status = PROFITABLE / LOSS / BREAK_EVEN
+- Özet, yüzdelikler, tedarikçi/müşteri bazında kırılımlar
+
+Kullanım:
+    from src.financial.match_frame import MatchFrame
+    
+    frame = MatchFrame.from_matches(matcher.matches)   # veya MatchFrame(df)
+    frame.summary()         # {'total_matches': ..., 'net_profit': ...}
+    frame.percentiles()     # {'p50': ..., 'p90': ...}
+    frame.by_supplier()     # DataFrame
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class MatchFrame:
+    """İrsaliye eşleşmeleri için vektörel kar/zarar hesaplama sınıfı"""
+    
+    # Eşleşme kayıtlarında bulunması beklenen sütunlar
+    COLUMNS = [
+        'irs_number', 'purchase_invoice_id', 'sales_invoice_id',
+        'purchase_amount', 'sales_amount',
+        'supplier', 'supplier_name', 'customer_name',
+    ]
+    
+    STATUS_PROFITABLE = 'PROFITABLE'
+    STATUS_LOSS = 'LOSS'
+    STATUS_BREAK_EVEN = 'BREAK_EVEN'
+    
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: Eşleşme satırları (en az purchase_amount ve sales_amount)
+        """
+        df = df.copy()
+        for column in self.COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+        
+        purchase = pd.to_numeric(df['purchase_amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        sales = pd.to_numeric(df['sales_amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        
+        profit_loss = sales - purchase
+        
+        # Sıfıra bölme uyarısı olmadan kar marjı
+        margin = np.zeros_like(profit_loss)
+        np.divide(profit_loss * 100, purchase, out=margin, where=purchase > 0)
+        
+        df['purchase_amount'] = purchase
+        df['sales_amount'] = sales
+        df['profit_loss'] = profit_loss
+        df['profit_margin'] = margin
+        df['status'] = np.select(
+            [profit_loss > 0, profit_loss < 0],
+            [self.STATUS_PROFITABLE, self.STATUS_LOSS],
+            default=self.STATUS_BREAK_EVEN
+        )
+        
+        self.df = df
+    
+    @classmethod
+    def from_matches(cls, matches: List[Dict]) -> 'MatchFrame':
+        """IRSMatcher.find_matches() çıktısından oluştur"""
+        if not matches:
+            return cls(pd.DataFrame(columns=cls.COLUMNS))
+        return cls(pd.DataFrame.from_records(matches))
+    
+    def __len__(self) -> int:
+        return len(self.df)
+    
+    def summary(self) -> Dict:
+        """
+        Genel kar/zarar özeti
+        
+        Returns:
+            generate_report() ile aynı anahtarlar (matches hariç)
+        """
+        profit_loss = self.df['profit_loss'].to_numpy()
+        
+        total_profit = float(profit_loss[profit_loss > 0].sum())
+        total_loss = float(np.abs(profit_loss[profit_loss < 0]).sum())
+        
+        return {
+            'total_matches': len(self.df),
+            'profitable_count': int((profit_loss > 0).sum()),
+            'loss_count': int((profit_loss < 0).sum()),
+            'break_even_count': int((profit_loss == 0).sum()),
+            'total_profit': total_profit,
+            'total_loss': total_loss,
+            'net_profit': total_profit - total_loss,
+            'avg_profit_margin': float(self.df['profit_margin'].mean()) if len(self.df) else 0
+        }
+    
+    def percentiles(self, column: str = 'profit_margin',
+                    quantiles: Sequence[float] = (0.1, 0.25, 0.5, 0.75, 0.9)) -> Dict:
+        """
+        Sütun yüzdelikleri
+        
+        Args:
+            column: profit_margin veya profit_loss
+            quantiles: 0-1 arası yüzdelikler
+        
+        Returns:
+            {'p10': ..., 'p50': ..., ...}
+        """
+        values = self.df[column].to_numpy(dtype=float)
+        if len(values) == 0:
+            return {f"p{round(q * 100)}": 0.0 for q in quantiles}
+        
+        results = np.quantile(values, quantiles)
+        return {f"p{round(q * 100)}": float(value) for q, value in zip(quantiles, results)}
+    
+    def _breakdown(self, key: str) -> pd.DataFrame:
+        """Verilen sütuna göre kar/zarar kırılımı"""
+        df = self.df.assign(**{key: self.df[key].fillna('Bilinmiyor')})
+        df['profit'] = df['profit_loss'].clip(lower=0)
+        df['loss'] = (-df['profit_loss']).clip(lower=0)
+        
+        grouped = df.groupby(key, sort=False).agg(
+            match_count=('profit_loss', 'size'),
+            purchase_amount=('purchase_amount', 'sum'),
+            sales_amount=('sales_amount', 'sum'),
+            total_profit=('profit', 'sum'),
+            total_loss=('loss', 'sum'),
+            net_profit=('profit_loss', 'sum'),
+            avg_profit_margin=('profit_margin', 'mean'),
+        )
+        return grouped.sort_values('net_profit', ascending=False).reset_index()
+    
+    def by_supplier(self) -> pd.DataFrame:
+        """Tedarikçi bazında kar/zarar"""
+        return self._breakdown('supplier_name')
+    
+    def by_customer(self) -> pd.DataFrame:
+        """Müşteri bazında kar/zarar"""
+        return self._breakdown('customer_name')
@@ -9,6 +9,7 @@ Amaç:
 - Fatura ödeme durumlarını güncelleme
 - Ödeme geçmişi takibi
 - Kısmi ödeme desteği
+- Toplu ödeme yükleme ve banka ekstresi (CSV/MT940) aktarımı
 
 Kullanım:
     from src.financial.payment_manager import PaymentManager
@@ -16,13 +17,29 @@ Kullanım:
     pm = PaymentManager()
     pm.add_payment(invoice_id=123, amount=5000, payment_method='BANK_TRANSFER')
     pm.get_invoice_payments(invoice_id=123)
+    
+    # Toplu ödeme / banka ekstresi
+    pm.add_payments_bulk([{'invoice_id': 123, 'amount': 5000, 'payment_date': '2025-01-15'}, ...])
+    pm.import_bank_statement('ekstre.sta')
 """
 
+import json
 import sqlite3
+import sys
 from typing import List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
 
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+from src.database.payment_status import (
+    PAYMENT_STATUS_TRIGGERS, REMAINING_RULE, STATUS_RULE, payment_status_assignments
+)
+from src.financial.bank_statement import BankStatementReader
+from src.financial.payment_matcher import PaymentMatcher
+
 
 class PaymentManager:
     """Ödeme yönetim sınıfı"""
@@ -36,6 +53,63 @@ class PaymentManager:
         'OTHER'  # Diğer
     ]
     
+    # Toplu yüklemede her partide eklenen ödeme sayısı
+    BATCH_SIZE = 500
+    
+    # Ekstre yönü -> fatura tipi (giden ödeme = alış, gelen tahsilat = satış)
+    DIRECTION_INVOICE_TYPES = {
+        BankStatementReader.DEBIT: 'PURCHASE',
+        BankStatementReader.CREDIT: 'SALES',
+    }
+    
+    INSERT_PAYMENT_SQL = """
+        INSERT INTO payment_records (
+            invoice_id, payment_date, amount, payment_method,
+            reference_number, notes
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """
+    
+    # Verilen faturaların (JSON dizisi) ödeme durumunu tek sorguda yeniden hesaplar.
+    # Ödemesi kalmayan fatura LEFT JOIN sayesinde UNPAID'e döner.
+    RECOMPUTE_STATUS_SQL = f"""
+        UPDATE invoices
+        SET {payment_status_assignments('ROUND(p.total_paid, 2)')}
+        FROM (
+            SELECT ids.invoice_id, COALESCE(SUM(pr.amount), 0) as total_paid
+            FROM (SELECT DISTINCT value as invoice_id FROM json_each(?)) ids
+            LEFT JOIN payment_records pr ON pr.invoice_id = ids.invoice_id
+            GROUP BY ids.invoice_id
+        ) p
+        WHERE invoices.id = p.invoice_id
+    """
+    
+    # Kayıtlı değerleri payment_records'tan beklenenle karşılaştırır
+    CONSISTENCY_CHECK_SQL = f"""
+        SELECT
+            i.id as invoice_id,
+            i.invoice_number,
+            i.total_amount,
+            i.paid_amount,
+            i.remaining_amount,
+            i.payment_status,
+            e.paid as expected_paid,
+            {REMAINING_RULE.format(total='e.total', paid='e.paid')} as expected_remaining,
+            {STATUS_RULE.format(total='e.total', paid='e.paid')} as expected_status
+        FROM invoices i
+        JOIN (
+            SELECT inv.id, COALESCE(inv.total_amount, 0) as total,
+                   ROUND(COALESCE(SUM(pr.amount), 0), 2) as paid
+            FROM invoices inv
+            LEFT JOIN payment_records pr ON pr.invoice_id = inv.id
+            GROUP BY inv.id
+        ) e ON e.id = i.id
+        WHERE ABS(COALESCE(i.paid_amount, 0) - expected_paid) > 0.005
+           OR i.remaining_amount IS NULL
+           OR ABS(i.remaining_amount - expected_remaining) > 0.005
+           OR i.payment_status IS NOT expected_status
+        ORDER BY i.id
+    """
+    
     def __init__(self, db_path: str = None):
         """
         Args:
@@ -78,21 +152,18 @@ class PaymentManager:
             print(f"   Geçerli yöntemler: {', '.join(self.PAYMENT_METHODS)}")
             payment_method = 'OTHER'
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Ödeme kaydını ekle
-        cursor.execute("""
-            INSERT INTO payment_records (
-                invoice_id, payment_date, amount, payment_method,
-                reference_number, notes
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (invoice_id, payment_date, amount, payment_method, reference_number, notes))
+        cursor.execute(self.INSERT_PAYMENT_SQL,
+                       (invoice_id, payment_date, amount, payment_method, reference_number, notes))
         
         payment_id = cursor.lastrowid
         
-        # Fatura ödeme durumunu güncelle
-        self._update_invoice_payment_status(cursor, invoice_id)
+        # Fatura ödeme durumunu güncelle (trigger varsa zaten güncellendi)
+        if not self.has_status_triggers(cursor):
+            self._update_invoice_payment_status(cursor, invoice_id)
         
         conn.commit()
         conn.close()
@@ -100,49 +171,258 @@ class PaymentManager:
         print(f"✅ Ödeme kaydı eklendi (ID: {payment_id})")
         return payment_id
     
+    @staticmethod
+    def has_status_triggers(cursor) -> bool:
+        """payment_records trigger'ları (schema_migration) kurulu mu?"""
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN (SELECT value FROM json_each(?))",
+            (json.dumps(PAYMENT_STATUS_TRIGGERS),)
+        )
+        return cursor.fetchone()[0] == len(PAYMENT_STATUS_TRIGGERS)
+    
     def _update_invoice_payment_status(self, cursor, invoice_id: int):
         """Faturanın ödeme durumunu güncelle"""
-        # Toplam ödenen miktarı hesapla
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount), 0) as total_paid
-            FROM payment_records
-            WHERE invoice_id = ?
-        """, (invoice_id,))
+        self.recompute_payment_status(cursor, [invoice_id])
+    
+    def recompute_payment_status(self, cursor, invoice_ids: List[int]) -> int:
+        """
+        Faturaların paid_amount / remaining_amount / payment_status değerlerini
+        tek bir UPDATE ... FROM sorgusuyla yeniden hesapla
+        
+        Args:
+            cursor: Açık transaction içindeki cursor
+            invoice_ids: Etkilenen fatura ID'leri (tekrar edebilir)
+        
+        Returns:
+            Güncellenen fatura sayısı
+        """
+        if not invoice_ids:
+            return 0
+        cursor.execute(self.RECOMPUTE_STATUS_SQL, (json.dumps([int(i) for i in invoice_ids]),))
+        return cursor.rowcount
+    
+    def add_payments_bulk(self, payments: List[Dict], batch_size: int = None) -> int:
+        """
+        Çok sayıda ödeme kaydını tek transaction içinde ekle
+        
+        Ödemeler executemany ile partiler halinde eklenir. payment_records
+        trigger'ları varsa faturalar satır başına artımlı güncellenir; yoksa her
+        partiden sonra etkilenen faturalar tek bir set tabanlı UPDATE ile
+        yeniden hesaplanır.
         
-        total_paid = cursor.fetchone()[0]
+        Args:
+            payments: add_payment() parametreleriyle aynı anahtarlara sahip sözlükler
+                      (invoice_id ve amount zorunlu)
+            batch_size: Parti büyüklüğü (None ise BATCH_SIZE)
+        
+        Returns:
+            Eklenen ödeme sayısı
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        rows = []
+        invalid_methods = set()
+        for payment in payments:
+            payment_method = payment.get('payment_method') or 'BANK_TRANSFER'
+            if payment_method not in self.PAYMENT_METHODS:
+                invalid_methods.add(payment_method)
+                payment_method = 'OTHER'
+            
+            rows.append((
+                int(payment['invoice_id']),
+                payment.get('payment_date') or today,
+                float(payment['amount']),
+                payment_method,
+                payment.get('reference_number'),
+                payment.get('notes'),
+            ))
+        
+        if invalid_methods:
+            print(f"⚠️  Geçersiz ödeme yöntemleri OTHER olarak kaydedildi: {', '.join(sorted(invalid_methods))}")
+            print(f"   Geçerli yöntemler: {', '.join(self.PAYMENT_METHODS)}")
+        
+        if not rows:
+            return 0
+        
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                use_triggers = self.has_status_triggers(cursor)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    cursor.executemany(self.INSERT_PAYMENT_SQL, batch)
+                    if not use_triggers:
+                        self.recompute_payment_status(cursor, [row[0] for row in batch])
+        finally:
+            conn.close()
+        
+        print(f"✅ {len(rows)} ödeme kaydı eklendi")
+        return len(rows)
+    
+    def _resolve_statement_invoices(self, cursor, transactions: List[Dict]) -> List[Optional[int]]:
+        """
+        Ekstre işlemlerinin fatura ID'lerini bul (invoice_id veya birebir fatura numarası)
+        
+        Aynı numaralı birden fazla fatura varsa işlem yönüne uyan fatura tipi seçilir.
+        """
+        invoice_numbers = sorted({t['invoice_number'] for t in transactions if t.get('invoice_number')})
+        invoice_ids = sorted({t['invoice_id'] for t in transactions if t.get('invoice_id')})
         
-        # Fatura toplam tutarını al
         cursor.execute("""
-            SELECT total_amount FROM invoices WHERE id = ?
-        """, (invoice_id,))
+            SELECT id, invoice_number, invoice_type
+            FROM invoices
+            WHERE invoice_number IN (SELECT value FROM json_each(?))
+               OR id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(invoice_numbers), json.dumps(invoice_ids)))
+        
+        existing_ids = set()
+        by_number = {}
+        for invoice_id, invoice_number, invoice_type in cursor.fetchall():
+            existing_ids.add(invoice_id)
+            by_number.setdefault(invoice_number, []).append((invoice_id, invoice_type))
+        
+        resolved = []
+        for transaction in transactions:
+            if transaction.get('invoice_id'):
+                resolved.append(transaction['invoice_id'] if transaction['invoice_id'] in existing_ids else None)
+                continue
+            
+            candidates = by_number.get(transaction.get('invoice_number'), [])
+            if len(candidates) > 1:
+                expected_type = self.DIRECTION_INVOICE_TYPES.get(transaction['direction'])
+                candidates = [c for c in candidates if c[1] == expected_type]
+            resolved.append(candidates[0][0] if len(candidates) == 1 else None)
         
-        result = cursor.fetchone()
-        if not result:
-            return
+        return resolved
+    
+    def import_bank_statement(
+        self,
+        path,
+        file_format: str = None,
+        payment_method: str = 'BANK_TRANSFER',
+        auto_match: bool = False,
+        min_confidence: str = 'HIGH'
+    ) -> Dict:
+        """
+        Banka ekstresini (CSV/MT940) okuyup fatura eşleşen işlemleri toplu ödeme olarak ekle
         
-        total_amount = result[0]
-        remaining = total_amount - total_paid
+        Eşleşme: invoice_id sütunu veya açıklamada/fatura_no sütununda birebir fatura numarası.
+        Aynı referans numarası + fatura + tutar ile daha önce eklenmiş işlemler atlanır,
+        böylece aynı ekstre iki kez yüklenebilir. Referanssız (NONREF) işlemler bu
+        kontrole girmez; aynı faturaya eşit taksitler ayrı ödeme olarak eklenir.
         
-        # Ödeme durumunu belirle
-        if remaining <= 0:
-            status = 'PAID'
-        elif total_paid > 0:
-            status = 'PARTIAL'
-        else:
-            status = 'UNPAID'
+        auto_match=True ise bu şekilde eşleşmeyen işlemler PaymentMatcher'a
+        (tutar / fatura numarası / karşı taraf) verilir ve min_confidence ve
+        üzerindeki öneriler de eklenir.
+        
+        Args:
+            path: Ekstre dosyası
+            file_format: 'csv' / 'mt940' (None ise otomatik)
+            payment_method: Kaydedilecek ödeme yöntemi
+            auto_match: Eşleşmeyen işlemler için otomatik eşleştirme
+            min_confidence: Otomatik eşleşmede kabul edilen en düşük güven
         
-        # Güncelle
+        Returns:
+            {'total': ..., 'imported': ..., 'auto_matched': ..., 'duplicates': ...,
+             'unmatched': [işlemler]}
+        """
+        transactions = BankStatementReader().read(path, file_format)
+        
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        resolved = self._resolve_statement_invoices(cursor, transactions)
+        
+        auto_matched = 0
+        if auto_match:
+            pending = [i for i, invoice_id in enumerate(resolved) if invoice_id is None]
+            matcher = PaymentMatcher(self.db_path)
+            matcher.load_open_invoices(conn)
+            matches = matcher.match([transactions[i] for i in pending])
+            accepted = matcher.accepted_levels(min_confidence)
+            for index, match in zip(pending, matches):
+                if match['confidence'] in accepted:
+                    resolved[index] = match['invoice_id']
+                    auto_matched += 1
+        
+        # Daha önce yüklenmiş işlemler (referans + fatura + tutar)
+        references = sorted({t['reference_number'] for t in transactions if t.get('reference_number')})
         cursor.execute("""
-            UPDATE invoices
-            SET paid_amount = ?,
-                remaining_amount = ?,
-                payment_status = ?
-            WHERE id = ?
-        """, (total_paid, max(0, remaining), status, invoice_id))
+            SELECT reference_number, invoice_id, ROUND(amount, 2)
+            FROM payment_records
+            WHERE reference_number IN (SELECT value FROM json_each(?))
+        """, (json.dumps(references),))
+        existing = set(cursor.fetchall())
+        conn.close()
+        
+        payments = []
+        unmatched = []
+        duplicates = 0
+        for transaction, invoice_id in zip(transactions, resolved):
+            if invoice_id is None:
+                unmatched.append(transaction)
+                continue
+            
+            # Sadece işleme özel referansla tekrar kontrolü
+            if transaction['reference_number']:
+                key = (transaction['reference_number'], invoice_id, round(transaction['amount'], 2))
+                if key in existing:
+                    duplicates += 1
+                    continue
+                existing.add(key)
+            
+            payments.append({
+                'invoice_id': invoice_id,
+                'amount': transaction['amount'],
+                'payment_date': transaction['payment_date'],
+                'payment_method': payment_method,
+                'reference_number': transaction['reference_number'],
+                'notes': transaction['description'] or None,
+            })
+        
+        imported = self.add_payments_bulk(payments)
+        
+        print(f"🏦 Ekstre: {len(transactions)} işlem | ✅ {imported} eklendi "
+              f"({auto_matched} otomatik) | ⏭️  {duplicates} tekrar | ⚠️  {len(unmatched)} eşleşmedi")
+        
+        return {
+            'total': len(transactions),
+            'imported': imported,
+            'auto_matched': auto_matched,
+            'duplicates': duplicates,
+            'unmatched': unmatched
+        }
+    
+    def check_payment_consistency(self, fix: bool = False) -> List[Dict]:
+        """
+        Faturalardaki paid_amount / remaining_amount / payment_status değerlerini
+        payment_records toplamlarıyla karşılaştır
+        
+        Args:
+            fix: True ise tutarsız faturalar yeniden hesaplanır
+        
+        Returns:
+            Tutarsız faturalar (kayıtlı ve beklenen değerlerle)
+        """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(self.CONSISTENCY_CHECK_SQL)
+        mismatches = [dict(row) for row in cursor.fetchall()]
+        
+        if fix and mismatches:
+            self.recompute_payment_status(cursor, [row['invoice_id'] for row in mismatches])
+            conn.commit()
+        
+        conn.close()
+        return mismatches
     
     def get_invoice_payments(self, invoice_id: int) -> List[Dict]:
         """Faturaya ait tüm ödemeleri getir"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -159,7 +439,7 @@ class PaymentManager:
     
     def delete_payment(self, payment_id: int) -> bool:
         """Ödeme kaydını sil ve fatura durumunu güncelle"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Önce invoice_id'yi al
@@ -176,8 +456,9 @@ class PaymentManager:
         # Ödemeyi sil
         cursor.execute("DELETE FROM payment_records WHERE id = ?", (payment_id,))
         
-        # Fatura durumunu güncelle
-        self._update_invoice_payment_status(cursor, invoice_id)
+        # Fatura durumunu güncelle (trigger varsa zaten güncellendi)
+        if not self.has_status_triggers(cursor):
+            self._update_invoice_payment_status(cursor, invoice_id)
         
         conn.commit()
         conn.close()
@@ -195,7 +476,7 @@ class PaymentManager:
         Returns:
             Özet bilgiler
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -282,6 +563,9 @@ def main():
     print("payments = pm.get_invoice_payments(invoice_id=123)")
     print("\n# Ödeme silmek için:")
     print("pm.delete_payment(payment_id=1)")
+    print("\n# Toplu ödeme / banka ekstresi yüklemek için:")
+    print("pm.add_payments_bulk([{'invoice_id': 123, 'amount': 5000, 'payment_date': '2025-01-15'}])")
+    print("result = pm.import_bank_statement('ekstre.sta')  # CSV veya MT940")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ödeme - Fatura Eşleştirme Modülü
+================================
+
+Banka ekstresindeki işlemler için açık (ödenmemiş/kısmi) faturalardan
+eşleşme önerisi üretir.
+
+Eşleştirme ölçütleri:
+- Fatura numarası: Açıklamada geçen e-Fatura numarası (hash indeksi)
+- Tutar: Kalan veya toplam tutar (1 TL'lik tutar kovaları, ±tolerans)
+- Karşı taraf: Tedarikçi/müşteri adı kelime örtüşmesi (sadece puan)
+
+Açık faturalar bir kez okunup indekslenir; her işlem için yalnızca
+numara ve tutar indeksinden gelen adaylar puanlanır. Karşılaştırma
+sayısı işlem × fatura yerine işlem × aday kadardır.
+
+Kullanım:
+    from src.financial.payment_matcher import PaymentMatcher
+    
+    matcher = PaymentMatcher()
+    matches = matcher.match_statement('ekstre.sta')
+    payments = matcher.to_payments(matches)   # HIGH güvenli öneriler
+    PaymentManager().add_payments_bulk(payments)
+"""
+
+import re
+import sqlite3
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import get_connection
+from src.financial.bank_statement import BankStatementReader
+from src.financial.debt_tracker import REMAINING_EXPR
+
+
+# Puanlar
+SCORE_INVOICE_NUMBER = 60
+SCORE_AMOUNT_REMAINING = 30
+SCORE_AMOUNT_TOTAL = 25
+SCORE_COUNTERPARTY = 20          # Ad örtüşme oranıyla çarpılır
+PENALTY_BEFORE_ISSUE = 15        # Ödeme fatura tarihinden önce
+
+# Öneri eşikleri (karşı taraf tek başına MIN_SCORE'a ulaşamaz)
+MIN_SCORE = 40
+CONFIDENCE_LEVELS = [('HIGH', 80), ('MEDIUM', 50), ('LOW', MIN_SCORE)]
+
+# Şirket adlarındaki ayırt edici olmayan kelimeler
+NAME_STOPWORDS = {
+    'A', 'S', 'AS', 'LTD', 'STI', 'SIRKETI', 'LIMITED', 'ANONIM', 'SAN', 'SANAYI',
+    'TIC', 'TICARET', 'VE', 'INS', 'INSAAT', 'PAZ', 'PAZARLAMA', 'DIS', 'IC', 'TAAH',
+}
+
+TURKISH_ASCII = str.maketrans('İIıŞşĞğÜüÖöÇç', 'IIISSGGUUOOCC')
+
+
+def normalize_name_tokens(name: str) -> frozenset:
+    """Şirket adını karşılaştırılabilir kelime kümesine çevir"""
+    text = (name or '').translate(TURKISH_ASCII).upper()
+    tokens = re.findall(r'[A-Z0-9]+', text)
+    return frozenset(t for t in tokens if t not in NAME_STOPWORDS and len(t) > 1)
+
+
+class PaymentMatcher:
+    """Banka işlemi -> fatura eşleştirme sınıfı"""
+    
+    # Ekstre yönü -> fatura tipi ve karşı taraf sütunu
+    DIRECTIONS = {
+        BankStatementReader.DEBIT: ('PURCHASE', 'supplier_name'),
+        BankStatementReader.CREDIT: ('SALES', 'customer_name'),
+    }
+    
+    def __init__(self, db_path: str = None, amount_tolerance: float = 0.01, max_candidates: int = 3):
+        """
+        Args:
+            db_path: Veritabanı dosya yolu (None ise birlesik.db kullanılır)
+            amount_tolerance: Tutar eşleşmesinde kabul edilen fark (TL, 1'den küçük)
+            max_candidates: İşlem başına döndürülen aday sayısı
+        """
+        if db_path is None:
+            project_root = Path(__file__).resolve().parent.parent.parent
+            db_path = project_root / "data" / "db" / "birlesik.db"
+        
+        if not 0 <= amount_tolerance < 1:
+            raise ValueError("amount_tolerance 0 ile 1 TL arasında olmalı")
+        
+        self.db_path = str(db_path)
+        self.amount_tolerance = amount_tolerance
+        self.max_candidates = max_candidates
+        
+        self.invoices = {}
+        self._by_number = {}
+        self._by_amount = {}
+    
+    # ========== İNDEKS ==========
+    
+    def load_open_invoices(self, conn: sqlite3.Connection = None) -> int:
+        """
+        Açık faturaları okuyup numara ve tutar indekslerini kur
+        
+        Returns:
+            İndekslenen fatura sayısı
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection(self.db_path)
+        
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT
+                i.id,
+                i.invoice_number,
+                i.invoice_type,
+                i.firma_kodu,
+                i.issue_date,
+                i.supplier_name,
+                i.customer_name,
+                COALESCE(i.total_amount, 0) as total_amount,
+                {REMAINING_EXPR} as remaining
+            FROM invoices i
+            WHERE COALESCE(i.payment_status, 'UNPAID') != 'PAID'
+              AND i.invoice_type IN ('PURCHASE', 'SALES')
+        """)
+        
+        self.invoices = {}
+        self._by_number = defaultdict(list)
+        self._by_amount = defaultdict(list)
+        
+        for row in cursor.fetchall():
+            invoice = {
+                'id': row[0],
+                'invoice_number': row[1],
+                'invoice_type': row[2],
+                'firma_kodu': row[3],
+                'issue_date': (row[4] or '')[:10],
+                'supplier_name': row[5],
+                'customer_name': row[6],
+                'total_amount': row[7],
+                'remaining': row[8],
+                'name_tokens': {
+                    'supplier_name': normalize_name_tokens(row[5]),
+                    'customer_name': normalize_name_tokens(row[6]),
+                },
+            }
+            self.invoices[invoice['id']] = invoice
+            
+            if invoice['invoice_number']:
+                self._by_number[invoice['invoice_number'].upper()].append(invoice)
+            
+            # Kalan ve toplam tutar aynı kovaya düşerse bir kez ekle
+            for bucket in {int(invoice['remaining']), int(invoice['total_amount'])}:
+                self._by_amount[bucket].append(invoice)
+        
+        if own_conn:
+            conn.close()
+        
+        return len(self.invoices)
+    
+    def _candidates(self, transaction: Dict) -> List[Dict]:
+        """Numara ve tutar indeksinden gelen adaylar (tekrarsız)"""
+        candidates = {}
+        
+        numbers = BankStatementReader.find_invoice_numbers(transaction.get('description'))
+        if transaction.get('invoice_number'):
+            numbers.insert(0, transaction['invoice_number'].upper())
+        for number in numbers:
+            for invoice in self._by_number.get(number, []):
+                candidates[invoice['id']] = invoice
+        
+        bucket = int(transaction['amount'])
+        for key in (bucket - 1, bucket, bucket + 1):
+            for invoice in self._by_amount.get(key, []):
+                candidates[invoice['id']] = invoice
+        
+        return list(candidates.values())
+    
+    # ========== PUANLAMA ==========
+    
+    def score(self, transaction: Dict, invoice: Dict, numbers: frozenset = None,
+              name_tokens: frozenset = None) -> Optional[Dict]:
+        """
+        Tek bir işlem - fatura çiftini puanla
+        
+        Args:
+            transaction: BankStatementReader işlemi
+            invoice: load_open_invoices() fatura kaydı
+            numbers: İşlemdeki fatura numaraları (None ise hesaplanır)
+            name_tokens: Karşı taraf kelimeleri (None ise hesaplanır)
+        
+        Returns:
+            {'invoice_id', 'invoice_number', 'score', 'reasons'} veya yön uymuyorsa None
+        """
+        expected_type, name_column = self.DIRECTIONS[transaction['direction']]
+        if invoice['invoice_type'] != expected_type:
+            return None
+        
+        if numbers is None:
+            numbers = self._transaction_numbers(transaction)
+        if name_tokens is None:
+            name_tokens = normalize_name_tokens(transaction.get('counterparty') or transaction.get('description'))
+        
+        score = 0.0
+        reasons = []
+        
+        if invoice['invoice_number'] and invoice['invoice_number'].upper() in numbers:
+            score += SCORE_INVOICE_NUMBER
+            reasons.append('invoice_number')
+        
+        amount = transaction['amount']
+        if abs(invoice['remaining'] - amount) <= self.amount_tolerance:
+            score += SCORE_AMOUNT_REMAINING
+            reasons.append('amount')
+        elif abs(invoice['total_amount'] - amount) <= self.amount_tolerance:
+            score += SCORE_AMOUNT_TOTAL
+            reasons.append('total_amount')
+        
+        invoice_tokens = invoice['name_tokens'][name_column]
+        if invoice_tokens and name_tokens:
+            overlap = len(invoice_tokens & name_tokens) / len(invoice_tokens)
+            if overlap > 0:
+                score += SCORE_COUNTERPARTY * overlap
+                reasons.append('counterparty')
+        
+        if transaction.get('payment_date') and invoice['issue_date'] > transaction['payment_date']:
+            score -= PENALTY_BEFORE_ISSUE
+            reasons.append('before_issue_date')
+        
+        return {
+            'invoice_id': invoice['id'],
+            'invoice_number': invoice['invoice_number'],
+            'firma_kodu': invoice['firma_kodu'],
+            'issue_date': invoice['issue_date'],
+            'remaining': invoice['remaining'],
+            'score': round(score, 2),
+            'reasons': reasons,
+        }
+    
+    @staticmethod
+    def _transaction_numbers(transaction: Dict) -> frozenset:
+        """İşlemdeki fatura numaraları"""
+        numbers = set(BankStatementReader.find_invoice_numbers(transaction.get('description')))
+        if transaction.get('invoice_number'):
+            numbers.add(transaction['invoice_number'].upper())
+        return frozenset(numbers)
+    
+    @staticmethod
+    def confidence(score: float) -> Optional[str]:
+        """Puan -> HIGH / MEDIUM / LOW (eşik altı None)"""
+        for level, threshold in CONFIDENCE_LEVELS:
+            if score >= threshold:
+                return level
+        return None
+    
+    def rank_candidates(self, transaction: Dict, candidates: List[Dict]) -> List[Dict]:
+        """Adayları puanla; MIN_SCORE altını ele, puan / eski fatura önce sırala"""
+        numbers = self._transaction_numbers(transaction)
+        name_tokens = normalize_name_tokens(transaction.get('counterparty') or transaction.get('description'))
+        
+        scored = []
+        for invoice in candidates:
+            result = self.score(transaction, invoice, numbers, name_tokens)
+            if result and result['score'] >= MIN_SCORE:
+                scored.append(result)
+        
+        scored.sort(key=lambda r: (-r['score'], r['issue_date'], r['invoice_id']))
+        return scored
+    
+    # ========== EŞLEŞTİRME ==========
+    
+    def match(self, transactions: List[Dict], candidate_source=None) -> List[Dict]:
+        """
+        İşlemler için eşleşme önerileri üret
+        
+        En yüksek puanlı işlemden başlanarak her faturanın kalan tutarı bir kez
+        kullanılır; aynı fatura iki ayrı tam ödemeye önerilmez.
+        
+        Args:
+            transactions: BankStatementReader işlemleri
+            candidate_source: Aday üretici (varsayılan: indeks; benchmark için değiştirilebilir)
+        
+        Returns:
+            İşlem sırasıyla öneriler:
+            {'transaction', 'invoice_id', 'invoice_number', 'score', 'confidence',
+             'reasons', 'candidates'}
+        """
+        if not self.invoices:
+            self.load_open_invoices()
+        
+        candidate_source = candidate_source or self._candidates
+        ranked = [self.rank_candidates(t, candidate_source(t)) for t in transactions]
+        
+        # Puanı yüksek olan işlem faturayı önce alır
+        order = sorted(range(len(transactions)), key=lambda i: -(ranked[i][0]['score'] if ranked[i] else 0))
+        capacity = {}
+        chosen = [None] * len(transactions)
+        
+        for index in order:
+            amount = transactions[index]['amount']
+            for candidate in ranked[index]:
+                invoice_id = candidate['invoice_id']
+                left = capacity.get(invoice_id, self.invoices[invoice_id]['remaining'])
+                if amount <= left + self.amount_tolerance:
+                    capacity[invoice_id] = left - amount
+                    chosen[index] = candidate
+                    break
+        
+        results = []
+        for transaction, candidates, best in zip(transactions, ranked, chosen):
+            results.append({
+                'transaction': transaction,
+                'invoice_id': best['invoice_id'] if best else None,
+                'invoice_number': best['invoice_number'] if best else None,
+                'score': best['score'] if best else 0,
+                'confidence': self.confidence(best['score']) if best else None,
+                'reasons': best['reasons'] if best else [],
+                'candidates': candidates[:self.max_candidates],
+            })
+        
+        return results
+    
+    def match_statement(self, path, file_format: str = None) -> List[Dict]:
+        """Ekstre dosyasını okuyup eşleştir"""
+        return self.match(BankStatementReader().read(path, file_format))
+    
+    @staticmethod
+    def accepted_levels(min_confidence: str) -> set:
+        """min_confidence ve üzerindeki güven seviyeleri"""
+        levels = [level for level, _ in CONFIDENCE_LEVELS]
+        return set(levels[:levels.index(min_confidence) + 1])
+    
+    def to_payments(self, matches: List[Dict], min_confidence: str = 'HIGH',
+                    payment_method: str = 'BANK_TRANSFER') -> List[Dict]:
+        """
+        Eşleşmeleri PaymentManager.add_payments_bulk() formatına çevir
+        
+        Args:
+            matches: match() çıktısı
+            min_confidence: Kabul edilen en düşük güven (HIGH / MEDIUM / LOW)
+            payment_method: Ödeme yöntemi
+        """
+        accepted = self.accepted_levels(min_confidence)
+        
+        payments = []
+        for match in matches:
+            if match['confidence'] not in accepted:
+                continue
+            transaction = match['transaction']
+            payments.append({
+                'invoice_id': match['invoice_id'],
+                'amount': transaction['amount'],
+                'payment_date': transaction['payment_date'],
+                'payment_method': payment_method,
+                'reference_number': transaction['reference_number'],
+                'notes': transaction['description'] or None,
+            })
+        return payments
+    
+    def print_matches(self, matches: List[Dict]):
+        """Eşleşme önerilerini console'a yazdır"""
+        print("\n" + "=" * 80)
+        print("EKSTRE EŞLEŞTİRME ÖNERİLERİ")
+        print("=" * 80)
+        
+        for match in matches:
+            transaction = match['transaction']
+            direction = '⬅️ ' if transaction['direction'] == BankStatementReader.CREDIT else '➡️ '
+            if match['invoice_id']:
+                print(f"{direction}{transaction['payment_date']} {transaction['amount']:>14,.2f} TRY → "
+                      f"{match['invoice_number']} [{match['confidence']} {match['score']:.0f}] "
+                      f"({', '.join(match['reasons'])})")
+            else:
+                print(f"{direction}{transaction['payment_date']} {transaction['amount']:>14,.2f} TRY → ❓ "
+                      f"{(transaction['description'] or '')[:40]}")
+        
+        counts = defaultdict(int)
+        for match in matches:
+            counts[match['confidence'] or 'NONE'] += 1
+        print("\n📊 " + " | ".join(f"{level}: {counts[level]}" for level in ['HIGH', 'MEDIUM', 'LOW', 'NONE']))
+        print("=" * 80)
+
+
+def main():
+    """Komut satırından ekstre eşleştirme"""
+    if len(sys.argv) < 2:
+        print("Kullanım: python3 src/financial/payment_matcher.py <ekstre.csv|ekstre.sta>")
+        return
+    
+    matcher = PaymentMatcher()
+    print(f"📂 {matcher.load_open_invoices()} açık fatura indekslendi")
+    matcher.print_matches(matcher.match_statement(sys.argv[1]))
+
+
+if __name__ == '__main__':
+    main()
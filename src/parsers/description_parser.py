@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Açıklama (Description) Metin İşleme Modülü
+==========================================
+
+Fatura description alanları için ortak metin işleme motoru.
+
+Özellikler:
+- Tüm pattern'ler modül yüklenirken bir kez derlenir
+- Banka bilgisi temizleme ve tüm irsaliye formatları TEK taramada yapılır
+- Aynı description tekrar işlenmez (LRU cache)
+- pandas Series üzerinde toplu (vektörel) kullanım
+
+Desteklenen irsaliye formatları:
+- IRS12345, İRS-12345, IRS2025000014740
+- A-18356, F-9171, F/9099, F- 9026
+- İRSALİYE NO: A-14740, IRSALIYE: 14740, IRS NO: 14740
+- Tek başına 5+ haneli numaralar (IRS eşleştirme için)
+
+Kullanım:
+    from src.parsers.description_parser import parse_description, clean_bank_info
+    
+    info = parse_description("İRSALİYE NO: F-9171 Banka Bilgileri: GARANTİBANK - TR35 ...")
+    info.cleaned   # "İRSALİYE NO: F-9171"
+    info.refs      # (IrsaliyeRef(kind='LABEL', prefix='F', number='9171'),)
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Tuple
+
+
+# ========== PATTERN PARÇALARI ==========
+
+# Herhangi bir IBAN (TR ile başlayan 26 haneli)
+_IBAN = r'TR\s*\d{2}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{2}'
+
+# Spesifik GARANTİBANK IBAN'ı
+_GARANTI_IBAN = r'GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21'
+
+# "Banka Bilgileri:" başlığı
+_BANK_HEADER = r'Banka\s+Bilgileri\s*[:\s]*'
+
+# Satır sonu (Excel _x000D_, normal newline, HTML <br>)
+_LINE_BREAK = r'(?:_x000D_|[\r\n]+|<br\s*/?>)'
+
+# Tek tarama pattern'i: önce banka blokları, sonra irsaliye formatları.
+# Alternatiflerin sırası önceliği belirler (aynı konumda ilk eşleşen kazanır).
+_SCAN_RE = re.compile(rf'''
+    (?P<bank>
+        {_BANK_HEADER}{_LINE_BREAK}\s*{_GARANTI_IBAN}\s*{_LINE_BREAK}   # Blok format (Excel/newline/HTML)
+      | {_BANK_HEADER}{_GARANTI_IBAN}                                   # Tek satır
+      | {_IBAN}                                                         # Herhangi bir IBAN
+      | {_BANK_HEADER}(?=$|{_IBAN})                                     # Yalnız kalan başlık
+      | ^{_BANK_HEADER}                                                 # Satır başındaki başlık
+    )
+  | (?:[İI]RS\s*NO|[İI]RSAL[İI]YE(?:\s*NO)?)[:\s]*
+        (?:(?P<label_prefix>[A-Z])\s*[-/]\s*)?(?P<label_no>\d+)         # İRSALİYE NO: A-14740
+  | [İI]RS[-:\s]*(?:(?P<irs_prefix>[A-Z])-)?(?P<irs_no>\d+)             # IRS14740, İRS-14740
+  | \b(?P<firm_prefix>[AF])\s*[-/]\s*(?P<firm_no>\d+)                   # A-18356, F/9099, F- 9026
+  | (?:^|(?<=\s))(?:(?P<bare_prefix>[A-Z])-)?(?P<bare_no>\d{{5,}})        # Tek başına 5+ hane
+''', re.IGNORECASE | re.MULTILINE | re.VERBOSE)
+
+_MULTI_SPACE_RE = re.compile(r' +')
+
+# normalize_irs_number pattern'leri
+_COMPANY_PREFIX_RE = re.compile(r'^[A-Z]+-')
+_IRS_PREFIX_RE = re.compile(r'^IRS\d*?0*')
+
+# Grup adı -> (ref türü, prefix grubu)
+_REF_GROUPS = (
+    ('label_no', 'LABEL', 'label_prefix'),
+    ('irs_no', 'IRS', 'irs_prefix'),
+    ('firm_no', 'FIRM', 'firm_prefix'),
+    ('bare_no', 'BARE', 'bare_prefix'),
+)
+
+
+class IrsaliyeRef(NamedTuple):
+    """Description içinde bulunan tek bir irsaliye referansı"""
+    kind: str    # LABEL, IRS, FIRM veya BARE
+    prefix: str  # Firma prefix'i (A, F, ...) yoksa ''
+    number: str  # Sadece rakamlar (baştaki sıfırlar korunur)
+
+
+class DescriptionInfo(NamedTuple):
+    """parse_description sonucu"""
+    cleaned: str                    # Banka bilgileri temizlenmiş metin
+    refs: Tuple[IrsaliyeRef, ...]   # Bulunan irsaliye referansları (metin sırasıyla)
+
+
+def _to_text(description) -> str:
+    """None / NaN / sayı değerlerini güvenli şekilde string'e çevirir"""
+    if description is None:
+        return ""
+    if isinstance(description, float) and description != description:  # NaN
+        return ""
+    return str(description)
+
+
+@lru_cache(maxsize=8192)
+def _parse(text: str) -> DescriptionInfo:
+    """Tek taramada banka bilgisi temizleme ve irsaliye çıkarma"""
+    pieces = []
+    refs = []
+    last_end = 0
+    
+    for match in _SCAN_RE.finditer(text):
+        if match.group('bank') is not None:
+            # Banka bilgisini metinden çıkar
+            pieces.append(text[last_end:match.start()])
+            last_end = match.end()
+            continue
+        
+        for number_group, kind, prefix_group in _REF_GROUPS:
+            number = match.group(number_group)
+            if number is not None:
+                prefix = match.group(prefix_group) or ''
+                refs.append(IrsaliyeRef(kind, prefix.upper(), number))
+                break
+    
+    if last_end:
+        pieces.append(text[last_end:])
+        cleaned = ''.join(pieces)
+    else:
+        cleaned = text
+    
+    # Sadece fazla boşlukları temizle - satır sonlarını KORUR
+    cleaned = _MULTI_SPACE_RE.sub(' ', cleaned).strip()
+    
+    return DescriptionInfo(cleaned, tuple(refs))
+
+
+def parse_description(description) -> DescriptionInfo:
+    """
+    Description alanını tek taramada işler
+    
+    Args:
+        description: Açıklama metni (None/NaN kabul edilir)
+    
+    Returns:
+        DescriptionInfo: (temizlenmiş metin, irsaliye referansları)
+    """
+    text = _to_text(description)
+    if not text:
+        return DescriptionInfo("", ())
+    return _parse(text)
+
+
+def clean_bank_info(description) -> str:
+    """
+    Description alanından SADECE banka bilgilerini temizler
+    İrsaliye numaraları ve diğer bilgileri KORUR
+    
+    Args:
+        description: Temizlenecek açıklama metni
+    
+    Returns:
+        Temizlenmiş açıklama metni (irsaliye bilgileri korunur)
+    """
+    return parse_description(description).cleaned
+
+
+def find_irsaliye_refs(description) -> List[IrsaliyeRef]:
+    """Description içindeki tüm irsaliye referanslarını döndürür"""
+    return list(parse_description(description).refs)
+
+
+def normalize_irs_number(irs_full: str) -> str:
+    """
+    İrsaliye numarasını normalize et (firma prefix'siz, sadece rakamlar)
+    
+    Örnekler:
+    - "A-14740" -> "14740"
+    - "F-07904" -> "7904"
+    - "IRS14740" -> "14740"
+    - "14740" -> "14740"
+    
+    Args:
+        irs_full: Tam irsaliye numarası
+    
+    Returns:
+        Normalize edilmiş numara (sadece rakamlar, baştaki sıfırlar yok)
+    """
+    if not irs_full:
+        return ""
+    
+    irs = str(irs_full).strip().upper()
+    
+    # Firma prefix'ini kaldır (A-, F-, API-, vb.)
+    irs = _COMPANY_PREFIX_RE.sub('', irs)
+    
+    # IRS önekini kaldır
+    irs = _IRS_PREFIX_RE.sub('IRS', irs)
+    irs = irs.replace('IRS', '')
+    
+    # Baştaki sıfırları kaldır
+    return irs.lstrip('0') or '0'
+
+
+# ========== FORMAT GÖRÜNÜMLERİ ==========
+# Her tüketici aynı tarama sonucunu kendi formatına çevirir.
+
+def _unique(items) -> list:
+    """Sırayı koruyarak tekrarları temizler"""
+    return list(dict.fromkeys(items))
+
+
+def extract_irsaliye_numbers(description) -> List[str]:
+    """
+    API veritabanı formatı: IRS12345, A-12345, F-12345 (5+ hane)
+    
+    Args:
+        description: Açıklama metni
+    
+    Returns:
+        List[str]: Bulunan irsaliye numaraları listesi
+    """
+    numbers = []
+    for ref in parse_description(description).refs:
+        if len(ref.number) < 5:
+            continue
+        if ref.prefix in ('A', 'F'):
+            numbers.append(f"{ref.prefix}-{ref.number}")
+        elif ref.kind == 'IRS' and not ref.prefix:
+            numbers.append(f"IRS{ref.number}")
+    return _unique(numbers)
+
+
+def extract_firm_codes(description) -> List[Tuple[str, str]]:
+    """
+    Firma prefix'li irsaliye kodları: [('A', '18356'), ('F', '9197')]
+    
+    Prefix olmayan kodlar atlanır (örn: İRSALİYE NO: 18277)
+    
+    Args:
+        description: Açıklama metni
+    
+    Returns:
+        List[tuple]: [(prefix, number), ...]
+    """
+    return _unique(
+        (ref.prefix, ref.number)
+        for ref in parse_description(description).refs
+        if ref.prefix in ('A', 'F') and 4 <= len(ref.number) <= 5
+    )
+
+
+def extract_irsaliye_label(description) -> str:
+    """
+    Excel gösterimi: virgülle ayrılmış irsaliye numaraları ("A-18356, IRS12345")
+    
+    Args:
+        description: Açıklama metni
+    
+    Returns:
+        str: Virgülle ayrılmış irsaliye numaraları
+    """
+    labels = []
+    for ref in parse_description(description).refs:
+        if ref.prefix in ('A', 'F') and 4 <= len(ref.number) <= 5:
+            labels.append(f"{ref.prefix}-{ref.number}")
+        elif ref.kind == 'IRS' and not ref.prefix and len(ref.number) >= 5:
+            labels.append(f"IRS{ref.number}")
+    return ", ".join(_unique(labels))
+
+
+def extract_normalized_irs(description) -> List[str]:
+    """
+    IRS eşleştirme formatı: normalize edilmiş numaralar (5+ hane)
+    
+    Args:
+        description: Açıklama metni
+    
+    Returns:
+        Bulunan irsaliye numaraları listesi (normalize edilmiş)
+    """
+    return _unique(
+        normalize_irs_number(ref.number)
+        for ref in parse_description(description).refs
+        if len(ref.number) >= 5
+    )
+
+
+# ========== PANDAS SERIES DESTEĞİ ==========
+
+def map_descriptions(series, func: Callable):
+    """
+    Bir description Series'ine fonksiyonu uygular
+    
+    Her farklı değer yalnızca bir kez işlenir, sonuç tüm satırlara
+    dağıtılır (faturalarda aynı açıklama çok sık tekrar eder).
+    
+    Args:
+        series: pandas Series (description değerleri)
+        func: Uygulanacak fonksiyon (örn: clean_bank_info)
+    
+    Returns:
+        pandas Series: Sonuçlar (aynı index ile)
+    """
+    uniques = series.dropna().unique()
+    mapping = {value: func(value) for value in uniques}
+    empty = func(None)
+    return series.map(lambda value: mapping.get(value, empty))
+
+
+def clean_bank_info_series(series):
+    """Series üzerinde banka bilgisi temizleme"""
+    return map_descriptions(series, clean_bank_info)
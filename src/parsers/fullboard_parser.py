@@ -6,10 +6,16 @@ XML E-Fatura Dosyalarını Parse Edip Veritabanına Aktaran Script
 
 import xml.etree.ElementTree as ET
 import base64
-import sqlite3
 import os
 from datetime import datetime
 import glob
+import re
+import sys
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.database.connection import get_connection
 
 # XML namespace'leri
 NAMESPACES = {
@@ -19,6 +25,9 @@ NAMESPACES = {
     'inv': 'urn:oasis:names:specification:ubl:schema:xsd:Invoice-2'
 }
 
+# Satır notundaki irsaliye numarası (örn: "İrsaliye : IRS2025000009092   Tarih : 16/11/2025")
+LINE_NOTE_IRS_PATTERN = re.compile(r'IRS\d+')
+
 def parse_xml_invoice(xml_file):
     """XML fatura dosyasını parse eder ve önemli bilgileri çıkarır"""
     try:
@@ -148,6 +157,17 @@ def parse_xml_invoice(xml_file):
             if line_total is not None:
                 line_data['line_total'] = float(line_total.text)
             
+            # Satırın ait olduğu irsaliye (DespatchLineReference veya satır notu)
+            line_despatch = line.find('.//cac:DespatchLineReference/cac:DocumentReference/cbc:ID', NAMESPACES)
+            if line_despatch is not None and line_despatch.text:
+                line_data['despatch_id_full'] = line_despatch.text.strip()
+            else:
+                for note in line.findall('./cbc:Note', NAMESPACES):
+                    match = LINE_NOTE_IRS_PATTERN.search(note.text or '')
+                    if match:
+                        line_data['despatch_id_full'] = match.group(0)
+                        break
+            
             invoice_lines.append(line_data)
         
         invoice_data['invoice_lines'] = invoice_lines
@@ -197,7 +217,7 @@ def parse_xml_invoice(xml_file):
 
 def create_database(db_path='efatura_fullboard.db'):
     """Veritabanı şemasını oluşturur"""
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     # Ana fatura tablosu
@@ -257,10 +277,16 @@ def create_database(db_path='efatura_fullboard.db'):
             unit_price REAL,
             line_total REAL,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            despatch_id_full TEXT,
             FOREIGN KEY (invoice_id) REFERENCES invoices (id)
         )
     ''')
     
+    # Eski veritabanlarında satır -> irsaliye sütunu yoksa ekle
+    cursor.execute("PRAGMA table_info(invoice_lines)")
+    if 'despatch_id_full' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE invoice_lines ADD COLUMN despatch_id_full TEXT")
+    
     # İrsaliye tablosu
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS despatch_documents (
@@ -275,6 +301,16 @@ def create_database(db_path='efatura_fullboard.db'):
         )
     ''')
     
+    # İrsaliye aramaları için index'ler (tools/invoice_matcher.py despatch_id_short ile arar)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_despatch_short
+        ON despatch_documents(despatch_id_short)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_despatch_invoice
+        ON despatch_documents(invoice_id)
+    ''')
+    
     conn.commit()
     return conn
 
@@ -339,8 +375,8 @@ def insert_invoice_data(conn, invoice_data):
         cursor.execute('''
             INSERT INTO invoice_lines (
                 invoice_id, line_id, item_name, quantity, unit,
-                unit_price, line_total
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                unit_price, line_total, despatch_id_full
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             invoice_db_id,
             line.get('line_id'),
@@ -348,7 +384,8 @@ def insert_invoice_data(conn, invoice_data):
             line.get('quantity'),
             line.get('unit'),
             line.get('unit_price'),
-            line.get('line_total')
+            line.get('line_total'),
+            line.get('despatch_id_full')
         ))
     
     # İrsaliye kayıtları
@@ -439,7 +476,7 @@ def main():
     print()
     
     # Veritabanı özeti
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("SELECT COUNT(*) FROM invoices")
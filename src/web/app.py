@@ -3,15 +3,48 @@
 """
 Basit E-Fatura Web Dashboard
 Hiçbir dış modüle bağımlı değil
+
+Geliştirme: python3 src/web/app.py
+Çok kullanıcılı: python3 src/web/wsgi.py (gunicorn / waitress)
 """
 
-from flask import Flask, render_template_string
-import sqlite3
+from flask import Flask, jsonify, render_template_string, request
+import gzip
+import hashlib
 import os
+import sys
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.web.cache import DataVersionCache, thread_connection
+from src.web.queries import (
+    PAGE_SIZE, list_despatch, list_invoices, load_kpis, load_schema, parse_limit
+)
 
 app = Flask(__name__)
 
-# HTML Template (tek dosyada)
+# Statik dosyalar (CSS/JS) URL'deki sürümle (?v=...) değişir; tarayıcı 1 yıl önbellekler
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 3600
+
+# Dashboard verileri veritabanı değişene kadar bellekte tutulur
+cache = DataVersionCache()
+
+# Sıkıştırılacak yanıtlar (bayt alt sınırı ve içerik tipleri)
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = {'text/html', 'text/css', 'application/javascript', 'text/javascript', 'application/json'}
+
+def static_version():
+    """Statik dosyaların içerik özeti (dosya değişince URL de değişir)"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(app.static_folder)):
+        with open(os.path.join(app.static_folder, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+ASSET_VERSION = static_version()
+
+# HTML Template (CSS/JS: static/)
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="tr">
@@ -19,144 +52,7 @@ HTML_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>E-Fatura Dashboard</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        
-        h1 {
-            color: white;
-            text-align: center;
-            font-size: 3em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        
-        .subtitle {
-            color: rgba(255,255,255,0.9);
-            text-align: center;
-            font-size: 1.3em;
-            margin-bottom: 40px;
-        }
-        
-        .kpi-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .kpi-card {
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            text-align: center;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            transition: transform 0.3s;
-        }
-        
-        .kpi-card:hover {
-            transform: translateY(-10px);
-        }
-        
-        .kpi-label {
-            color: #666;
-            font-size: 0.9em;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            margin-bottom: 10px;
-        }
-        
-        .kpi-value {
-            color: #667eea;
-            font-size: 2.8em;
-            font-weight: bold;
-        }
-        
-        .section {
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        
-        .section h2 {
-            color: #667eea;
-            margin-bottom: 20px;
-            font-size: 1.8em;
-            border-bottom: 3px solid #667eea;
-            padding-bottom: 10px;
-        }
-        
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        
-        th {
-            background: #667eea;
-            color: white;
-            padding: 15px;
-            text-align: left;
-            font-weight: 600;
-        }
-        
-        td {
-            padding: 15px;
-            border-bottom: 1px solid #eee;
-        }
-        
-        tr:hover {
-            background: #f8f9fa;
-        }
-        
-        .badge {
-            display: inline-block;
-            padding: 5px 12px;
-            border-radius: 20px;
-            font-size: 0.85em;
-            font-weight: bold;
-        }
-        
-        .badge-A {
-            background: #ffe0b2;
-            color: #e65100;
-        }
-        
-        .badge-F {
-            background: #e1bee7;
-            color: #6a1b9a;
-        }
-        
-        .badge-API {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        
-        .amount {
-            font-weight: 600;
-            color: #06d6a0;
-        }
-        
-        .footer {
-            text-align: center;
-            color: white;
-            margin-top: 40px;
-            padding: 20px;
-            opacity: 0.9;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ url_for('static', filename='dashboard.css', v=asset_version) }}">
 </head>
 <body>
     <div class="container">
@@ -216,7 +112,7 @@ HTML_TEMPLATE = """
                         <th>Tutar</th>
                     </tr>
                 </thead>
-                <tbody>
+                <tbody id="invoice-rows">
                     {% for inv in invoices %}
                     <tr>
                         <td><span class="badge badge-{{ inv.firma }}">{{ inv.firma }}</span></td>
@@ -228,6 +124,9 @@ HTML_TEMPLATE = """
                     {% endfor %}
                 </tbody>
             </table>
+            {% if next_cursor %}
+            <button id="load-more" class="load-more" data-cursor="{{ next_cursor }}">⬇️ Daha Fazla Yükle</button>
+            {% endif %}
         </div>
         
         <div class="footer">
@@ -237,6 +136,7 @@ HTML_TEMPLATE = """
             </p>
         </div>
     </div>
+    <script src="{{ url_for('static', filename='dashboard.js', v=asset_version) }}"></script>
 </body>
 </html>
 """
@@ -257,8 +157,8 @@ def format_date(date_str):
     except:
         return date_str
 
-def get_data():
-    """Birleşik veritabanından verileri al (XML + API)"""
+def get_db_path():
+    """Birleşik veritabanı yolu (yoksa tekil, o da yoksa None)"""
     
     # Proje kök dizini - chdir kullanma!
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -269,12 +169,58 @@ def get_data():
         db_path = os.path.join(project_root, 'data/db/akgips.db')
     
     if not os.path.exists(db_path):
+        return None
+    return db_path
+
+def load_dashboard(conn):
+    """Dashboard sorguları (sonuç önbelleğe alınır, veri değişince yeniden çalışır)"""
+    kpis = load_kpis(conn)
+    firma = kpis['firma']
+    ak_count = firma.get('A', {}).get('count', 0)
+    fb_count = firma.get('F', {}).get('count', 0)
+    api_count = firma.get('API', {}).get('count', 0)
+    
+    # Fatura listesinin ilk sayfası (devamı /api/invoices ile yüklenir)
+    page = list_invoices(conn, limit=PAGE_SIZE)
+    
+    # Fatura listesini formatla
+    invoices = [format_invoice(inv) for inv in page['items']]
+    
+    return {
+        'invoice_count': kpis['invoice_count'],
+        'total_amount': format_currency(kpis['total_amount']),
+        'total_tax': format_currency(kpis['total_tax']),
+        'despatch_count': kpis['despatch_count'],
+        'invoices': invoices,
+        'next_cursor': page['next_cursor'],
+        'ak_count': ak_count,
+        'fb_count': fb_count,
+        'api_count': api_count,
+        'has_api_data': api_count > 0,
+    }
+
+def format_invoice(inv):
+    """Liste satırını tablo için formatla"""
+    return {
+        'firma': inv.get('firma_kodu') or '-',
+        'invoice_number': inv.get('invoice_number') or '',
+        'date': format_date(inv.get('issue_date') or ''),
+        'supplier': (inv.get('firm_name') or '')[:40],
+        'amount': format_currency(inv.get('total_amount') or 0)
+    }
+
+def get_data():
+    """Birleşik veritabanından verileri al (XML + API)"""
+    db_path = get_db_path()
+    
+    if db_path is None:
         return {
             'invoice_count': 0,
             'total_amount': '0,00 TRY',
             'total_tax': '0,00 TRY',
             'despatch_count': 0,
             'invoices': [],
+            'next_cursor': None,
             'ak_count': 0,
             'fb_count': 0,
             'api_count': 0,
@@ -282,101 +228,103 @@ def get_data():
             'db_info': 'Veritabanı bulunamadı'
         }
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # KPI verileri
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as invoice_count,
-            COALESCE(SUM(total_amount), 0) as total_amount,
-            COALESCE(SUM(tax_amount), 0) as total_tax
-        FROM invoices
-    """)
-    kpi = cursor.fetchone()
+    data = cache.get(db_path, 'dashboard', load_dashboard)
+    return dict(data, db_info=f'Birleşik DB: {os.path.basename(db_path)}')
+
+@app.route('/')
+def index():
+    """Ana sayfa"""
+    data = get_data()
+    return render_template_string(HTML_TEMPLATE, asset_version=ASSET_VERSION, **data)
+
+@app.after_request
+def compress_response(response):
+    """
+    HTML/JSON yanıtlarına ETag (değişmediyse 304), metin yanıtlarına gzip
     
-    # İrsaliye sayısı
-    cursor.execute("SELECT COUNT(*) as count FROM despatch_documents")
-    desp = cursor.fetchone()
+    Sıkıştırma sadece istemci gzip kabul ediyorsa ve yanıt COMPRESS_MIN_SIZE
+    bayttan büyükse yapılır.
+    """
+    if request.method != 'GET' or response.status_code != 200 or response.mimetype not in COMPRESS_MIMETYPES:
+        return response
     
-    # Firma bazlı sayılar
-    # Önce firma_kodu sütununun varlığını kontrol et
-    cursor.execute("PRAGMA table_info(invoices)")
-    columns = [desc[1] for desc in cursor.fetchall()]
-    has_firma_kodu = 'firma_kodu' in columns
+    if response.mimetype in ('text/html', 'application/json'):
+        response.add_etag()
+        response.make_conditional(request)
+        if response.status_code != 200:
+            return response
     
-    if has_firma_kodu:
-        cursor.execute("SELECT COUNT(*) FROM invoices WHERE firma_kodu = 'A'")
-        ak_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM invoices WHERE firma_kodu = 'F'")
-        fb_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM invoices WHERE firma_kodu = 'API'")
-        api_count = cursor.fetchone()[0]
-    else:
-        ak_count = 0
-        fb_count = 0
-        api_count = 0
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.headers.get('Accept-Encoding', '') or 'Content-Encoding' in response.headers:
+        return response
     
-    # Fatura listesi
-    if has_firma_kodu:
-        # Birleşik DB - firma_kodu ile
-        cursor.execute("""
-            SELECT 
-                firma_kodu, invoice_number, issue_date, 
-                COALESCE(supplier_name, customer_name) as firm_name, 
-                total_amount
-            FROM invoices
-            ORDER BY issue_date DESC
-            LIMIT 50
-        """)
-    else:
-        # Tekil DB
-        cursor.execute("""
-            SELECT 
-                invoice_number, issue_date, 
-                supplier_name, total_amount
-            FROM invoices
-            ORDER BY issue_date DESC
-            LIMIT 50
-        """)
+    # Statik dosyalar dosya nesnesi olarak gelir; küçük oldukları için belleğe alınır
+    response.direct_passthrough = False
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
     
-    invoices_raw = cursor.fetchall()
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        # Sıkıştırılmış gösterim farklı bir ETag taşımalı
+        response.set_etag(etag, weak=True)
+    return response
+
+# ========== JSON API ==========
+
+def api_error(message, status=400):
+    return jsonify({'error': message}), status
+
+def run_list(query, **filters):
+    """Liste sorgusunu thread'in salt okunur bağlantısıyla çalıştır"""
+    db_path = get_db_path()
+    if db_path is None:
+        return api_error('Veritabanı bulunamadı', 404)
     
-    # Fatura listesini formatla
-    invoices = []
-    for inv in invoices_raw:
-        inv_dict = dict(inv)
-        invoices.append({
-            'firma': inv_dict.get('firma_kodu', '-'),
-            'invoice_number': inv_dict.get('invoice_number', ''),
-            'date': format_date(inv_dict.get('issue_date', '')),
-            'supplier': inv_dict.get('firm_name', inv_dict.get('supplier_name', ''))[:40],
-            'amount': format_currency(inv_dict.get('total_amount', 0))
-        })
+    try:
+        filters['limit'] = parse_limit(request.args.get('limit'))
+        schema = cache.get(db_path, 'schema', load_schema)
+        conn = thread_connection(db_path)
+        page = query(conn, schema, cursor=request.args.get('cursor'), **filters)
+    except ValueError as e:
+        return api_error(str(e))
     
-    conn.close()
+    return jsonify({'items': page['items'], 'count': len(page['items']), 'next_cursor': page['next_cursor']})
+
+@app.route('/api/kpis')
+def api_kpis():
+    """Toplamlar ve firma / ödeme durumu kırılımları (önbellekten)"""
+    db_path = get_db_path()
+    if db_path is None:
+        return api_error('Veritabanı bulunamadı', 404)
+    return jsonify(dict(cache.get(db_path, 'kpis', load_kpis), db=os.path.basename(db_path)))
+
+@app.route('/api/invoices')
+def api_invoices():
+    """
+    Fatura listesi (en yeni önce, keyset sayfalama)
     
-    return {
-        'invoice_count': kpi['invoice_count'],
-        'total_amount': format_currency(kpi['total_amount']),
-        'total_tax': format_currency(kpi['total_tax']),
-        'despatch_count': desp['count'],
-        'invoices': invoices,
-        'ak_count': ak_count,
-        'fb_count': fb_count,
-        'api_count': api_count,
-        'has_api_data': api_count > 0,
-        'db_info': f'Birleşik DB: {os.path.basename(db_path)}'
-    }
+    Parametreler: firma, start, end (YYYY-MM-DD), status, type, limit, cursor
+    """
+    args = request.args
+    return run_list(list_invoices, firma=args.get('firma'), start=args.get('start'), end=args.get('end'),
+                    status=args.get('status'), invoice_type=args.get('type'))
 
-@app.route('/')
-def index():
-    """Ana sayfa"""
-    data = get_data()
-    return render_template_string(HTML_TEMPLATE, **data)
+@app.route('/api/despatch')
+def api_despatch():
+    """
+    İrsaliye listesi (en yeni önce, keyset sayfalama)
+    
+    Parametreler: firma, start, end (YYYY-MM-DD), invoice_id, irs, limit, cursor
+    """
+    args = request.args
+    invoice_id = args.get('invoice_id')
+    if invoice_id is not None and not invoice_id.isdigit():
+        return api_error(f'invoice_id sayı olmalı: {invoice_id}')
+    return run_list(list_despatch, firma=args.get('firma'), start=args.get('start'), end=args.get('end'),
+                    invoice_id=int(invoice_id) if invoice_id is not None else None, irs=args.get('irs'))
 
 if __name__ == '__main__':
     print("\n" + "="*70)
@@ -384,6 +332,7 @@ if __name__ == '__main__':
     print("="*70)
     print("\n📊 Dashboard açılıyor: http://localhost:8080")
     print("\n💡 Tarayıcınızda yukarıdaki adresi açın")
+    print("💡 Birden fazla kullanıcı için: python3 src/web/wsgi.py")
     print("\n⏹️  Durdurmak için: Ctrl+C")
     print("="*70 + "\n")
     
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard Önbelleği (PRAGMA data_version)
+=========================================
+
+Dashboard her istekte aynı sayım/toplam sorgularını çalıştırmasın diye
+hesaplanan değerler bellekte tutulur ve sadece veritabanı gerçekten
+değiştiğinde yeniden hesaplanır.
+
+Geçersizleme:
+- Önbellek kendi salt okunur bağlantısını açık tutar; bu bağlantıdaki
+  PRAGMA data_version, başka bir bağlantı (başka süreçteki import/API
+  senkronizasyonu dahil) commit ettiğinde değişir
+- Veritabanı dosyası silinip yeniden oluşturulduysa (yeniden_olustur.sh)
+  dosya kimliği (st_dev, st_ino) değişir; bağlantı yeniden açılır
+
+Hesaplama kilit altında yapılır: veri değiştikten sonra aynı anda gelen
+istekler sorguları tekrar tekrar çalıştırmaz, ilk hesaplamayı bekler.
+
+Önbelleğe alınmayan sorgular (sayfalı listeler) thread_connection() ile
+thread başına açık tutulan salt okunur bağlantıyı kullanır; web süreci
+veritabanına hiç yazmaz, yazma kilidi almaz. Bağlantılar ilk istekte
+açılır, bu yüzden gunicorn her worker'da kendi bağlantılarını oluşturur.
+
+Kullanım:
+    from src.web.cache import DataVersionCache, thread_connection
+    
+    cache = DataVersionCache()
+    data = cache.get(db_path, 'dashboard', lambda conn: load_dashboard(conn))
+    
+    conn = thread_connection(db_path)   # kapatılmaz, thread'de yeniden kullanılır
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.database.connection import PRAGMAS
+
+# Salt okunur bağlantılara da uygulanan okuma ayarları (connection.PRAGMAS'tan)
+READ_PRAGMAS = ('mmap_size', 'cache_size', 'temp_store')
+
+_local = threading.local()
+
+
+def file_identity(db_path) -> Tuple[int, int]:
+    """Dosya kimliği (aynı yolda yeni dosya oluşturulursa değişir)"""
+    stat = os.stat(db_path)
+    return stat.st_dev, stat.st_ino
+
+
+def open_readonly(db_path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Salt okunur, autocommit bağlantı (satırlar sqlite3.Row)"""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=5.0, isolation_level=None,
+                           check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    for name in READ_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {PRAGMAS[name]}")
+    return conn
+
+
+def thread_connection(db_path) -> sqlite3.Connection:
+    """
+    Bu thread'in salt okunur bağlantısı (yoksa açılır)
+    
+    Veritabanı dosyası yeniden oluşturulduysa (dosya kimliği değiştiyse)
+    eski bağlantı kapatılıp yenisi açılır.
+    """
+    db_path = os.path.abspath(str(db_path))
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    identity = file_identity(db_path)
+    entry = connections.get(db_path)
+    if entry is not None and entry[0] == identity:
+        return entry[1]
+    
+    if entry is not None:
+        entry[1].close()
+    conn = open_readonly(db_path)
+    connections[db_path] = (identity, conn)
+    return conn
+
+
+class DataVersionCache:
+    """Veritabanı değişene kadar hesaplanan değerleri saklayan önbellek"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._db_path = None
+        self._identity = None
+        self._version = None
+        self._values: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._version = None
+        self._values.clear()
+    
+    def _refresh(self, db_path: str):
+        """Bağlantıyı hazırla; veritabanı değiştiyse saklanan değerleri at"""
+        identity = file_identity(db_path)
+        if self._conn is None or db_path != self._db_path or identity != self._identity:
+            self._close()
+            self._conn = open_readonly(db_path, check_same_thread=False)
+            self._db_path = db_path
+            self._identity = identity
+        
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._values.clear()
+            self._version = version
+    
+    def get(self, db_path, key: str, compute: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Saklanan değeri döndür, yoksa compute(conn) ile hesapla
+        
+        Args:
+            db_path: Veritabanı dosyası
+            key: Değerin adı (örn. 'dashboard', 'kpis')
+            compute: Önbelleğin bağlantısını alıp değeri hesaplayan fonksiyon;
+                     sorgular tek bir okuma transaction'ında çalışır
+        
+        Returns:
+            Hesaplanan (veya saklanan) değer; çağıran değiştirmemeli
+        """
+        db_path = os.path.abspath(str(db_path))
+        with self._lock:
+            try:
+                self._refresh(db_path)
+            except sqlite3.Error:
+                # Bağlantı bozulduysa bir kez yeniden aç
+                self._close()
+                self._refresh(db_path)
+            
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            
+            self.misses += 1
+            self._conn.execute("BEGIN")
+            try:
+                value = compute(self._conn)
+            finally:
+                self._conn.execute("ROLLBACK")
+            self._values[key] = value
+            return value
+    
+    def clear(self):
+        """Saklanan değerleri at ve bağlantıyı kapat"""
+        with self._lock:
+            self._close()
+    
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'keys': len(self._values)}
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard / JSON API Sorguları
+==============================
+
+Web uygulamasının KPI ve liste sorguları. Listeler OFFSET yerine
+(issue_date, id) üzerinden keyset sayfalama kullanır: sonraki sayfa son
+satırın (tarih, id) değerinden sonra başlar, derinlikten bağımsız olarak
+index'te doğrudan ilgili noktaya gidilir.
+
+Sıralama en yeni önce: ORDER BY issue_date DESC, id DESC. Tarihsiz
+satırlar en sonda gelir (tarih filtresi verilmişse hiç gelmez).
+
+İlgili index'ler (schema_migration.create_indexes):
+- invoices(issue_date)                 → filtresiz liste
+- invoices(firma_kodu, issue_date)     → firma filtresi
+- invoices(payment_status, issue_date) → durum filtresi
+- despatch_documents(issue_date)       → irsaliye listesi
+
+Kullanım:
+    from src.web.queries import list_invoices
+    
+    page = list_invoices(conn, firma='A', start='2025-11-01', limit=100)
+    page = list_invoices(conn, firma='A', start='2025-11-01', cursor=page['next_cursor'])
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+# Sayfa boyutu (varsayılan / en fazla)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Listede döndürülen fatura sütunları (veritabanında olanlar seçilir)
+INVOICE_COLUMNS = (
+    'id', 'firma_kodu', 'invoice_number', 'issue_date', 'supplier_name', 'customer_name',
+    'total_amount', 'tax_amount', 'currency', 'invoice_type', 'payment_status',
+    'paid_amount', 'remaining_amount',
+)
+
+DESPATCH_COLUMNS = (
+    'id', 'despatch_id_full', 'despatch_id_short', 'issue_date', 'description',
+    'irs_normalized', 'invoice_id',
+)
+
+
+def table_columns(conn, table: str) -> Set[str]:
+    """Tablonun sütun adları (tablo yoksa boş)"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def load_schema(conn) -> Dict[str, Set[str]]:
+    """Liste sorgularının ihtiyaç duyduğu tabloların sütunları"""
+    return {table: table_columns(conn, table) for table in ('invoices', 'despatch_documents')}
+
+
+# ========== PARAMETRELER ==========
+
+def encode_cursor(issue_date: Optional[str], row_id: int) -> str:
+    """Son satırın (tarih, id) değeri → URL'de taşınabilir imleç"""
+    payload = json.dumps([issue_date, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]):
+    """İmleç → (tarih, id); geçersizse ValueError"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        issue_date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError(f"Geçersiz imleç: {cursor}") from None
+    if not isinstance(row_id, int) or not (issue_date is None or isinstance(issue_date, str)):
+        raise ValueError(f"Geçersiz imleç: {cursor}")
+    return issue_date, row_id
+
+
+def parse_date(value: Optional[str], name: str) -> Optional[str]:
+    """'YYYY-MM-DD' doğrula (boşsa None)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"{name} tarihi YYYY-MM-DD olmalı: {value}") from None
+
+
+def parse_limit(value) -> int:
+    """Sayfa boyutu (1..MAX_PAGE_SIZE)"""
+    if value in (None, ''):
+        return PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"limit sayı olmalı: {value}") from None
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+# ========== KEYSET SAYFALAMA ==========
+
+def keyset_page(conn, select_sql: str, where: List[str], params: List, date_column: str,
+                id_column: str, cursor=None, limit: int = PAGE_SIZE, include_null: bool = True) -> Dict:
+    """
+    (tarih DESC, id DESC) sıralı bir sayfa
+    
+    Önce tarihli satırlar row value karşılaştırmasıyla ((tarih, id) < imleç)
+    okunur; sayfa dolmadıysa ve include_null ise tarihsiz satırlarla devam
+    edilir. Her iki sorgu da index aralık taramasıdır.
+    
+    Args:
+        select_sql: "SELECT ... FROM ..." (WHERE / ORDER BY olmadan)
+        where, params: Filtre koşulları ve parametreleri
+        date_column, id_column: Sıralama sütunları (örn. 'i.issue_date', 'i.id')
+        cursor: decode_cursor() sonucu veya None (ilk sayfa)
+        limit: Sayfa boyutu
+        include_null: Tarihsiz satırlar da listelensin mi
+    
+    Returns:
+        {'rows': [...], 'next_cursor': str veya None}
+    """
+    order = f" ORDER BY {date_column} DESC, {id_column} DESC LIMIT ?"
+    rows = []
+    
+    if cursor is None or cursor[0] is not None:
+        conditions = list(where)
+        extra = []
+        if cursor is None:
+            conditions.append(f"{date_column} IS NOT NULL")
+        else:
+            conditions.append(f"({date_column}, {id_column}) < (?, ?)")
+            extra = list(cursor)
+        rows = conn.execute(
+            f"{select_sql} WHERE {' AND '.join(conditions)}{order}",
+            params + extra + [limit + 1],
+        ).fetchall()
+    
+    if include_null and len(rows) <= limit:
+        conditions = list(where) + [f"{date_column} IS NULL"]
+        extra = []
+        if cursor is not None and cursor[0] is None:
+            conditions.append(f"{id_column} < ?")
+            extra = [cursor[1]]
+        rows += conn.execute(
+            f"{select_sql} WHERE {' AND '.join(conditions)}{order}",
+            params + extra + [limit + 1 - len(rows)],
+        ).fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['issue_date'], last['id'])
+    return {'rows': rows, 'next_cursor': next_cursor}
+
+
+# ========== SORGULAR ==========
+
+def load_kpis(conn) -> Dict:
+    """Toplamlar, firma ve ödeme durumu kırılımları (ham sayılar)"""
+    columns = table_columns(conn, 'invoices')
+    kpi = conn.execute("""
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(total_amount), 0),
+            COALESCE(SUM(tax_amount), 0)
+        FROM invoices
+    """).fetchone()
+    
+    result = {
+        'invoice_count': kpi[0],
+        'total_amount': kpi[1],
+        'total_tax': kpi[2],
+        'despatch_count': conn.execute("SELECT COUNT(*) FROM despatch_documents").fetchone()[0],
+        'firma': {},
+        'payment_status': {},
+    }
+    
+    if 'firma_kodu' in columns:
+        for firma, count, total in conn.execute("""
+            SELECT firma_kodu, COUNT(*), COALESCE(SUM(total_amount), 0)
+            FROM invoices
+            GROUP BY firma_kodu
+        """):
+            result['firma'][firma] = {'count': count, 'total_amount': total}
+    
+    if 'payment_status' in columns:
+        for status, count in conn.execute(
+            "SELECT payment_status, COUNT(*) FROM invoices GROUP BY payment_status"
+        ):
+            result['payment_status'][status] = count
+    
+    return result
+
+
+def _require(columns: Set[str], column: str, param: str):
+    if column not in columns:
+        raise ValueError(f"'{param}' filtresi bu veritabanında kullanılamaz ({column} sütunu yok)")
+
+
+def list_invoices(conn, schema: Optional[Dict[str, Set[str]]] = None, firma: Optional[str] = None,
+                  start: Optional[str] = None, end: Optional[str] = None,
+                  status: Optional[str] = None, invoice_type: Optional[str] = None,
+                  cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict:
+    """
+    Fatura listesi sayfası
+    
+    Args:
+        conn: sqlite3.Row döndüren bağlantı
+        schema: load_schema() sonucu (verilmezse sorgulanır)
+        firma: firma_kodu ('A', 'F', 'API')
+        start, end: issue_date aralığı, YYYY-MM-DD (ikisi de dahil)
+        status: payment_status ('PAID', 'UNPAID', ...)
+        invoice_type: 'PURCHASE' / 'SALES'
+        cursor: Önceki sayfanın next_cursor değeri
+        limit: Sayfa boyutu (en fazla MAX_PAGE_SIZE)
+    
+    Returns:
+        {'items': [dict], 'next_cursor': str veya None}
+    
+    Raises:
+        ValueError: Geçersiz parametre
+    """
+    columns = (schema or load_schema(conn))['invoices']
+    position = decode_cursor(cursor)
+    start, end = parse_date(start, 'start'), parse_date(end, 'end')
+    
+    where, params = [], []
+    if firma:
+        _require(columns, 'firma_kodu', 'firma')
+        where.append("firma_kodu = ?")
+        params.append(firma.upper())
+    if status:
+        _require(columns, 'payment_status', 'status')
+        where.append("payment_status = ?")
+        params.append(status.upper())
+    if invoice_type:
+        _require(columns, 'invoice_type', 'type')
+        where.append("invoice_type = ?")
+        params.append(invoice_type.upper())
+    if start:
+        where.append("issue_date >= ?")
+        params.append(start)
+    if end:
+        where.append("issue_date < date(?, '+1 day')")
+        params.append(end)
+    
+    selected = [column for column in INVOICE_COLUMNS if column in columns]
+    page = keyset_page(
+        conn, f"SELECT {', '.join(selected)} FROM invoices", where, params,
+        'issue_date', 'id', position, min(limit, MAX_PAGE_SIZE),
+        include_null=not (start or end),
+    )
+    
+    items = []
+    for row in page['rows']:
+        item = dict(row)
+        item['firm_name'] = item.get('supplier_name') or item.get('customer_name')
+        items.append(item)
+    return {'items': items, 'next_cursor': page['next_cursor']}
+
+
+def list_despatch(conn, schema: Optional[Dict[str, Set[str]]] = None, firma: Optional[str] = None,
+                  start: Optional[str] = None, end: Optional[str] = None,
+                  invoice_id: Optional[int] = None, irs: Optional[str] = None,
+                  cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict:
+    """
+    İrsaliye listesi sayfası (bağlı fatura numarası ve firma ile)
+    
+    Args:
+        firma: Bağlı faturanın firma_kodu
+        start, end: İrsaliye issue_date aralığı, YYYY-MM-DD (ikisi de dahil)
+        invoice_id: Sadece bu faturanın irsaliyeleri
+        irs: Normalize irsaliye numarası (irs_normalized)
+        (diğerleri list_invoices ile aynı)
+    
+    Returns:
+        {'items': [dict], 'next_cursor': str veya None}
+    """
+    schema = schema or load_schema(conn)
+    columns, invoice_columns = schema['despatch_documents'], schema['invoices']
+    position = decode_cursor(cursor)
+    start, end = parse_date(start, 'start'), parse_date(end, 'end')
+    
+    where, params = [], []
+    if firma:
+        _require(invoice_columns, 'firma_kodu', 'firma')
+        # '+' firma index'ini devre dışı bırakır: irsaliyeler tarih index'inden
+        # sırayla okunur, sayfa dolunca durulur (tüm firmayı sıralamak yerine)
+        where.append("+i.firma_kodu = ?")
+        params.append(firma.upper())
+    if invoice_id is not None:
+        where.append("d.invoice_id = ?")
+        params.append(invoice_id)
+    if irs:
+        _require(columns, 'irs_normalized', 'irs')
+        where.append("d.irs_normalized = ?")
+        params.append(irs)
+    if start:
+        where.append("d.issue_date >= ?")
+        params.append(start)
+    if end:
+        where.append("d.issue_date < date(?, '+1 day')")
+        params.append(end)
+    
+    selected = [f"d.{column}" for column in DESPATCH_COLUMNS if column in columns]
+    selected.append("i.invoice_number")
+    if 'firma_kodu' in invoice_columns:
+        selected.append("i.firma_kodu")
+    
+    page = keyset_page(
+        conn,
+        f"SELECT {', '.join(selected)} FROM despatch_documents d "
+        f"LEFT JOIN invoices i ON i.id = d.invoice_id",
+        where, params, 'd.issue_date', 'd.id', position, min(limit, MAX_PAGE_SIZE),
+        include_null=not (start or end),
+    )
+    return {'items': [dict(row) for row in page['rows']], 'next_cursor': page['next_cursor']}
@@ -0,0 +1,46 @@
+// Sonraki sayfaları /api/invoices'tan (keyset imleci ile) ekle
+const button = document.getElementById('load-more');
+
+function cell(row, text, className) {
+    const td = row.insertCell();
+    if (className) td.className = className;
+    td.textContent = text;
+    return td;
+}
+
+function formatAmount(amount) {
+    return (amount || 0).toLocaleString('tr-TR', {minimumFractionDigits: 2, maximumFractionDigits: 2}) + ' TRY';
+}
+
+function formatDate(date) {
+    return date ? date.split('-').reverse().join('.') : '';
+}
+
+if (button) {
+    button.addEventListener('click', async () => {
+        button.disabled = true;
+        const response = await fetch('/api/invoices?cursor=' + encodeURIComponent(button.dataset.cursor));
+        const page = await response.json();
+        const tbody = document.getElementById('invoice-rows');
+
+        for (const inv of page.items || []) {
+            const row = tbody.insertRow();
+            const firma = inv.firma_kodu || '-';
+            const badge = document.createElement('span');
+            badge.className = 'badge badge-' + firma;
+            badge.textContent = firma;
+            row.insertCell().appendChild(badge);
+            cell(row, inv.invoice_number || '');
+            cell(row, formatDate(inv.issue_date));
+            cell(row, (inv.firm_name || '').slice(0, 40));
+            cell(row, formatAmount(inv.total_amount), 'amount');
+        }
+
+        if (page.next_cursor) {
+            button.dataset.cursor = page.next_cursor;
+            button.disabled = false;
+        } else {
+            button.remove();
+        }
+    });
+}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard Üretim Sunucusu (WSGI)
+================================
+
+app.py'deki app.run() Flask'ın tek süreçli geliştirme sunucusudur; ofiste
+birden fazla kişi aynı anda kullandığında istekler birbirini bekler. Bu
+modül aynı uygulamayı üretim WSGI sunucusuyla çalıştırır:
+
+- gunicorn (Linux/macOS): --workers süreç × --threads thread (gthread)
+- waitress (Windows dahil): tek süreç, --threads thread
+
+Her worker kendi önbelleğini ve thread başına salt okunur SQLite
+bağlantılarını ilk istekte açar (cache.thread_connection); okuyucular
+WAL sayesinde import/senkronizasyon işlerini beklemez.
+
+Sunucular opsiyoneldir: pip install gunicorn   (veya: pip install waitress)
+
+Ayarlar komut satırından veya ortam değişkenlerinden okunur:
+DASHBOARD_HOST, DASHBOARD_PORT, DASHBOARD_WORKERS, DASHBOARD_THREADS
+
+Kullanım:
+    python3 src/web/wsgi.py                                  # otomatik sunucu seçimi
+    python3 src/web/wsgi.py --workers 4 --threads 8 --port 8080
+    python3 src/web/wsgi.py --server waitress --threads 16
+    
+    gunicorn -w 4 --threads 8 -k gthread -b 0.0.0.0:8080 src.web.wsgi:app
+    waitress-serve --threads 16 --port 8080 src.web.wsgi:app
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.web.app import app
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_THREADS = 8
+
+SERVERS = ('auto', 'gunicorn', 'waitress')
+
+
+def _available(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def choose_server(requested: str = 'auto') -> str:
+    """
+    Kullanılacak sunucu
+    
+    auto: gunicorn (Windows dışında, kuruluysa), yoksa waitress.
+    
+    Raises:
+        ImportError: İstenen (veya hiçbir) sunucu kurulu değilse
+    """
+    if requested == 'auto':
+        if os.name != 'nt' and _available('gunicorn'):
+            return 'gunicorn'
+        if _available('waitress'):
+            return 'waitress'
+        raise ImportError("Üretim sunucusu bulunamadı: pip install gunicorn (veya: pip install waitress)")
+    
+    if not _available(requested):
+        raise ImportError(f"{requested} kurulu değil: pip install {requested}")
+    return requested
+
+
+def run_gunicorn(host: str, port: int, workers: int, threads: int):
+    """gunicorn: workers süreç × threads thread"""
+    from gunicorn.app.base import BaseApplication
+    
+    class DashboardServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', 60)
+            self.cfg.set('keepalive', 5)
+            # Sızıntıya karşı worker'lar ara sıra yenilenir (aynı anda değil)
+            self.cfg.set('max_requests', 5000)
+            self.cfg.set('max_requests_jitter', 500)
+        
+        def load(self):
+            return app
+    
+    DashboardServer().run()
+
+
+def run_waitress(host: str, port: int, threads: int):
+    """waitress: tek süreç, threads thread"""
+    from waitress import serve
+    serve(app, host=host, port=port, threads=threads, ident='efatura-dashboard')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-Fatura Dashboard üretim sunucusu")
+    parser.add_argument('--server', choices=SERVERS, default='auto', help="WSGI sunucusu")
+    parser.add_argument('--host', default=os.environ.get('DASHBOARD_HOST', DEFAULT_HOST),
+                        help="Dinlenecek adres (ofis ağı için 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('DASHBOARD_PORT', DEFAULT_PORT)))
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Süreç sayısı (sadece gunicorn, varsayılan: {DEFAULT_WORKERS})")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('DASHBOARD_THREADS', DEFAULT_THREADS)),
+                        help="Süreç başına thread sayısı")
+    args = parser.parse_args()
+    workers = args.workers or int(os.environ.get('DASHBOARD_WORKERS', DEFAULT_WORKERS))
+    
+    try:
+        server = choose_server(args.server)
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    print("\n" + "=" * 70)
+    print("🚀 E-FATURA WEB DASHBOARD (ÜRETİM)")
+    print("=" * 70)
+    if server == 'gunicorn':
+        print(f"\n⚙️  gunicorn: {workers} worker × {args.threads} thread")
+    else:
+        if args.workers:
+            print(f"\nℹ️  waitress tek süreçle çalışır, --workers {args.workers} yok sayıldı")
+        print(f"\n⚙️  waitress: {args.threads} thread")
+    print(f"\n📊 Adres: http://{'localhost' if args.host == '0.0.0.0' else args.host}:{args.port}")
+    if args.host == '0.0.0.0':
+        print(f"   (ofisteki diğer bilgisayarlar: http://<bu bilgisayarın IP'si>:{args.port})")
+    print("\n⏹️  Durdurmak için: Ctrl+C")
+    print("=" * 70 + "\n")
+    
+    if server == 'gunicorn':
+        run_gunicorn(args.host, args.port, workers, args.threads)
+    else:
+        run_waitress(args.host, args.port, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -43,7 +43,7 @@ if lsof -Pi :8080 -sTCP:LISTEN -t >/dev/null 2>&1 ; then
     echo ""
     echo "⚠️  Port 8080 kullanımda!"
     echo "   Mevcut process sonlandırılıyor..."
-    pkill -f "simple_web_dashboard" 2>/dev/null
+    pkill -f "simple_web_dashboard|src/web/app.py|src/web/wsgi.py" 2>/dev/null
     sleep 1
 fi
 
@@ -58,6 +58,11 @@ echo "   ⏹️  Durdurmak için: Ctrl+C"
 echo "======================================================================"
 echo ""
 
-# Dashboard'u başlat
-python3 src/web/app.py
+# Dashboard'u başlat (--prod: çok kullanıcılı üretim sunucusu, örn. --prod --workers 4 --threads 8)
+if [ "$1" = "--prod" ]; then
+    shift
+    python3 src/web/wsgi.py "$@"
+else
+    python3 src/web/app.py
+fi
 
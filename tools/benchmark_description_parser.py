@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Description Parser Benchmark
+============================
+
+Eski (çağrı başına re.sub / re.findall) description işleme ile
+ortak description_parser motorunu 100k açıklama üzerinde karşılaştırır.
+
+Kullanım:
+    python3 tools/benchmark_description_parser.py
+    python3 tools/benchmark_description_parser.py --rows 200000 --unique 5000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.parsers.description_parser import (
+    clean_bank_info,
+    clean_bank_info_series,
+    extract_irsaliye_label,
+    extract_normalized_irs,
+    map_descriptions,
+    parse_description,
+    _parse,
+)
+
+
+# ========== ESKİ UYGULAMA (REFERANS) ==========
+
+def legacy_clean_bank_info(description: str) -> str:
+    """api_data_extractor / api_database içindeki eski temizleme"""
+    if not description:
+        return ""
+    desc = str(description)
+    patterns_to_remove = [
+        r'Banka\s+Bilgileri\s*[:\s]*_x000D_\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*_x000D_',
+        r'Banka\s+Bilgileri\s*[:\s]*[\r\n]+\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*[\r\n]+',
+        r'Banka\s+Bilgileri\s*[:\s]*<br\s*/?>\s*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21\s*<br\s*/?>',
+        r'Banka\s+Bilgileri\s*[:\s]*GARANTİBANK\s*-?\s*TR\s*35\s*0006\s*2001\s*1670\s*0006\s*2939\s*21',
+        r'TR\s*\d{2}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{2}',
+    ]
+    for pattern in patterns_to_remove:
+        desc = re.sub(pattern, '', desc, flags=re.IGNORECASE | re.MULTILINE)
+    desc = re.sub(r'Banka\s+Bilgileri\s*[:\s]*$', '', desc, flags=re.IGNORECASE | re.MULTILINE)
+    desc = re.sub(r'^Banka\s+Bilgileri\s*[:\s]*', '', desc, flags=re.IGNORECASE | re.MULTILINE)
+    desc = re.sub(r' +', ' ', desc)
+    return desc.strip()
+
+
+def legacy_irsaliye_label(description: str) -> str:
+    """api_exporter içindeki eski irsaliye çıkarma"""
+    if not description:
+        return ""
+    numbers = []
+    for match in re.findall(r'[İI]RS[-\s]?(\d{5,})', description, re.IGNORECASE):
+        numbers.append(f"IRS{match}")
+    for match in re.findall(r'([AF])[-/\s]*(\d{4,5})', description, re.IGNORECASE):
+        numbers.append(f"{match[0]}-{match[1]}")
+    return ", ".join(list(set(numbers)))
+
+
+def legacy_normalize(irs_full: str) -> str:
+    irs = str(irs_full).strip().upper()
+    irs = re.sub(r'^[A-Z]+-', '', irs)
+    irs = re.sub(r'^IRS\d*?0*', 'IRS', irs)
+    irs = irs.replace('IRS', '')
+    return irs.lstrip('0') or '0'
+
+
+def legacy_normalized_irs(description: str) -> list:
+    """IRSMatcher içindeki eski çıkarma"""
+    if not description or description.strip() == '':
+        return []
+    found = []
+    patterns = [
+        r'IRS\s*NO[:\s]*([A-Z]-)?(\d+)',
+        r'İRSALİYE\s*(?:NO)?[:\s]*([A-Z]-)?(\d+)',
+        r'IRSALIYE\s*(?:NO)?[:\s]*([A-Z]-)?(\d+)',
+        r'IRS[:\s]*([A-Z]-)?(\d+)',
+        r'(?:^|\s)([A-Z]-)?(\d{5,})',
+    ]
+    for pattern in patterns:
+        for match in re.finditer(pattern, description.upper()):
+            number = match.groups()[-1]
+            if len(number) >= 5:
+                normalized = legacy_normalize(number)
+                if normalized and normalized not in found:
+                    found.append(normalized)
+    return found
+
+
+# ========== VERİ ÜRETİMİ ==========
+
+TEMPLATES = [
+    "İRSALİYE NO: F-{n4} ( İSTANBUL )",
+    "İRSALİYE NO: A-{n5} ( ALTINOVA ) Banka Bilgileri: GARANTİBANK - TR35 0006 2001 1670 0006 2939 21",
+    "IRS{n5} nolu irsaliye Banka Bilgileri:_x000D_GARANTİBANK - TR35 0006 2001 1670 0006 2939 21_x000D_",
+    "İRSALİYE NO: F-{n4} / F-{n4b}\nBanka Bilgileri:\nGARANTİBANK - TR35 0006 2001 1670 0006 2939 21\n",
+    "IRS NO: {n5} Ödeme: TR12 3456 7890 1234 5678 9012 34",
+    "Sevk {n5} teslim edildi",
+    "Açıklama yok",
+]
+
+
+def generate_descriptions(rows: int, unique: int, seed: int = 42) -> list:
+    """Tekrarlayan açıklamalardan oluşan test verisi üretir"""
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(unique):
+        template = rng.choice(TEMPLATES)
+        pool.append(template.format(
+            n4=rng.randint(1000, 9999),
+            n4b=rng.randint(1000, 9999),
+            n5=rng.randint(10000, 99999),
+        ))
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def timed(label: str, func):
+    """Fonksiyonu çalıştırıp süresini yazdırır"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<45} {elapsed:8.3f} sn")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Description parser benchmark")
+    parser.add_argument('--rows', type=int, default=100_000, help="Açıklama sayısı")
+    parser.add_argument('--unique', type=int, default=2_000, help="Farklı açıklama sayısı")
+    args = parser.parse_args()
+    
+    descriptions = generate_descriptions(args.rows, args.unique)
+    series = pd.Series(descriptions)
+    
+    print("=" * 70)
+    print(f"📊 DESCRIPTION PARSER BENCHMARK ({args.rows:,} satır, {args.unique:,} farklı)")
+    print("=" * 70)
+    
+    print("\n🐢 Eski uygulama (satır satır, 3 ayrı fonksiyon):")
+    _, legacy_time = timed("clean + label + normalized", lambda: [
+        (legacy_clean_bank_info(d), legacy_irsaliye_label(d), legacy_normalized_irs(d))
+        for d in descriptions
+    ])
+    
+    print("\n🚀 Yeni motor (satır satır, cache soğuk):")
+    _parse.cache_clear()
+    _, row_time = timed("clean + label + normalized", lambda: [
+        (clean_bank_info(d), extract_irsaliye_label(d), extract_normalized_irs(d))
+        for d in descriptions
+    ])
+    
+    print("\n🚀 Yeni motor (pandas Series, cache soğuk):")
+    _parse.cache_clear()
+    _, series_time = timed("clean_bank_info_series + map_descriptions", lambda: (
+        clean_bank_info_series(series),
+        map_descriptions(series, extract_irsaliye_label),
+        map_descriptions(series, extract_normalized_irs),
+    ))
+    
+    print("\n🔬 Tek tarama maliyeti (cache'siz, her açıklama bir kez):")
+    unique_descriptions = list(dict.fromkeys(descriptions))
+    _, scan_time = timed(f"{len(unique_descriptions):,} benzersiz açıklama", lambda: [
+        _parse.__wrapped__(d) for d in unique_descriptions
+    ])
+    
+    # Sonuç uyumu (sıralama farkı önemsiz)
+    mismatches = 0
+    for d in unique_descriptions:
+        legacy = (legacy_clean_bank_info(d),
+                  sorted(legacy_irsaliye_label(d).split(", ")),
+                  legacy_normalized_irs(d))
+        info = parse_description(d)
+        current = (info.cleaned,
+                   sorted(extract_irsaliye_label(d).split(", ")),
+                   extract_normalized_irs(d))
+        if legacy != current:
+            mismatches += 1
+    
+    print("\n" + "=" * 70)
+    print(f"⚡ Hızlanma (satır satır): {legacy_time / row_time:,.1f}x")
+    print(f"⚡ Hızlanma (Series):      {legacy_time / series_time:,.1f}x")
+    print(f"✅ Sonuç uyumu: {len(unique_descriptions) - mismatches:,}/{len(unique_descriptions):,} benzersiz açıklama")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel Export Benchmark
+======================
+
+"Fatura Satırları" sayfasını eski yöntemle (openpyxl Workbook, hücre başına
+değer + kenarlık + sayı biçimi) ve StreamingExcelWriter ile (xlsxwriter
+constant_memory, cursor'dan fetchmany) yazar; süre ve en yüksek Python
+bellek kullanımını karşılaştırır, ardından iki dosyanın değerlerini
+read-only modda karşılaştırır.
+
+Sentetik veritabanı geçici bir klasörde oluşturulur,
+gerçek veritabanına dokunulmaz.
+
+Kullanım:
+    python3 tools/benchmark_excel_export.py
+    python3 tools/benchmark_excel_export.py --lines 300000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import openpyxl
+from openpyxl.styles import Border, Side
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.exporters.excel_writer import StreamingExcelWriter
+from src.exporters.export_engine import write_sheet
+from src.exporters.export_specs import BIRLESIK_EXPORT, adet_degeri
+
+
+# Birleşik çıktının "Fatura Satırları" tanımı (SQL + sütunlar + ADET)
+LINES_SHEET = next(sheet for sheet in BIRLESIK_EXPORT.sheets if sheet.title == "Fatura Satırları")
+
+ITEMS = ['ALÇI PANEL 12.5MM', 'SATEN ALÇI 25KG', 'KARTONPİYER YAPIŞTIRICI', 'PROFİL C50', 'DERZ BANDI']
+
+
+def create_database(db_path: Path, lines: int, rng: random.Random):
+    """Sentetik birlesik.db (fatura başına ~5 satır)"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE invoices (id INTEGER PRIMARY KEY, firma_kodu TEXT, invoice_number TEXT, issue_date TEXT);
+        CREATE TABLE invoice_lines (
+            id INTEGER PRIMARY KEY, invoice_id INTEGER, line_id TEXT, item_name TEXT,
+            quantity REAL, unit TEXT, unit_price REAL, line_total REAL
+        );
+    ''')
+    invoice_count = max(1, lines // 5)
+    conn.executemany("INSERT INTO invoices VALUES (?, ?, ?, ?)", [
+        (i, rng.choice('AF'), f"AKG2025{i:09d}", f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        for i in range(1, invoice_count + 1)
+    ])
+    rows = []
+    for line in range(lines):
+        quantity = round(rng.uniform(1, 40), 3)
+        price = round(rng.uniform(50, 5_000), 2)
+        rows.append((rng.randint(1, invoice_count), str(line % 5 + 1), rng.choice(ITEMS),
+                     quantity, rng.choice(['TNE', 'EA', 'KGM']), price, round(quantity * price, 2)))
+    conn.executemany('''
+        INSERT INTO invoice_lines (invoice_id, line_id, item_name, quantity, unit, unit_price, line_total)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def legacy_export(db_path: Path, output: Path):
+    """Eski exporter: fetchall + openpyxl hücre hücre"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Fatura Satırları"
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+    
+    for col_num, column in enumerate(LINES_SHEET.columns, 1):
+        ws.cell(row=1, column=col_num).value = column.header
+    
+    cursor.execute(LINES_SHEET.sql)
+    for row_num, row_data in enumerate(cursor.fetchall(), 2):
+        for col_num, value in enumerate(row_data, 1):
+            cell = ws.cell(row=row_num, column=col_num)
+            cell.value = value
+            cell.border = border
+            if col_num in [5, 7, 8]:
+                cell.number_format = '#,##0.00'
+        
+        adet_cell = ws.cell(row=row_num, column=9)
+        adet_cell.border = border
+        adet_cell.value = adet_degeri(row_data[4], row_data[5])
+        adet_cell.number_format = '#,##0.00'
+    
+    conn.close()
+    wb.save(output)
+
+
+def streaming_export(db_path: Path, output: Path):
+    """Export motoru: fetchmany + constant_memory"""
+    conn = sqlite3.connect(db_path)
+    writer = StreamingExcelWriter(output)
+    write_sheet(writer, conn.cursor(), LINES_SHEET)
+    writer.close()
+    conn.close()
+
+
+def measured(label: str, func):
+    """Fonksiyonun süresini ve en yüksek Python bellek kullanımını yazdırır
+    
+    tracemalloc yavaşlattığı için süre ve bellek ayrı çalıştırmalarda ölçülür.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    
+    print(f"   {label:<40} {elapsed:8.3f} sn   {peak:8.1f} MB")
+    return elapsed, peak
+
+
+def read_values(path: Path) -> list:
+    wb = openpyxl.load_workbook(path, read_only=True)
+    values = list(wb["Fatura Satırları"].iter_rows(values_only=True))
+    wb.close()
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel export benchmark")
+    parser.add_argument('--lines', type=int, default=50_000, help="Fatura satırı sayısı")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db_path = tmp / "birlesik.db"
+        create_database(db_path, args.lines, random.Random(42))
+        
+        print("=" * 70)
+        print(f"📊 EXCEL EXPORT BENCHMARK ({args.lines:,} fatura satırı)")
+        print("=" * 70)
+        
+        print("\n🐢 openpyxl Workbook (hücre başına stil):")
+        legacy_time, legacy_peak = measured("Fatura Satırları", lambda: legacy_export(db_path, tmp / "legacy.xlsx"))
+        
+        print("\n🚀 StreamingExcelWriter (constant_memory):")
+        stream_time, stream_peak = measured("Fatura Satırları", lambda: streaming_export(db_path, tmp / "stream.xlsx"))
+        
+        same = read_values(tmp / "legacy.xlsx") == read_values(tmp / "stream.xlsx")
+        
+        print("\n" + "=" * 70)
+        print(f"⚡ Hızlanma: {legacy_time / stream_time:,.1f}x")
+        print(f"💾 Bellek: {legacy_peak:,.1f} MB → {stream_peak:,.1f} MB")
+        print(f"✅ Sonuç uyumu: {'EVET' if same else 'HAYIR'}")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Invoice Matcher Benchmark
+=========================
+
+Eski (her irsaliye kodu için yeni bağlantı + JOIN + COUNT sorgusu,
+df.iterrows() döngüsü) eşleştirme ile önceden yüklenmiş irsaliye
+indeksi + explode/merge eşleştirmesini karşılaştırır.
+
+Sentetik akgips.db / fullboard.db geçici bir klasörde oluşturulur,
+gerçek veritabanlarına dokunulmaz.
+
+Kullanım:
+    python3 tools/benchmark_invoice_matcher.py
+    python3 tools/benchmark_invoice_matcher.py --invoices 20000 --despatches 30000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "tools"))
+
+from invoice_matcher import InvoiceMatcher, RESULT_COLUMNS, logger
+
+
+# ========== ESKİ UYGULAMA (REFERANS) ==========
+
+def legacy_search(irsaliye_code: str, db_path: Path) -> dict:
+    """Eski search_in_database: her çağrıda bağlantı + 2 sorgu, eşit bölüştürme"""
+    result = {'invoice_number': None, 'total_amount': None, 'found': False, 'irsaliye_count': 0}
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT i.invoice_number, i.total_amount, i.id
+        FROM despatch_documents d
+        JOIN invoices i ON d.invoice_id = i.id
+        WHERE d.despatch_id_short = ?
+        LIMIT 1
+    """, (irsaliye_code,))
+    row = cursor.fetchone()
+    if row:
+        cursor.execute("SELECT COUNT(*) FROM despatch_documents WHERE invoice_id = ?", (row[2],))
+        irsaliye_count = cursor.fetchone()[0]
+        result.update({
+            'invoice_number': row[0],
+            'total_amount': row[1] / irsaliye_count if irsaliye_count > 0 else row[1],
+            'irsaliye_count': irsaliye_count,
+            'found': True,
+        })
+    conn.close()
+    return result
+
+
+def legacy_match(matcher: InvoiceMatcher, df: pd.DataFrame) -> pd.DataFrame:
+    """Eski process_api_invoices döngüsü (Excel okuma hariç)"""
+    results = []
+    for _, row in df.iterrows():
+        giden_fatura_no = row.get('invoiceNumber', '')
+        giden_tutar = row.get('totalTL', 0)
+        giden_tarih_formatted = matcher.format_date(row.get('date', ''))
+        irsaliye_codes = matcher.extract_irsaliye_codes(row.get('description', ''))
+        
+        if not irsaliye_codes:
+            results.append({
+                'Tarih': giden_tarih_formatted, 'Giden_Fatura_No': giden_fatura_no,
+                'Giden_Tutar_TL': giden_tutar, 'Irsaliye_Kodu': 'Bulunamadı', 'Firma': '-',
+                'Gelen_Fatura_No': '-', 'Gelen_Tutar_TL': 0, 'Fark_TL': 0, 'KDV_20_TL': 0,
+                'Fark_KDV_Dusulmus_TL': 0, 'Durum': 'İrsaliye kodu yok ⚠'
+            })
+            continue
+        
+        irsaliye_sayisi = len(irsaliye_codes)
+        ortalama_tutar = giden_tutar / irsaliye_sayisi
+        isaret = f" (÷{irsaliye_sayisi})" if irsaliye_sayisi > 1 else ""
+        
+        for prefix, number in irsaliye_codes:
+            irsaliye_code = f"{prefix}-{number}"
+            firma, db_path = (('AK GİPS', matcher.akgips_db) if prefix == 'A'
+                              else ('FULLBOARD', matcher.fullboard_db))
+            search_result = legacy_search(irsaliye_code, db_path)
+            
+            if search_result['found']:
+                durum = 'Eşleşti ✓'
+                gelen_fatura_no = search_result['invoice_number']
+                gelen_tutar = search_result['total_amount']
+                if search_result['irsaliye_count'] > 1:
+                    gelen_fatura_no = f"{gelen_fatura_no} (÷{search_result['irsaliye_count']})"
+            else:
+                durum = 'Bulunamadı ✗'
+                gelen_fatura_no = '-'
+                gelen_tutar = 0
+            
+            fark = ortalama_tutar - gelen_tutar if search_result['found'] else 0
+            results.append({
+                'Tarih': giden_tarih_formatted, 'Giden_Fatura_No': giden_fatura_no + isaret,
+                'Giden_Tutar_TL': ortalama_tutar, 'Irsaliye_Kodu': irsaliye_code, 'Firma': firma,
+                'Gelen_Fatura_No': gelen_fatura_no, 'Gelen_Tutar_TL': gelen_tutar,
+                'Fark_TL': fark, 'KDV_20_TL': fark * 0.20, 'Fark_KDV_Dusulmus_TL': fark * 0.80,
+                'Durum': durum
+            })
+    return pd.DataFrame(results, columns=RESULT_COLUMNS)
+
+
+# ========== VERİ ÜRETİMİ ==========
+
+def create_parser_db(db_path: Path, prefix: str, despatches: int, rng: random.Random) -> list:
+    """Sentetik parser veritabanı oluşturur, irsaliye kodlarını döndürür"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE invoices (id INTEGER PRIMARY KEY, invoice_number TEXT, total_amount REAL);
+        CREATE TABLE despatch_documents (
+            id INTEGER PRIMARY KEY, invoice_id INTEGER,
+            despatch_id_full TEXT, despatch_id_short TEXT
+        );
+        CREATE TABLE invoice_lines (
+            id INTEGER PRIMARY KEY, invoice_id INTEGER, line_id TEXT, quantity REAL,
+            unit_price REAL, line_total REAL, despatch_id_full TEXT
+        );
+        CREATE INDEX idx_despatch_short ON despatch_documents(despatch_id_short);
+        CREATE INDEX idx_despatch_invoice ON despatch_documents(invoice_id);
+    """)
+    codes = []
+    invoice_id = 0
+    number = 10000
+    while len(codes) < despatches:
+        invoice_id += 1
+        conn.execute("INSERT INTO invoices VALUES (?, ?, ?)",
+                     (invoice_id, f"{prefix}KG2025{invoice_id:09d}", round(rng.uniform(10_000, 250_000), 2)))
+        for _ in range(rng.choice([1, 1, 1, 2, 3])):
+            number += 1
+            code = f"{prefix}-{number}"
+            conn.execute("INSERT INTO despatch_documents (invoice_id, despatch_id_full, despatch_id_short) VALUES (?, ?, ?)",
+                         (invoice_id, f"IRS2025{number:09d}", code))
+            codes.append(code)
+    conn.commit()
+    conn.close()
+    return codes
+
+
+def generate_api_invoices(rows: int, codes: list, rng: random.Random) -> pd.DataFrame:
+    """Sentetik API giden fatura tablosu"""
+    records = []
+    for i in range(rows):
+        choice = rng.random()
+        if choice < 0.08:
+            description = "Açıklama yok"
+        elif choice < 0.15:
+            description = f"İRSALİYE NO: {rng.choice('AF')}-99{rng.randint(100, 999)}"  # bulunamayan
+        else:
+            picked = rng.sample(codes, rng.choice([1, 1, 1, 2]))
+            description = "İRSALİYE NO: " + " / ".join(picked) + " ( İSTANBUL )"
+        records.append({
+            'invoiceNumber': f"GIB2025{i:09d}",
+            'totalTL': round(rng.uniform(10_000, 300_000), 2),
+            'date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00.000",
+            'description': description,
+        })
+    return pd.DataFrame(records)
+
+
+def timed(label: str, func):
+    """Fonksiyonu çalıştırıp süresini yazdırır"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<45} {elapsed:8.3f} sn")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invoice matcher benchmark")
+    parser.add_argument('--invoices', type=int, default=5_000, help="Giden fatura sayısı (~1 yıl)")
+    parser.add_argument('--despatches', type=int, default=10_000, help="Firma başına irsaliye sayısı")
+    args = parser.parse_args()
+    
+    logger.setLevel('WARNING')
+    rng = random.Random(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        matcher = InvoiceMatcher()
+        matcher.akgips_db = tmp / "akgips.db"
+        matcher.fullboard_db = tmp / "fullboard.db"
+        
+        codes = (create_parser_db(matcher.akgips_db, 'A', args.despatches, rng)
+                 + create_parser_db(matcher.fullboard_db, 'F', args.despatches, rng))
+        df = generate_api_invoices(args.invoices, codes, rng)
+        
+        print("=" * 70)
+        print(f"📊 INVOICE MATCHER BENCHMARK ({args.invoices:,} fatura, {len(codes):,} irsaliye)")
+        print("=" * 70)
+        
+        print("\n🐢 Eski uygulama (iterrows + kod başına bağlantı/sorgu):")
+        legacy, legacy_time = timed("process_api_invoices", lambda: legacy_match(matcher, df))
+        
+        print("\n🚀 Yeni uygulama (indeks bir kez + explode/merge):")
+        current, current_time = timed("load_despatch_index + match_api_invoices",
+                                      lambda: matcher.match_api_invoices(df))
+        
+        # Sonuç uyumu
+        same_text = all(
+            legacy[column].astype(str).equals(current[column].astype(str))
+            for column in ['Tarih', 'Giden_Fatura_No', 'Irsaliye_Kodu', 'Firma', 'Gelen_Fatura_No', 'Durum']
+        )
+        same_amounts = all(
+            np.allclose(legacy[column].astype(float), current[column].astype(float))
+            for column in ['Giden_Tutar_TL', 'Gelen_Tutar_TL', 'Fark_TL', 'KDV_20_TL', 'Fark_KDV_Dusulmus_TL']
+        )
+        
+        print("\n" + "=" * 70)
+        print(f"⚡ Hızlanma: {legacy_time / current_time:,.1f}x")
+        print(f"✅ Sonuç uyumu: {'EVET' if same_text and same_amounts and len(legacy) == len(current) else 'HAYIR'}"
+              f" ({len(current):,} satır)")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IRS Eşleştirme Benchmark
+========================
+
+IRSMatcher.match_invoices (hash-join) ile eski iç içe döngü eşleştirmesini
+sentetik veri üzerinde karşılaştırır.
+
+Varsayılan: 50.000 alış irsaliyesi × 50.000 satış faturası.
+Eski algoritma O(P × S × k) olduğu için sadece küçük bir alt kümede
+çalıştırılır ve tam boyut için süre tahmini yapılır.
+
+Kullanım:
+    python3 tools/benchmark_irs_matching.py
+    python3 tools/benchmark_irs_matching.py --purchases 100000 --sales 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.financial.irs_matcher import IRSMatcher
+
+
+def generate_data(purchases: int, sales: int, seed: int = 42):
+    """Sentetik alış irsaliyesi ve satış faturası listeleri üretir"""
+    rng = random.Random(seed)
+    irs_space = max(purchases, 1) * 2  # Yaklaşık yarısı eşleşsin
+    
+    purchase_invoices = []
+    for i in range(purchases):
+        number = rng.randint(10000, 10000 + irs_space)
+        prefix = rng.choice('AF')
+        purchase_invoices.append({
+            'invoice_id': i + 1,
+            'invoice_number': f"ALS{i:08d}",
+            'total_amount': round(rng.uniform(100, 50000), 2),
+            'firma_kodu': prefix,
+            'issue_date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'supplier_name': 'AK GİPS' if prefix == 'A' else 'FULLBOARD',
+            'irs_short': f"{prefix}-{number}",
+            'irs_full': f"IRS2025{number:09d}",
+            'irs_normalized': str(number),
+        })
+    
+    sales_invoices = []
+    for i in range(sales):
+        count = rng.choice((1, 1, 1, 2, 3))
+        irs_numbers = [str(rng.randint(10000, 10000 + irs_space)) for _ in range(count)]
+        sales_invoices.append({
+            'invoice_id': purchases + i + 1,
+            'invoice_number': f"STS{i:08d}",
+            'total_amount': round(rng.uniform(100, 60000), 2),
+            'issue_date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'customer_name': f"Müşteri {i % 500}",
+            'description': "İRSALİYE NO: " + ", ".join(irs_numbers),
+            'irs_numbers': irs_numbers,
+        })
+    
+    return purchase_invoices, sales_invoices
+
+
+def legacy_match(purchase_invoices, sales_invoices):
+    """Eski find_matches döngüsü (referans)"""
+    matches = []
+    matched_sales = set()
+    for purchase in purchase_invoices:
+        for sales in sales_invoices:
+            if sales['invoice_id'] in matched_sales:
+                continue
+            for sales_irs in sales['irs_numbers']:
+                if sales_irs == purchase['irs_normalized']:
+                    matches.append(IRSMatcher.build_match(purchase, sales))
+                    matched_sales.add(sales['invoice_id'])
+                    break
+    return matches
+
+
+def match_keys(matches):
+    return [(m['purchase_invoice_id'], m['sales_invoice_id'], m['irs_number']) for m in matches]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IRS eşleştirme benchmark")
+    parser.add_argument('--purchases', type=int, default=50_000, help="Alış irsaliyesi sayısı")
+    parser.add_argument('--sales', type=int, default=50_000, help="Satış faturası sayısı")
+    parser.add_argument('--legacy-size', type=int, default=2_000, help="Eski algoritma alt küme boyutu")
+    args = parser.parse_args()
+    
+    matcher = IRSMatcher(db_path=':memory:')
+    
+    print("=" * 70)
+    print(f"📊 IRS EŞLEŞTİRME BENCHMARK ({args.purchases:,} alış × {args.sales:,} satış)")
+    print("=" * 70)
+    
+    # 1. Alt kümede doğruluk + eski algoritma süresi
+    small_p, small_s = generate_data(args.legacy_size, args.legacy_size)
+    
+    start = time.perf_counter()
+    legacy = legacy_match(small_p, small_s)
+    legacy_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    current = matcher.match_invoices(small_p, small_s)
+    small_time = time.perf_counter() - start
+    
+    same = match_keys(legacy) == match_keys(current)
+    print(f"\n🔬 Alt küme ({args.legacy_size:,} × {args.legacy_size:,}):")
+    print(f"   Eski döngü:  {legacy_time:8.3f} sn ({len(legacy):,} eşleşme)")
+    print(f"   Hash-join:   {small_time:8.3f} sn ({len(current):,} eşleşme)")
+    print(f"   {'✅' if same else '❌'} Sonuçlar {'birebir aynı' if same else 'FARKLI'}")
+    
+    # 2. Tam boyut
+    purchase_invoices, sales_invoices = generate_data(args.purchases, args.sales)
+    
+    start = time.perf_counter()
+    matches = matcher.match_invoices(purchase_invoices, sales_invoices)
+    full_time = time.perf_counter() - start
+    
+    # Eski algoritma en kötü durumda P × S ile ölçeklenir
+    scale = (args.purchases * args.sales) / (args.legacy_size * args.legacy_size)
+    estimated_legacy = legacy_time * scale
+    
+    print(f"\n🚀 Tam boyut ({args.purchases:,} × {args.sales:,}):")
+    print(f"   Hash-join:   {full_time:8.3f} sn ({len(matches):,} eşleşme)")
+    print(f"   Eski döngü:  ~{estimated_legacy:,.0f} sn (tahmini, P×S ölçekleme)")
+    
+    print("\n" + "=" * 70)
+    print(f"⚡ Tahmini hızlanma: {estimated_legacy / full_time:,.0f}x")
+    print("=" * 70)
+    
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
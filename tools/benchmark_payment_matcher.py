@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Payment Matcher Benchmark
+=========================
+
+Her banka işlemini tüm açık faturalarla karşılaştıran (çift döngü)
+eşleştirme ile numara/tutar indeksli PaymentMatcher'ı karşılaştırır.
+Puanlama ve atama aynıdır; yalnızca aday üretimi farklıdır.
+
+Sentetik veritabanı geçici bir klasörde oluşturulur,
+gerçek veritabanına dokunulmaz.
+
+Kullanım:
+    python3 tools/benchmark_payment_matcher.py
+    python3 tools/benchmark_payment_matcher.py --invoices 20000 --transactions 2000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.financial.bank_statement import BankStatementReader
+from src.financial.payment_matcher import PaymentMatcher
+
+
+SUPPLIERS = ['AK GİPS SANAYİ VE TİCARET A.Ş.', 'FULLBOARD YAPI MALZEMELERİ LTD. ŞTİ.']
+CUSTOMERS = [f"{name} İNŞAAT LTD. ŞTİ." for name in
+             ['KARTAL', 'YILDIZ', 'DENİZ', 'ÖZGÜR', 'BAŞAK', 'ÇINAR', 'ATLAS', 'EGE', 'TOROS', 'MERT']]
+
+
+# ========== VERİ ÜRETİMİ ==========
+
+def create_database(db_path: Path, invoices: int, rng: random.Random) -> list:
+    """Sentetik birlesik.db, fatura kayıtlarını döndürür"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE invoices (
+            id INTEGER PRIMARY KEY, firma_kodu TEXT, invoice_number TEXT, issue_date TEXT,
+            total_amount REAL, supplier_name TEXT, customer_name TEXT, invoice_type TEXT,
+            payment_status TEXT DEFAULT 'UNPAID', paid_amount REAL DEFAULT 0, remaining_amount REAL
+        )
+    """)
+    rows = []
+    for invoice_id in range(1, invoices + 1):
+        is_purchase = rng.random() < 0.5
+        firma = rng.choice('AF') if is_purchase else 'API'
+        rows.append((
+            invoice_id, firma,
+            f"{'AKG' if firma == 'A' else 'FUL' if firma == 'F' else 'GIB'}2025{invoice_id:09d}",
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            round(rng.uniform(1_000, 250_000), 2),
+            SUPPLIERS[0 if firma == 'A' else 1] if is_purchase else 'API GİPS',
+            'API GİPS' if is_purchase else rng.choice(CUSTOMERS),
+            'PURCHASE' if is_purchase else 'SALES',
+        ))
+    conn.executemany("""
+        INSERT INTO invoices (id, firma_kodu, invoice_number, issue_date, total_amount,
+                              supplier_name, customer_name, invoice_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def generate_transactions(count: int, invoices: list, rng: random.Random) -> list:
+    """Numaralı, sadece tutarlı, kısmi ve eşleşmeyen işlemler"""
+    reader = BankStatementReader()
+    transactions = []
+    for i in range(count):
+        invoice = rng.choice(invoices)
+        is_purchase = invoice[7] == 'PURCHASE'
+        counterparty = invoice[5] if is_purchase else invoice[6]
+        choice = rng.random()
+        if choice < 0.4:
+            amount, description = invoice[4], f"FATURA {invoice[2]} ODEMESI"
+        elif choice < 0.75:
+            amount, description = invoice[4], f"{counterparty} HAVALE"
+        elif choice < 0.9:
+            amount, description = round(invoice[4] / 2, 2), f"{invoice[2]} KISMI ODEME"
+        else:
+            amount, description = round(rng.uniform(100, 5_000), 2), "KIRA / MAAS"
+        transactions.append(reader._transaction(
+            payment_date='2025-12-31',
+            amount=amount,
+            direction=BankStatementReader.DEBIT if is_purchase else BankStatementReader.CREDIT,
+            description=description,
+            counterparty=counterparty if choice < 0.9 else '',
+            reference_number=f"REF{i:06d}",
+        ))
+    return transactions
+
+
+def timed(label: str, func):
+    """Fonksiyonu çalıştırıp süresini yazdırır"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<45} {elapsed:8.3f} sn")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payment matcher benchmark")
+    parser.add_argument('--invoices', type=int, default=5_000, help="Açık fatura sayısı")
+    parser.add_argument('--transactions', type=int, default=1_000, help="Ekstre işlem sayısı (~1 ay)")
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "birlesik.db"
+        invoices = create_database(db_path, args.invoices, rng)
+        transactions = generate_transactions(args.transactions, invoices, rng)
+        
+        matcher = PaymentMatcher(db_path)
+        matcher.load_open_invoices()
+        
+        print("=" * 70)
+        print(f"📊 PAYMENT MATCHER BENCHMARK ({args.transactions:,} işlem, {args.invoices:,} açık fatura)")
+        print("=" * 70)
+        
+        print("\n🐢 Çift döngü (her işlem × her fatura):")
+        all_invoices = list(matcher.invoices.values())
+        pairwise, pairwise_time = timed("match (tüm faturalar aday)",
+                                        lambda: matcher.match(transactions, lambda t: all_invoices))
+        
+        print("\n🚀 İndeksli (fatura numarası hash + tutar kovası):")
+        indexed, indexed_time = timed("match", lambda: matcher.match(transactions))
+        
+        same = all(
+            (a['invoice_id'], a['score'], a['confidence']) == (b['invoice_id'], b['score'], b['confidence'])
+            for a, b in zip(pairwise, indexed)
+        )
+        counts = {}
+        for match in indexed:
+            counts[match['confidence'] or 'NONE'] = counts.get(match['confidence'] or 'NONE', 0) + 1
+        
+        print("\n" + "=" * 70)
+        print(f"⚡ Hızlanma: {pairwise_time / indexed_time:,.1f}x")
+        print(f"✅ Sonuç uyumu: {'EVET' if same else 'HAYIR'} ({len(indexed):,} işlem)")
+        print("📊 " + " | ".join(f"{level}: {counts.get(level, 0):,}" for level in ['HIGH', 'MEDIUM', 'LOW', 'NONE']))
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
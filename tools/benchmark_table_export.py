@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tablo Export Benchmark (Excel / CSV / JSONL / Parquet)
+======================================================
+
+"Fatura Satırları" sayfasını aynı tanımla (SQL + sütunlar + ADET) her
+biçimde yazar ve pandas ile geri okur; yazma/okuma sürelerini ve dosya
+boyutlarını karşılaştırır, okunan değerlerin Excel ile aynı olduğunu
+kontrol eder.
+
+Parquet yalnızca pyarrow kuruluysa ölçülür.
+Sentetik veritabanı geçici bir klasörde oluşturulur (benchmark_excel_export).
+
+Kullanım:
+    python3 tools/benchmark_table_export.py
+    python3 tools/benchmark_table_export.py --lines 300000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.exporters.excel_writer import StreamingExcelWriter, iter_rows
+from src.exporters.export_engine import row_builder, write_sheet
+from src.exporters.table_writer import FORMATS, parquet_available, read_table, write_table
+from tools.benchmark_excel_export import LINES_SHEET, create_database
+
+
+def write_excel(db_path: Path, output: Path):
+    conn = sqlite3.connect(db_path)
+    writer = StreamingExcelWriter(output)
+    write_sheet(writer, conn.cursor(), LINES_SHEET)
+    writer.close()
+    conn.close()
+
+
+def write_flat(db_path: Path, output: Path):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(LINES_SHEET.sql)
+    write_table(output, [c.header for c in LINES_SHEET.columns], iter_rows(cursor),
+                transform=row_builder(LINES_SHEET.columns, cursor.description))
+    conn.close()
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def normalized(df) -> list:
+    """Biçimler arası karşılaştırma için (boş → None, sayılar 2 basamak)"""
+    df = df.astype(object).where(df.notna(), None)
+    return [[round(v, 2) if isinstance(v, float) else None if v == '' else str(v) if v is not None else None
+             for v in row] for row in df.values.tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tablo export benchmark")
+    parser.add_argument('--lines', type=int, default=50_000, help="Fatura satırı sayısı")
+    args = parser.parse_args()
+    
+    formats = ['csv', 'jsonl'] + (['parquet'] if parquet_available() else [])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db_path = tmp / "birlesik.db"
+        create_database(db_path, args.lines, random.Random(42))
+        
+        print("=" * 70)
+        print(f"📊 TABLO EXPORT BENCHMARK ({args.lines:,} fatura satırı)")
+        print("=" * 70)
+        print(f"\n   {'Biçim':<10} {'Yazma':>10} {'Okuma':>10} {'Boyut':>10}")
+        
+        excel = tmp / "satirlar.xlsx"
+        excel_write = timed(lambda: write_excel(db_path, excel))
+        start = time.perf_counter()
+        expected = normalized(read_table(excel))
+        excel_read = time.perf_counter() - start
+        print(f"   {'xlsx':<10} {excel_write:8.3f} sn {excel_read:8.3f} sn "
+              f"{excel.stat().st_size / 1024 / 1024:7.1f} MB")
+        
+        results = {}
+        for fmt in formats:
+            output = tmp / f"satirlar{FORMATS[fmt]}"
+            write_time = timed(lambda: write_flat(db_path, output))
+            start = time.perf_counter()
+            values = normalized(read_table(output))
+            read_time = time.perf_counter() - start
+            results[fmt] = (write_time, read_time, values == expected)
+            print(f"   {fmt:<10} {write_time:8.3f} sn {read_time:8.3f} sn "
+                  f"{output.stat().st_size / 1024 / 1024:7.1f} MB")
+        
+        if not parquet_available():
+            print("\n   ℹ️  pyarrow kurulu değil, Parquet atlandı")
+        
+        print("\n" + "=" * 70)
+        for fmt, (write_time, read_time, same) in results.items():
+            print(f"⚡ {fmt}: yazma {excel_write / write_time:,.1f}x, okuma {excel_read / read_time:,.1f}x hızlı"
+                  f" - Sonuç uyumu: {'EVET' if same else 'HAYIR'}")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ödeme Durumu Tutarlılık Kontrolü
+================================
+
+Faturalardaki paid_amount / remaining_amount / payment_status değerlerini
+payment_records toplamlarıyla karşılaştırır. Değerler trigger'larla
+artımlı tutulduğu için normalde fark çıkmaz; trigger'lar kurulmadan önce
+eklenen ya da elle düzenlenen kayıtlar burada görünür.
+
+Kullanım:
+    python3 tools/check_payment_status.py
+    python3 tools/check_payment_status.py --fix
+    python3 tools/check_payment_status.py --db data/db/birlesik.db
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.connection import get_connection
+from src.financial.payment_manager import PaymentManager
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="Ödeme durumu tutarlılık kontrolü")
+    parser.add_argument('--db', help="Veritabanı yolu (varsayılan: data/db/birlesik.db)")
+    parser.add_argument('--fix', action='store_true', help="Tutarsız faturaları yeniden hesapla")
+    parser.add_argument('--limit', type=int, default=20, help="Listelenecek en fazla fatura")
+    args = parser.parse_args()
+    
+    pm = PaymentManager(args.db)
+    
+    print("=" * 80)
+    print("🔍 ÖDEME DURUMU TUTARLILIK KONTROLÜ")
+    print("=" * 80)
+    print(f"📁 {pm.db_path}")
+    
+    conn = get_connection(pm.db_path)
+    triggers = pm.has_status_triggers(conn.cursor())
+    conn.close()
+    print(f"⚙️  Ödeme trigger'ları: {'kurulu' if triggers else 'YOK (schema_migration çalıştırın)'}")
+    
+    mismatches = pm.check_payment_consistency(fix=args.fix)
+    
+    if not mismatches:
+        print("\n✅ Tüm faturalar ödeme kayıtlarıyla tutarlı")
+        return 0
+    
+    print(f"\n⚠️  {len(mismatches)} tutarsız fatura:\n")
+    print(f"{'ID':>6}  {'Fatura No':<18} {'Ödenen':>14} {'Beklenen':>14} {'Kalan':>14} {'Beklenen':>14}  Durum")
+    for row in mismatches[:args.limit]:
+        print(f"{row['invoice_id']:>6}  {str(row['invoice_number']):<18} "
+              f"{row['paid_amount'] or 0:>14,.2f} {row['expected_paid']:>14,.2f} "
+              f"{row['remaining_amount'] or 0:>14,.2f} {row['expected_remaining']:>14,.2f}  "
+              f"{row['payment_status']} → {row['expected_status']}")
+    if len(mismatches) > args.limit:
+        print(f"   ... ve {len(mismatches) - args.limit} fatura daha")
+    
+    if args.fix:
+        print(f"\n🔧 {len(mismatches)} fatura yeniden hesaplandı")
+        return 0
+    
+    print("\n💡 Düzeltmek için: python3 tools/check_payment_status.py --fix")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,10 +11,15 @@ Kullanım:
     python3 tools/fix_irsaliye_zeros.py
 """
 
-import sqlite3
+import sys
 from pathlib import Path
 import re
 
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.database.connection import get_connection
+
 
 def fix_irsaliye_numbers(db_path: Path, firma_prefix: str):
     """
@@ -31,7 +36,7 @@ def fix_irsaliye_numbers(db_path: Path, firma_prefix: str):
     print(f"\n📊 İşleniyor: {db_path.name}")
     print("=" * 80)
     
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     # Mevcut irsaliye numaralarını al
@@ -12,13 +12,22 @@ Kullanım:
     python3 tools/invoice_matcher.py
 """
 
+import numpy as np
 import pandas as pd
-import sqlite3
-import re
+import sys
 from pathlib import Path
 from datetime import datetime
 import logging
 
+# Proje kök dizinini sys.path'e ekle
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.connection import get_connection
+from src.exporters.table_writer import find_table, load_table
+from src.financial.irs_reconciler import IRSReconciler
+from src.parsers.description_parser import extract_firm_codes, map_descriptions
+
 # Logging ayarları
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +35,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# İrsaliye öneki -> (firma adı, veritabanı özniteliği)
+FIRMS = {
+    'A': ('AK GİPS', 'akgips_db'),
+    'F': ('FULLBOARD', 'fullboard_db'),
+}
+
+# İrsaliye indeksi sütunları
+DESPATCH_INDEX_COLUMNS = ['invoice_number', 'total_amount', 'irsaliye_count', 'share']
+
+# Rapor sütunları
+RESULT_COLUMNS = [
+    'Tarih', 'Giden_Fatura_No', 'Giden_Tutar_TL', 'Irsaliye_Kodu', 'Firma',
+    'Gelen_Fatura_No', 'Gelen_Tutar_TL', 'Fark_TL', 'KDV_20_TL',
+    'Fark_KDV_Dusulmus_TL', 'Durum',
+]
+
 
 class InvoiceMatcher:
     """
@@ -40,6 +65,7 @@ class InvoiceMatcher:
         
         # Dosya yolları
         self.api_excel = self.project_root / "data" / "excel" / "api" / "API_Giden_Faturalar.xlsx"
+        self.api_table = self.api_excel.with_suffix('')   # .jsonl/.parquet/.csv varsa tercih edilir
         self.akgips_db = self.project_root / "data" / "db" / "akgips.db"
         self.fullboard_db = self.project_root / "data" / "db" / "fullboard.db"
         
@@ -47,15 +73,8 @@ class InvoiceMatcher:
         self.output_dir = self.project_root / "kayıtlar"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # İrsaliye kodu regex pattern'i
-        # A- veya F- ile başlayan 4-5 haneli kodları yakalar
-        # Desteklenen formatlar:
-        #   - F-9171, A-18356 (standart)
-        #   - F-9170 / F-9189 (çoklu, / ile ayrılmış)
-        #   - F/9099 (/ ile birleşik)
-        #   - F- 9026 (boşluklu)
-        # Prefix olmayan kodlar atlanır (örn: İRSALİYE NO: 18277)
-        self.irsaliye_pattern = r'([AF])\s*[-/]\s*(\d{4,5})'
+        # Veritabanı başına irsaliye indeksi (load_despatch_index)
+        self._despatch_index = {}
         
         logger.info("Invoice Matcher başlatıldı")
         logger.info(f"API Excel: {self.api_excel}")
@@ -83,213 +102,217 @@ class InvoiceMatcher:
             List[tuple]: [(prefix, number), ...] formatında irsaliye kodları
             Örnek: [('A', '18356'), ('F', '9197')]
         """
-        if not description or pd.isna(description):
-            return []
+        return extract_firm_codes(description)
+    
+    def load_despatch_index(self, db_path: Path) -> pd.DataFrame:
+        """
+        Veritabanındaki tüm irsaliyeleri tek seferde yükler (sonuç önbelleğe alınır)
         
-        # Description'ı string'e çevir ve büyük harfe çevir (case-insensitive)
-        desc = str(description).upper()
+        Gelen faturada birden fazla irsaliye varsa tutar satır tutarlarına
+        göre bölüştürülür (satırlar irsaliyeye bağlı değilse eşit).
         
-        # Tüm eşleşmeleri bul (A-XXXX veya F-XXXX formatında)
-        # Pattern: ([AF])\s*[-/]\s*(\d{4,5})
-        # A veya F, sonra - veya / (boşluklarla), sonra 4-5 haneli numara
-        matches = re.findall(self.irsaliye_pattern, desc)
+        Args:
+            db_path: Veritabanı dosya yolu
         
-        # Unique yapıp döndür
-        return list(set(matches))
+        Returns:
+            pd.DataFrame: despatch_id_short indeksli; invoice_number,
+            total_amount (irsaliye payı), irsaliye_count, share sütunları
+        """
+        if db_path in self._despatch_index:
+            return self._despatch_index[db_path]
+        
+        index = pd.DataFrame(columns=['despatch_id_short'] + DESPATCH_INDEX_COLUMNS)
+        index = index.set_index('despatch_id_short')
+        
+        if not db_path.exists():
+            logger.warning(f"Veritabanı bulunamadı: {db_path}")
+        else:
+            try:
+                conn = get_connection(db_path)
+                despatches = pd.read_sql_query("""
+                    SELECT d.invoice_id, d.despatch_id_short, d.despatch_id_full,
+                           i.invoice_number, i.total_amount
+                    FROM despatch_documents d
+                    JOIN invoices i ON d.invoice_id = i.id
+                    ORDER BY d.id
+                """, conn)
+                lines = IRSReconciler.load_line_amounts(conn)
+                conn.close()
+                
+                # Fatura başına irsaliye sayısı ve irsaliye payı
+                despatches['irsaliye_count'] = despatches.groupby('invoice_id')['invoice_id'].transform('size')
+                shares = IRSReconciler.despatch_shares(despatches, lines)
+                shares['total_amount'] = shares['total_amount'] * shares['share']
+                
+                # Aynı irsaliye kodu birden fazla faturada varsa ilk kayıt
+                index = (shares.drop_duplicates('despatch_id_short')
+                         .set_index('despatch_id_short')[DESPATCH_INDEX_COLUMNS])
+                
+                logger.info(f"{len(index)} irsaliye yüklendi: {db_path.name}")
+            except Exception as e:
+                logger.error(f"Veritabanı hatası ({db_path}): {e}")
+        
+        self._despatch_index[db_path] = index
+        return index
     
     def search_in_database(self, irsaliye_code: str, db_path: Path) -> dict:
         """
         Veritabanında irsaliye koduna göre fatura arar
-        Gelen faturada birden fazla irsaliye varsa tutarı bölüştürür
+        Gelen faturada birden fazla irsaliye varsa tutarı satır tutarlarına göre bölüştürür
         
         Args:
             irsaliye_code: İrsaliye kodu (örn: 'A-18356')
             db_path: Veritabanı dosya yolu
             
         Returns:
-            dict: {'invoice_number': '...', 'total_amount': ..., 'found': True/False, 'irsaliye_count': N}
+            dict: {'invoice_number': '...', 'total_amount': ..., 'found': True/False, 'irsaliye_count': N, 'share': 0-1}
         """
         result = {
             'invoice_number': None,
             'total_amount': None,
             'found': False,
-            'irsaliye_count': 0
+            'irsaliye_count': 0,
+            'share': 0.0
         }
         
-        if not db_path.exists():
-            logger.warning(f"Veritabanı bulunamadı: {db_path}")
-            return result
+        index = self.load_despatch_index(db_path)
         
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # İrsaliye koduna göre fatura bilgilerini çek
-            query = """
-                SELECT i.invoice_number, i.total_amount, i.id
-                FROM despatch_documents d 
-                JOIN invoices i ON d.invoice_id = i.id 
-                WHERE d.despatch_id_short = ?
-                LIMIT 1
-            """
+        if irsaliye_code in index.index:
+            row = index.loc[irsaliye_code]
+            result['invoice_number'] = row['invoice_number']
+            result['total_amount'] = float(row['total_amount'])
+            result['irsaliye_count'] = int(row['irsaliye_count'])
+            result['share'] = float(row['share'])
+            result['found'] = True
             
-            cursor.execute(query, (irsaliye_code,))
-            row = cursor.fetchone()
-            
-            if row:
-                invoice_number = row[0]
-                total_amount = row[1]
-                invoice_id = row[2]
-                
-                # Bu faturada kaç irsaliye var?
-                count_query = """
-                    SELECT COUNT(*) 
-                    FROM despatch_documents 
-                    WHERE invoice_id = ?
-                """
-                cursor.execute(count_query, (invoice_id,))
-                irsaliye_count = cursor.fetchone()[0]
-                
-                # Tutarı irsaliye sayısına böl
-                ortalama_tutar = total_amount / irsaliye_count if irsaliye_count > 0 else total_amount
-                
-                result['invoice_number'] = invoice_number
-                result['total_amount'] = ortalama_tutar
-                result['irsaliye_count'] = irsaliye_count
-                result['found'] = True
-                
-                logger.debug(f"Eşleşme bulundu: {irsaliye_code} -> {invoice_number} ({irsaliye_count} irsaliye, ortalama: {ortalama_tutar:.2f})")
-            else:
-                logger.debug(f"Eşleşme bulunamadı: {irsaliye_code}")
-            
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"Veritabanı hatası ({db_path}): {e}")
+            logger.debug(f"Eşleşme bulundu: {irsaliye_code} -> {row['invoice_number']} ({result['irsaliye_count']} irsaliye, pay: %{result['share'] * 100:.1f})")
+        else:
+            logger.debug(f"Eşleşme bulunamadı: {irsaliye_code}")
         
         return result
     
+    @staticmethod
+    def format_date(value) -> str:
+        """Tarihi gün.ay.yıl formatına çevirir"""
+        try:
+            if pd.isna(value) or value == '':
+                return ''
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value.replace('T', ' ').split('.')[0])
+            return value.strftime('%d.%m.%Y')
+        except Exception:
+            return str(value)
+    
     def process_api_invoices(self) -> pd.DataFrame:
         """
-        API Excel dosyasını okur ve her fatura için eşleşme arar
+        API fatura dosyasını okur ve her fatura için eşleşme arar
+        
+        Excel'in yanında güncel JSONL/Parquet/CSV kopyası varsa o okunur.
         
         Returns:
             pd.DataFrame: Eşleştirme sonuçları
         """
         logger.info("API fatura dosyası okunuyor...")
         
-        # Excel dosyasını oku
-        df = pd.read_excel(self.api_excel)
+        # Fatura dosyasını oku (hızlı biçim yoksa Excel)
+        df, source = load_table(self.api_table)
         
-        logger.info(f"Toplam {len(df)} fatura bulundu")
+        logger.info(f"Toplam {len(df)} fatura bulundu ({source.name})")
         
-        # Sonuç listesi
-        results = []
+        results_df = self.match_api_invoices(df)
         
-        for idx, row in df.iterrows():
-            giden_fatura_no = row.get('invoiceNumber', '')
-            giden_tutar = row.get('totalTL', 0)
-            giden_tarih = row.get('date', '')
-            description = row.get('description', '')
-            
-            # Tarihi gün.ay.yıl formatına çevir
-            try:
-                if giden_tarih:
-                    from datetime import datetime
-                    if isinstance(giden_tarih, str):
-                        tarih_obj = datetime.fromisoformat(giden_tarih.replace('T', ' ').split('.')[0])
-                    else:
-                        tarih_obj = giden_tarih
-                    giden_tarih_formatted = tarih_obj.strftime('%d.%m.%Y')
-                else:
-                    giden_tarih_formatted = ''
-            except:
-                giden_tarih_formatted = str(giden_tarih)
-            
-            # Description'dan irsaliye kodlarını çıkar
-            irsaliye_codes = self.extract_irsaliye_codes(description)
-            
-            if not irsaliye_codes:
-                # İrsaliye kodu bulunamadı
-                results.append({
-                    'Tarih': giden_tarih_formatted,
-                    'Giden_Fatura_No': giden_fatura_no,
-                    'Giden_Tutar_TL': giden_tutar,
-                    'Irsaliye_Kodu': 'Bulunamadı',
-                    'Firma': '-',
-                    'Gelen_Fatura_No': '-',
-                    'Gelen_Tutar_TL': 0,
-                    'Fark_TL': 0,
-                    'KDV_20_TL': 0,
-                    'Fark_KDV_Dusulmus_TL': 0,
-                    'Durum': 'İrsaliye kodu yok ⚠'
-                })
-                continue
-            
-            # Çoklu irsaliye durumunda ortalama tutar hesapla
-            irsaliye_sayisi = len(irsaliye_codes)
-            ortalama_tutar = giden_tutar / irsaliye_sayisi if irsaliye_sayisi > 0 else giden_tutar
-            
-            # Çoklu irsaliye işareti
-            coklu_irsaliye_isareti = f" (÷{irsaliye_sayisi})" if irsaliye_sayisi > 1 else ""
-            
-            # Her irsaliye kodu için arama yap
-            for prefix, number in irsaliye_codes:
-                irsaliye_code = f"{prefix}-{number}"
-                
-                # Firma ve veritabanını belirle
-                if prefix == 'A':
-                    firma = 'AK GİPS'
-                    db_path = self.akgips_db
-                elif prefix == 'F':
-                    firma = 'FULLBOARD'
-                    db_path = self.fullboard_db
-                else:
-                    continue
-                
-                # Veritabanında ara
-                search_result = self.search_in_database(irsaliye_code, db_path)
-                
-                if search_result['found']:
-                    durum = 'Eşleşti ✓'
-                    gelen_fatura_no = search_result['invoice_number']
-                    gelen_tutar = search_result['total_amount']
-                    gelen_irsaliye_count = search_result['irsaliye_count']
-                    
-                    # Gelen faturada çoklu irsaliye varsa işaretle
-                    if gelen_irsaliye_count > 1:
-                        gelen_fatura_no = f"{gelen_fatura_no} (÷{gelen_irsaliye_count})"
-                else:
-                    durum = 'Bulunamadı ✗'
-                    gelen_fatura_no = '-'
-                    gelen_tutar = 0
-                
-                # Fark hesaplaması
-                fark = ortalama_tutar - gelen_tutar if search_result['found'] else 0
-                kdv_20 = fark * 0.20  # %20 KDV
-                fark_kdv_dusulmus = fark - kdv_20  # KDV düşülmüş fark
-                
-                results.append({
-                    'Tarih': giden_tarih_formatted,
-                    'Giden_Fatura_No': giden_fatura_no + coklu_irsaliye_isareti,  # İşaret ekle
-                    'Giden_Tutar_TL': ortalama_tutar,  # Ortalama tutar kullan
-                    'Irsaliye_Kodu': irsaliye_code,
-                    'Firma': firma,
-                    'Gelen_Fatura_No': gelen_fatura_no,
-                    'Gelen_Tutar_TL': gelen_tutar,
-                    'Fark_TL': fark,
-                    'KDV_20_TL': kdv_20,
-                    'Fark_KDV_Dusulmus_TL': fark_kdv_dusulmus,
-                    'Durum': durum
-                })
-        
-        # DataFrame'e çevir
-        results_df = pd.DataFrame(results)
-        
-        logger.info(f"İşlem tamamlandı: {len(results)} kayıt")
+        logger.info(f"İşlem tamamlandı: {len(results_df)} kayıt")
         
         return results_df
     
+    def match_api_invoices(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Giden faturaları irsaliye indeksiyle eşleştirir
+        
+        Satır satır veritabanı sorgusu yerine: açıklamalar bir kez çözülür,
+        faturalar irsaliye kodlarına göre açılır (explode) ve önceden
+        yüklenmiş irsaliye indeksiyle tek merge yapılır.
+        
+        Args:
+            df: invoiceNumber, totalTL, date, description sütunları
+        
+        Returns:
+            pd.DataFrame: Eşleştirme sonuçları (RESULT_COLUMNS)
+        """
+        if df.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        
+        df = df.reset_index(drop=True)
+        
+        def column(name, default):
+            return df[name] if name in df.columns else pd.Series(default, index=df.index)
+        
+        invoices = pd.DataFrame({
+            'Tarih': column('date', '').map(self.format_date),
+            'Giden_Fatura_No': column('invoiceNumber', ''),
+            'Giden_Tutar_TL': column('totalTL', 0),
+            'codes': map_descriptions(column('description', ''), self.extract_irsaliye_codes),
+        })
+        invoices['irsaliye_sayisi'] = invoices['codes'].str.len()
+        
+        # Her irsaliye kodu bir satır (kodsuz faturalar NaN ile kalır)
+        rows = invoices.explode('codes', ignore_index=True)
+        rows['prefix'] = rows['codes'].str[0]
+        rows['Irsaliye_Kodu'] = rows['prefix'] + '-' + rows['codes'].str[1]
+        has_code = rows['codes'].notna()
+        rows = rows[~has_code | rows['prefix'].isin(FIRMS)].reset_index(drop=True)
+        has_code = rows['codes'].notna()
+        
+        # Her iki veritabanının irsaliye indeksi
+        index = pd.concat([
+            self.load_despatch_index(self.firm_db(prefix)).assign(prefix=prefix)
+            for prefix in FIRMS
+        ]).rename_axis('Irsaliye_Kodu').reset_index()
+        rows = rows.merge(index, on=['prefix', 'Irsaliye_Kodu'], how='left')
+        found = rows['invoice_number'].notna()
+        
+        # Çoklu irsaliye durumunda ortalama tutar ve işaret
+        count = rows['irsaliye_sayisi'].where(has_code, 1).astype(int)
+        ortalama_tutar = rows['Giden_Tutar_TL'] / count
+        giden_fatura_no = rows['Giden_Fatura_No'].where(
+            count <= 1, rows['Giden_Fatura_No'].astype(str) + ' (÷' + count.astype(str) + ')'
+        )
+        
+        # Gelen faturada çoklu irsaliye varsa işaretle
+        gelen_count = rows['irsaliye_count'].fillna(0).astype(int)
+        gelen_fatura_no = rows['invoice_number'].where(
+            gelen_count <= 1, rows['invoice_number'] + ' (÷' + gelen_count.astype(str) + ')'
+        )
+        gelen_tutar = rows['total_amount'].astype(float).where(found, 0.0)
+        
+        # Fark hesaplaması
+        fark = (ortalama_tutar - gelen_tutar).where(found, 0.0)
+        kdv_20 = fark * 0.20  # %20 KDV
+        
+        results_df = pd.DataFrame({
+            'Tarih': rows['Tarih'],
+            'Giden_Fatura_No': giden_fatura_no,
+            'Giden_Tutar_TL': ortalama_tutar,
+            'Irsaliye_Kodu': rows['Irsaliye_Kodu'].where(has_code, 'Bulunamadı'),
+            'Firma': rows['prefix'].map(lambda prefix: FIRMS.get(prefix, ('-',))[0]),
+            'Gelen_Fatura_No': gelen_fatura_no.where(found, '-'),
+            'Gelen_Tutar_TL': gelen_tutar,
+            'Fark_TL': fark,
+            'KDV_20_TL': kdv_20,
+            'Fark_KDV_Dusulmus_TL': fark - kdv_20,  # KDV düşülmüş fark
+            'Durum': np.select(
+                [~has_code, found],
+                ['İrsaliye kodu yok ⚠', 'Eşleşti ✓'],
+                default='Bulunamadı ✗'
+            ),
+        })
+        
+        return results_df[RESULT_COLUMNS]
+    
+    def firm_db(self, prefix: str) -> Path:
+        """İrsaliye önekine göre veritabanı yolu"""
+        return getattr(self, FIRMS[prefix][1])
+    
     def generate_excel_report(self, df: pd.DataFrame) -> Path:
         """
         Eşleştirme sonuçlarını Excel raporuna yazar
@@ -441,7 +464,7 @@ class InvoiceMatcher:
         print()
         
         # Dosya kontrolü
-        if not self.api_excel.exists():
+        if find_table(self.api_table) is None:
             logger.error(f"❌ API Excel dosyası bulunamadı: {self.api_excel}")
             return None
         
@@ -4,8 +4,13 @@
 İrsaliye Raporu Oluşturma Script
 """
 
-import sqlite3
 import os
+import sys
+
+# Proje kök dizinini sys.path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.connection import get_connection
 
 def generate_report():
     # Proje kök dizinine git
@@ -17,7 +22,7 @@ def generate_report():
     if not os.path.exists(db_path):
         db_path = 'data/db/akgips.db'
     
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     print("=" * 80)
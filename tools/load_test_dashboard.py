@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard Yük Testi
+===================
+
+Çalışan bir dashboard'a (app.py veya wsgi.py) aynı anda birden fazla
+kullanıcı gibi istek gönderir ve istek/sn, gecikme yüzdelikleri (p50, p95,
+p99), hata sayısı ve aktarılan bayt miktarını uç nokta bazında raporlar.
+
+Her sanal kullanıcı sırayla: ana sayfa, /api/kpis, /api/invoices'ta
+--pages sayfa (next_cursor ile) ve /api/despatch ister. İstekler gzip
+kabul eder; tarayıcı gibi ETag ile koşullu istek gönderilmez.
+
+Sadece standart kütüphane kullanır (urllib + thread'ler).
+
+Kullanım:
+    python3 src/web/wsgi.py --workers 4 --threads 8 &
+    python3 tools/load_test_dashboard.py
+    python3 tools/load_test_dashboard.py --users 20 --duration 30 --url http://192.168.1.10:8080
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Stats:
+    """Uç nokta başına süreler, hata ve bayt sayıları (thread güvenli)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.times = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+    
+    def add(self, name: str, elapsed: float, size: int, ok: bool):
+        with self._lock:
+            self.times[name].append(elapsed)
+            self.bytes[name] += size
+            if not ok:
+                self.errors[name] += 1
+
+
+def fetch(base_url: str, path: str, stats: Stats, name: str):
+    """İsteği gönder, süresini kaydet; JSON ise çözülmüş gövdeyi döndür"""
+    request = urllib.request.Request(base_url + path, headers={'Accept-Encoding': 'gzip'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = response.read()
+            encoding = response.headers.get('Content-Encoding')
+            content_type = response.headers.get('Content-Type', '')
+        stats.add(name, time.perf_counter() - start, len(body), True)
+    except (urllib.error.URLError, OSError):
+        stats.add(name, time.perf_counter() - start, 0, False)
+        return None
+    
+    if 'json' not in content_type:
+        return None
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def user_session(base_url: str, pages: int, stats: Stats):
+    """Bir kullanıcının tipik gezintisi"""
+    fetch(base_url, '/', stats, '/')
+    fetch(base_url, '/api/kpis', stats, '/api/kpis')
+    
+    cursor = None
+    for _ in range(pages):
+        path = '/api/invoices?limit=100' + (f'&cursor={cursor}' if cursor else '')
+        page = fetch(base_url, path, stats, '/api/invoices')
+        cursor = page.get('next_cursor') if page else None
+        if not cursor:
+            break
+    
+    fetch(base_url, '/api/despatch?limit=100', stats, '/api/despatch')
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard yük testi")
+    parser.add_argument('--url', default='http://localhost:8080', help="Dashboard adresi")
+    parser.add_argument('--users', type=int, default=10, help="Eşzamanlı kullanıcı sayısı")
+    parser.add_argument('--duration', type=float, default=15.0, help="Test süresi (sn)")
+    parser.add_argument('--pages', type=int, default=3, help="Kullanıcı başına fatura sayfası")
+    args = parser.parse_args()
+    base_url = args.url.rstrip('/')
+    
+    # Sunucu ayakta mı
+    check = Stats()
+    fetch(base_url, '/api/kpis', check, 'check')
+    if check.errors['check']:
+        print(f"❌ Dashboard'a ulaşılamadı: {base_url}")
+        return
+    
+    print("=" * 70)
+    print(f"📊 DASHBOARD YÜK TESTİ ({args.users} kullanıcı, {args.duration:.0f} sn)")
+    print("=" * 70)
+    print(f"\n🌐 {base_url}")
+    
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+    
+    def run_user():
+        sessions = 0
+        while time.perf_counter() < deadline:
+            user_session(base_url, args.pages, stats)
+            sessions += 1
+        return sessions
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        sessions = sum(executor.map(lambda _: run_user(), range(args.users)))
+    elapsed = time.perf_counter() - start
+    
+    total = sum(len(times) for times in stats.times.values())
+    errors = sum(stats.errors.values())
+    
+    print(f"\n   {'Uç nokta':<16} {'İstek':>7} {'Hata':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'KB/istek':>9}")
+    for name, times in stats.times.items():
+        print(f"   {name:<16} {len(times):>7,} {stats.errors[name]:>5} "
+              f"{statistics.median(times) * 1000:>6.1f} ms {percentile(times, 0.95) * 1000:>6.1f} ms "
+              f"{percentile(times, 0.99) * 1000:>6.1f} ms {stats.bytes[name] / len(times) / 1024:>9.1f}")
+    
+    print("\n" + "=" * 70)
+    print(f"⚡ {total / elapsed:,.1f} istek/sn ({total:,} istek, {sessions:,} oturum, {elapsed:.1f} sn)")
+    print(f"{'✅' if errors == 0 else '⚠️ '} Hata: {errors:,}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,20 +7,62 @@ Tüm Excel Dosyalarını Güncelleme Script'i
 Bu script tüm veritabanlarından (akgips, api, birlesik, fullboard) 
 Excel dosyalarını tek seferde oluşturur/günceller.
 
-İlk 3 Excel oluşturulduktan sonra API'den veri çeker ve API Excel'i oluşturur.
+Önce API'den veri çeker (şifre sorulur), ardından 4 Excel'i paralel
+oluşturur: export'lar ayrı veritabanlarından okur ve ayrı dosyalara yazar,
+ortak durumları yoktur. Her export ayrı bir süreçte (ProcessPoolExecutor)
+çalışır; toplam süre en yavaş export kadardır.
 
 Kullanım:
     python3 update_all_excels.py
-    python3 update_all_excels.py --skip-api  # API veri çekmeyi atla
+    python3 update_all_excels.py --skip-api     # API veri çekmeyi atla
+    python3 update_all_excels.py --workers 1    # Sıralı çalıştır
+    python3 update_all_excels.py --force        # Değişmeyenleri de yeniden üret
+    python3 update_all_excels.py --format xlsx --format parquet   # Excel + Parquet
+    python3 update_all_excels.py --monthly      # + firma/ay bölümlü Excel'ler
+
+Veritabanı son export'tan beri değişmediyse (parmak izi yan dosyası
+eşleşiyorsa) ilgili Excel yeniden üretilmez.
+
+--format csv/jsonl/parquet aynı sayfa tanımlarından makine okunur
+tablolar üretir (data/export/<isim>/); birden fazla kez verilebilir.
 """
 
+import argparse
+import contextlib
+import io
+import multiprocessing
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
 # Proje kök dizinini ayarla
 project_root = Path(__file__).resolve().parent
-sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+sys.path.insert(1, str(project_root / "src"))
+
+# Çalıştırılacak export'lar ve kaynak veritabanları
+EXPORT_JOBS = [
+    ('akgips', 'data/db/akgips.db'),
+    ('birlesik', 'data/db/birlesik.db'),
+    ('fullboard', 'data/db/fullboard.db'),
+    ('api', 'data/db/api.db'),
+]
+
+# Firma + ay bölümlü Excel'ler (--monthly; tablo biçimleri yok)
+MONTHLY_JOB = ('birlesik_aylik', 'data/db/birlesik.db')
+XLSX_ONLY = {'birlesik_aylik'}
+
+EXPORT_LABELS = {
+    'akgips': '📄 AK GİPS Excel',
+    'birlesik': '📄 Birleşik Excel',
+    'fullboard': '📄 FULLBOARD Excel',
+    'api': '📄 API Excel',
+    'birlesik_aylik': '📅 Aylık Birleşik Excel\'ler',
+    'api_fetch': '🌐 API Veri Çekme'
+}
 
 def print_header(text):
     """Başlık yazdır"""
@@ -66,7 +108,7 @@ def fetch_api_data():
         else:
             print("⚠️  API'den fatura çekilemedi veya yeni fatura bulunamadı")
             return False
-            
+    
     except KeyboardInterrupt:
         print("\n\n⚠️  Şifre girişi iptal edildi")
         return False
@@ -77,8 +119,112 @@ def fetch_api_data():
         return False
 
 
-def update_all_excels(skip_api_fetch=False):
-    """Tüm Excel dosyalarını güncelle"""
+def export_jobs(names, formats):
+    """(isim, biçim) iş listesi (bölümlü export sadece xlsx)"""
+    return [(name, fmt) for fmt in formats for name in names if fmt == 'xlsx' or name not in XLSX_ONLY]
+
+
+def job_name(name, fmt='xlsx'):
+    """Rapordaki iş adı (Excel dışı biçimlerde uzantılı: birlesik.parquet)"""
+    return name if fmt == 'xlsx' else f"{name}.{fmt}"
+
+
+def run_export_job(name, force=False, fmt='xlsx'):
+    """
+    Tek export'u çalıştır (alt süreçte)
+    
+    Çıktı yakalanıp sonuçla birlikte döndürülür; böylece paralel
+    export'ların mesajları birbirine karışmaz.
+    
+    Args:
+        name: Export ismi
+        force: Veritabanı değişmemiş olsa da yeniden üret
+        fmt: 'xlsx' veya tablo biçimi ('csv', 'jsonl', 'parquet')
+    
+    Returns:
+        dict: name, success, skipped, seconds, filename, sheets, log, error
+    """
+    result = {'name': job_name(name, fmt), 'success': False, 'skipped': False, 'filename': None,
+              'sheets': {}, 'error': None}
+    log = io.StringIO()
+    start = time.perf_counter()
+    
+    with contextlib.redirect_stdout(log):
+        try:
+            if name == 'api' and fmt == 'xlsx':
+                from src.exporters.api_exporter import export_api
+                export = export_api(force=force)
+            else:
+                from src.exporters.export_specs import run_export
+                export = run_export(name, fmt=fmt, force=force)
+            
+            if export is None:
+                result['error'] = f"{name} {fmt} dosyası oluşturulamadı"
+            else:
+                result.update(success=True, skipped=export['skipped'],
+                              filename=export['filename'], sheets=export['sheets'])
+        except Exception as e:
+            result['error'] = f"{e}\n{traceback.format_exc()}"
+    
+    result['seconds'] = time.perf_counter() - start
+    result['log'] = log.getvalue()
+    return result
+
+
+def run_exports(names, workers=None, force=False, formats=('xlsx',)):
+    """
+    Export'ları süreç havuzunda çalıştır, tamamlandıkça yazdır
+    
+    Args:
+        names: Export isimleri
+        workers: Süreç sayısı (None = iş sayısı, 1 = sıralı, bu süreçte)
+        force: Parmak izine bakmadan hepsini yeniden üret
+        formats: Her export için üretilecek biçimler
+    
+    Returns:
+        list: run_export_job sonuçları (tamamlanma sırasıyla)
+    """
+    jobs = export_jobs(names, formats)
+    workers = workers or len(jobs)
+    results = []
+    
+    if workers <= 1:
+        for name, fmt in jobs:
+            result = run_export_job(name, force, fmt)
+            print_export_result(result)
+            results.append(result)
+        return results
+    
+    # spawn: alt süreçler ana süreçteki SQLite bağlantılarını devralmaz
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+        futures = {pool.submit(run_export_job, name, force, fmt): job_name(name, fmt) for name, fmt in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'name': futures[future], 'success': False, 'skipped': False, 'seconds': 0.0,
+                          'filename': None, 'sheets': {}, 'log': '', 'error': str(e)}
+            print_export_result(result)
+            results.append(result)
+    return results
+
+
+def print_export_result(result):
+    """Tamamlanan export'un çıktısını ve süresini yazdır"""
+    print(f"\n── {result['name'].upper()} ({result['seconds']:.2f} sn) " + "─" * 50)
+    if result['log'].strip():
+        print(result['log'].rstrip())
+    if result['skipped']:
+        print(f"⏭️  {result['name']} değişmedi, yeniden üretilmedi")
+    elif result['success']:
+        print(f"✅ {result['name']} dosyası başarıyla oluşturuldu!")
+    else:
+        print(f"❌ HATA ({result['name']}): {result['error']}")
+
+
+def update_all_excels(skip_api_fetch=False, workers=None, force=False, formats=('xlsx',), monthly=False):
+    """Tüm Excel dosyalarını (ve istenen tablo biçimlerini) güncelle"""
     start_time = datetime.now()
     
     print_header("TÜM EXCEL DOSYALARINI GÜNCELLEME")
@@ -90,82 +236,36 @@ def update_all_excels(skip_api_fetch=False):
         'skipped': []
     }
     
-    # İlk 3 exporter (API hariç)
-    first_exporters = [
-        ('akgips', 'data/db/akgips.db'),
-        ('birlesik', 'data/db/birlesik.db'),
-        ('fullboard', 'data/db/fullboard.db')
-    ]
-    
-    # Toplam adım sayısı (3 export + API çekme + API export)
-    total_steps = 5 if not skip_api_fetch else 4
+    # Toplam adım sayısı (API çekme + paralel export)
+    total_steps = 2 if not skip_api_fetch else 1
     current_step = 0
     
-    # İlk 3 Excel'i oluştur
-    for name, db_path in first_exporters:
-        current_step += 1
-        db_file = project_root / db_path
-        
-        # Veritabanı kontrolü
-        if not db_file.exists():
-            print_step(current_step, total_steps, f"{name.upper()} - ATLANDI")
-            print(f"⚠️  Veritabanı bulunamadı: {db_path}")
-            results['skipped'].append(name)
-            continue
-        
-        print_step(current_step, total_steps, f"{name.upper()} Excel Export")
-        
-        try:
-            if name == 'akgips':
-                from exporters.akgips_exporter import create_excel_export
-            elif name == 'birlesik':
-                from exporters.birlesik_exporter import create_excel_export
-            elif name == 'fullboard':
-                from exporters.fullboard_exporter import create_excel_export
-            
-            filename = create_excel_export()
-            results['success'].append(name)
-            print(f"✅ {name} Excel dosyası başarıyla oluşturuldu!")
-            
-        except Exception as e:
-            results['failed'].append(name)
-            print(f"❌ HATA ({name}): {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-    
-    # API'den veri çek (opsiyonel)
-    api_data_fetched = False
+    # API'den veri çek (opsiyonel, şifre sorulduğu için export'lardan önce)
     if not skip_api_fetch:
         current_step += 1
         print_step(current_step, total_steps, "API'DEN VERİ ÇEKME")
-        api_data_fetched = fetch_api_data()
-        if api_data_fetched:
+        if fetch_api_data():
             results['success'].append('api_fetch')
     
-    # API Excel export
-    current_step += 1
-    print_step(current_step, total_steps, "API Excel Export")
+    # Veritabanı kontrolü
+    names = []
+    jobs = EXPORT_JOBS + ([MONTHLY_JOB] if monthly else [])
+    for name, db_path in jobs:
+        if (project_root / db_path).exists():
+            names.append(name)
+        else:
+            print(f"⚠️  {name.upper()} - ATLANDI (veritabanı bulunamadı: {db_path})")
+            results['skipped'].append(name)
     
-    db_file = project_root / 'data/db/api.db'
+    current_step += 1
+    job_count = len(export_jobs(names, formats))
+    pool_size = min(workers or job_count, job_count) if names else 0
+    print_step(current_step, total_steps,
+               f"Export ({', '.join(formats)}: {job_count} iş, {pool_size} paralel süreç)")
     
-    if not db_file.exists():
-        print(f"⚠️  API veritabanı bulunamadı: data/db/api.db")
-        results['skipped'].append('api')
-    else:
-        try:
-            from exporters.api_exporter import export_api_to_excel
-            success = export_api_to_excel()
-            if success:
-                results['success'].append('api')
-                print(f"✅ API Excel dosyası başarıyla oluşturuldu!")
-            else:
-                results['failed'].append('api')
-                print(f"❌ API Excel dosyası oluşturulamadı!")
-        except Exception as e:
-            results['failed'].append('api')
-            print(f"❌ HATA (api): {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+    export_results = run_exports(names, workers, force, formats) if names else []
+    for result in export_results:
+        results['success' if result['success'] else 'failed'].append(result['name'])
     
     # Özet Rapor
     end_time = datetime.now()
@@ -173,18 +273,21 @@ def update_all_excels(skip_api_fetch=False):
     
     print_header("ÖZET RAPOR")
     print(f"\n⏱️  Toplam Süre: {duration:.2f} saniye")
+    
+    if export_results:
+        export_total = sum(result['seconds'] for result in export_results)
+        print(f"\n⏱️  Export Süreleri (sıralı toplam {export_total:.2f} sn):")
+        for result in sorted(export_results, key=lambda r: r['seconds'], reverse=True):
+            status = '⏭️ ' if result['skipped'] else '✅' if result['success'] else '❌'
+            rows = sum(result['sheets'].values())
+            detail = " - değişmedi" if result['skipped'] else f" - {rows:,} satır" if rows else ""
+            print(f"  {status} {result['name']:<18} {result['seconds']:8.2f} sn{detail}")
+    
     print(f"\n📊 Sonuçlar:")
     print(f"  ✅ Başarılı: {len(results['success'])} işlem")
     if results['success']:
         for name in results['success']:
-            label = {
-                'akgips': '📄 AK GİPS Excel',
-                'birlesik': '📄 Birleşik Excel',
-                'fullboard': '📄 FULLBOARD Excel',
-                'api': '📄 API Excel',
-                'api_fetch': '🌐 API Veri Çekme'
-            }.get(name, name)
-            print(f"     - {label}")
+            print(f"     - {EXPORT_LABELS.get(name, name)}")
     
     if results['failed']:
         print(f"\n  ❌ Başarısız: {len(results['failed'])}")
@@ -207,31 +310,37 @@ def main():
     """Ana fonksiyon"""
     try:
         # Komut satırı argümanlarını kontrol et
-        skip_api_fetch = '--skip-api' in sys.argv
+        parser = argparse.ArgumentParser(description="Tüm Excel dosyalarını güncelle")
+        parser.add_argument('--skip-api', action='store_true', help="API veri çekmeyi atla")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Paralel süreç sayısı (varsayılan: export sayısı, 1 = sıralı)")
+        parser.add_argument('--force', action='store_true',
+                            help="Veritabanı değişmemiş olsa da tüm Excel'leri yeniden üret")
+        parser.add_argument('--format', dest='formats', action='append',
+                            choices=['xlsx', 'csv', 'jsonl', 'parquet'],
+                            help="Üretilecek biçim (birden fazla verilebilir, varsayılan: xlsx)")
+        parser.add_argument('--monthly', action='store_true',
+                            help="Birleşik veritabanından firma + ay başına ayrı Excel'ler de üret")
+        args = parser.parse_args()
+        formats = tuple(dict.fromkeys(args.formats or ['xlsx']))
+        skip_api_fetch = args.skip_api
         
         if skip_api_fetch:
             print("ℹ️  API veri çekme atlanacak (--skip-api bayrağı aktif)")
         
         # Gerekli kütüphaneleri kontrol et
         try:
-            import openpyxl
+            import xlsxwriter
         except ImportError:
-            print("📦 openpyxl kütüphanesi yükleniyor...")
+            print("📦 xlsxwriter kütüphanesi yükleniyor...")
             import subprocess
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'openpyxl'])
-            import openpyxl
-        
-        try:
-            import pandas
-        except ImportError:
-            print("📦 pandas kütüphanesi yükleniyor...")
-            import subprocess
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pandas', 'xlsxwriter'])
-            import pandas
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'xlsxwriter'])
+            import xlsxwriter
         
         # Excel'leri güncelle
-        return update_all_excels(skip_api_fetch=skip_api_fetch)
-        
+        return update_all_excels(skip_api_fetch=skip_api_fetch, workers=args.workers, force=args.force,
+                                 formats=formats, monthly=args.monthly)
+    
     except KeyboardInterrupt:
         print("\n\n⚠️  İşlem kullanıcı tarafından iptal edildi!")
         return 130
@@ -10,9 +10,9 @@ cd "$(dirname "$0")"
 
 # 1. Eski veritabanlarını sil
 echo "📦 Eski veritabanları siliniyor..."
-rm -f data/db/akgips.db
-rm -f data/db/fullboard.db
-rm -f data/db/birlesik.db
+rm -f data/db/akgips.db data/db/akgips.db-wal data/db/akgips.db-shm
+rm -f data/db/fullboard.db data/db/fullboard.db-wal data/db/fullboard.db-shm
+rm -f data/db/birlesik.db data/db/birlesik.db-wal data/db/birlesik.db-shm
 echo "✅ Eski veritabanları silindi"
 echo ""
 
@@ -31,7 +31,7 @@ echo "🔄 Veritabanları birleştiriliyor..."
 python3 src/database/merge_databases.py
 echo ""
 
-# 5. API verilerini import et (Excel'den)
+# 5. API verilerini senkronize et (api.db'den)
 echo "🔄 API verileri import ediliyor..."
 python3 import_api_excel.py
 echo ""